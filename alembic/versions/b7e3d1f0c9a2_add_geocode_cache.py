@@ -0,0 +1,36 @@
+"""add geocode_cache
+
+Persistent reverse-geocode / POI lookup cache keyed by provider + geohash cell +
+zoom, shared by API and Celery processes.
+
+Revision ID: b7e3d1f0c9a2
+Revises: 5a3858665d2c
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "b7e3d1f0c9a2"
+down_revision: Union[str, Sequence[str], None] = "5a3858665d2c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geocode_cache",
+        sa.Column("provider", sa.Text(), nullable=False),
+        sa.Column("cell", sa.Text(), nullable=False),
+        sa.Column("zoom", sa.Integer(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("provider", "cell", "zoom"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("geocode_cache")
@@ -0,0 +1,37 @@
+"""add images day-freshness covering index
+
+Replaces ix_images_device_date_deleted with a covering index that also carries
+timestamp and segment_id, so services.day_freshness (count / max timestamp /
+max segment id per device+date) is answered by an index-only scan.
+
+Revision ID: c8f2a4d6e1b3
+Revises: b7e3d1f0c9a2
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "c8f2a4d6e1b3"
+down_revision: Union[str, Sequence[str], None] = "b7e3d1f0c9a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # images is large and written continuously; build without blocking ingest.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_images_day_freshness "
+            "ON images (device, date, deleted) INCLUDE (timestamp, segment_id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_images_device_date_deleted")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_images_device_date_deleted "
+            "ON images (device, date, deleted)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_images_day_freshness")
@@ -0,0 +1,43 @@
+"""add segment_centroids table
+
+Per-segment L2-normalised mean CLIP embedding, written on annotation, so
+novelty scoring loads its history as one matrix.
+
+Revision ID: d4b7e9f2a6c1
+Revises: c8f2a4d6e1b3
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+import pgvector.sqlalchemy
+
+revision: str = "d4b7e9f2a6c1"
+down_revision: Union[str, Sequence[str], None] = "c8f2a4d6e1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "segment_centroids",
+        sa.Column("device", sa.Text(), nullable=False),
+        sa.Column("date", sa.Text(), nullable=False),
+        sa.Column("segment_id", sa.Integer(), nullable=False),
+        sa.Column("centroid", pgvector.sqlalchemy.Vector(dim=768), nullable=False),
+        sa.Column("image_count", sa.Integer(), nullable=False),
+        sa.Column("activity_group", sa.Text(), nullable=True),
+        sa.Column("location_id", UUID(as_uuid=True), nullable=True),
+        sa.Column("updated", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("device", "date", "segment_id"),
+    )
+    op.create_index(
+        "ix_segment_centroids_device_date", "segment_centroids", ["device", "date"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_segment_centroids_device_date", table_name="segment_centroids")
+    op.drop_table("segment_centroids")
@@ -0,0 +1,45 @@
+"""add day_location_visits table
+
+Materialised per-day location visits with grouping / content / event-lookup
+signatures, so a day rebuild re-describes only the visits that changed.
+
+Revision ID: e5c8a1f3b7d2
+Revises: d4b7e9f2a6c1
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e5c8a1f3b7d2"
+down_revision: Union[str, Sequence[str], None] = "d4b7e9f2a6c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "day_location_visits",
+        sa.Column("device", sa.Text(), nullable=False),
+        sa.Column("date", sa.Text(), nullable=False),
+        sa.Column("visit_index", sa.Integer(), nullable=False),
+        sa.Column("signature", sa.String(length=40), nullable=False),
+        sa.Column("content_sig", sa.String(length=40), nullable=False),
+        sa.Column("event_sig", sa.String(length=40), nullable=True),
+        sa.Column("event_context", sa.Text(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("updated", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("device", "date", "visit_index", "signature"),
+    )
+    op.create_index(
+        "ix_day_location_visits_content",
+        "day_location_visits",
+        ["device", "date", "content_sig"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_day_location_visits_content", table_name="day_location_visits")
+    op.drop_table("day_location_visits")
@@ -0,0 +1,81 @@
+"""
+backfill_gps.py
+---------------
+Re-run the GPS pipeline over many days in parallel (see location/backfill.py).
+
+Days are raw-GPS (device, date) pairs, optionally narrowed by device and date
+range. Without --force only days whose inputs changed since their last
+successful run are processed; --dry-run lists them and exits. Completed days are
+checkpointed under the run id, so re-running with --resume <id> continues an
+interrupted backfill.
+
+Usage:
+    python backfill_gps.py --dry-run                         # which days would change
+    python backfill_gps.py --force --workers 4               # local process pool
+    python backfill_gps.py --modes-only --from 2026-01-01    # transport modes only
+    python backfill_gps.py --force --celery                  # fan out to Celery workers
+    python backfill_gps.py --force --resume 3f9c0a1b2d4e     # continue a run
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("backfill_gps")
+
+from core.connections import connections  # noqa: E402
+from location.backfill import BackfillRun, gps_days, plan, run_day  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--device", action="append", help="limit to this device (repeatable)")
+    ap.add_argument("--from", dest="start", help="first date, YYYY-MM-DD")
+    ap.add_argument("--to", dest="end", help="last date, YYYY-MM-DD")
+    ap.add_argument("--modes-only", action="store_true", help="recompute transport modes only")
+    ap.add_argument("--force", action="store_true", help="reprocess days whose inputs are unchanged too")
+    ap.add_argument("--dry-run", action="store_true", help="list the days that would be processed")
+    ap.add_argument("--workers", type=int, default=4, help="local process pool size")
+    ap.add_argument("--celery", action="store_true", help="queue a Celery group instead of a local pool")
+    ap.add_argument("--resume", metavar="RUN_ID", help="continue an earlier run, skipping completed days")
+    args = ap.parse_args()
+
+    with Session(connections.engine) as session:
+        days = gps_days(session, args.device, args.start, args.end)
+        todo = plan(session, days, force=args.force or args.modes_only)
+    logger.info("GPS days: %d, to process: %d", len(days), len(todo))
+    if args.dry_run:
+        for device, date in todo:
+            print(f"{device}\t{date}")
+        return
+
+    if args.celery:
+        from tasks import start_gps_backfill
+        run_id = start_gps_backfill(todo, modes_only=args.modes_only, force=args.force, run_id=args.resume)
+        logger.info("Queued run %s — progress at /location/backfill/%s", run_id, run_id)
+        return
+
+    run = BackfillRun.create(len(todo), args.modes_only, args.force, run_id=args.resume)
+    logger.info("Run %s with %d workers", run.run_id, args.workers)
+    t0 = time.monotonic()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=connections.init_process) as pool:
+        futures = [
+            pool.submit(run_day, run.run_id, device, date, args.modes_only, args.force)
+            for device, date in todo
+        ]
+        for idx, _ in enumerate(as_completed(futures), 1):
+            if idx % 25 == 0 or idx == len(futures):
+                p = run.progress()
+                logger.info("Progress: %d/%d (ok=%d failed=%d skipped=%d, %.1f days/min)",
+                            idx, len(futures), p["ok"], p["failed"], p["skipped"], p["days_per_min"])
+    logger.info("Done run %s in %.0fs: %s", run.run_id, time.monotonic() - t0, run.progress())
+
+
+if __name__ == "__main__":
+    main()
@@ -64,8 +64,10 @@ def main() -> None:
     if args.dry_run:
         return
 
+    # Each chunk is one COPY + one UPDATE … FROM (_apply_timezone_to_images),
+    # so chunks can be large; they only bound the IN-list and memory.
     items = list(tz_by_image_id.items())
-    BATCH = 500
+    BATCH = 20_000
     done = 0
     for i in range(0, len(items), BATCH):
         chunk = dict(items[i:i + BATCH])
@@ -0,0 +1,78 @@
+"""
+bulk.py
+-------
+COPY-based bulk writes through a temporary staging table.
+
+Writing thousands of per-image rows as executemany batches of 100 costs one
+round trip per batch inside a long transaction. ``stage_rows`` instead streams
+every row into a session-local temp table with a single ``COPY ... FROM STDIN``.
+It returns a lightweight ``table()`` for that staging table, so the caller can
+apply all rows with one set-based statement: ``INSERT ... SELECT ... ON
+CONFLICT`` or ``UPDATE ... FROM``.
+
+The staging table is ``ON COMMIT DROP`` and is re-created on each call, so
+callers never clean up after it.
+"""
+
+import io
+import logging
+import time
+import uuid
+from datetime import date, datetime
+from typing import Iterable, Sequence
+
+from sqlalchemy import column, table, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def _copy_value(value) -> str:
+    """One field in COPY text format: \\N for NULL, with backslash, tab, CR
+    and newline escaped."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, float) and value != value:  # NaN from pandas
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def stage_rows(session: Session, name: str, columns: dict[str, str], rows: Iterable[Sequence]):
+    """COPY ``rows`` (tuples in ``columns`` order) into temp table ``name``
+    with ``columns`` {name: Postgres type}, in the session's transaction.
+    Returns ``(staging_table, n_rows)``."""
+    session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    session.execute(text(
+        f"CREATE TEMP TABLE {name} ("
+        + ", ".join(f"{col} {pg_type}" for col, pg_type in columns.items())
+        + ") ON COMMIT DROP"
+    ))
+
+    buf = io.StringIO()
+    n = 0
+    for row in rows:
+        buf.write("\t".join(_copy_value(v) for v in row))
+        buf.write("\n")
+        n += 1
+    buf.seek(0)
+
+    raw = session.connection().connection
+    with raw.cursor() as cur:
+        cur.copy_expert(f"COPY {name} ({', '.join(columns)}) FROM STDIN", buf)
+    return table(name, *(column(col) for col in columns)), n
+
+
+def log_rate(what: str, n: int, started: float) -> None:
+    """Log ``n`` rows written since ``started`` (time.perf_counter())."""
+    elapsed = time.perf_counter() - started
+    logger.info("%s: %d rows in %.2fs (%.0f rows/s)", what, n, elapsed, n / elapsed if elapsed > 0 else 0.0)
@@ -145,6 +145,27 @@ class OSMTile(Base):
     status: Mapped[str | None] = mapped_column(Text)                  # 'ok' | 'failed'
 
 
+class GeocodeCacheEntry(Base):
+    """
+    Persistent reverse-geocode / POI lookup cache shared by the API and Celery
+    processes (``location/geocode_cache.py``).
+
+    Keyed by provider + geohash cell (precision chosen per zoom) + zoom, so a
+    stop whose centroid jitters by a few metres day to day still lands on the
+    cached answer. Wikidata entries use the QID as their cell. ``payload`` is the
+    provider's parsed response; an empty payload is a negative entry ("nothing
+    here"), kept for a shorter TTL. Transport errors are never stored.
+    """
+    __tablename__ = "geocode_cache"
+
+    provider: Mapped[str] = mapped_column(Text, primary_key=True)  # nominatim / overpass / wikidata / transit
+    cell: Mapped[str] = mapped_column(Text, primary_key=True)      # geohash cell, or the Wikidata QID
+    zoom: Mapped[int] = mapped_column(Integer, primary_key=True)   # Nominatim zoom; 0 when not applicable
+    payload: Mapped[Any] = mapped_column(JSONB, nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class LocationLabel(Base):
     """Per-user label for a location (e.g. Home / Work). Keyed by Mongo username."""
     __tablename__ = "location_labels"
@@ -332,7 +353,11 @@ class Image(Base):
         Index("ix_images_device_ref", "device_ref_id"),
         Index("ix_images_deleted", "deleted"),
         Index("ix_images_deleted_time", "deleted_time"),
-        Index("ix_images_device_date_deleted", "device", "date", "deleted"),
+        # Covering index: services.day_freshness aggregates it index-only.
+        Index(
+            "ix_images_day_freshness", "device", "date", "deleted",
+            postgresql_include=["timestamp", "segment_id"],
+        ),
         Index("ix_images_device_deleted_time", "device", "deleted", "deleted_time"),
         UniqueConstraint("device", "image_path", name="uq_device_image_path"),
     )
@@ -871,6 +896,67 @@ class SegmentFood(Base):
     )
 
 
+class SegmentCentroid(Base):
+    """
+    L2-normalised mean CLIP embedding of one segment, written when the segment
+    is annotated (tasks.describe_segment_task) and back-filled lazily by
+    services/novelty.py. Lets novelty scoring load a device's recent history
+    as one (S, 768) matrix instead of re-averaging every image embedding.
+
+    ``activity_group`` and ``location_id`` are the segment's values at write
+    time, for the history's rarity counts.
+    """
+    __tablename__ = "segment_centroids"
+    __table_args__ = (
+        Index("ix_segment_centroids_device_date", "device", "date"),
+    )
+
+    device: Mapped[str] = mapped_column(Text, primary_key=True)
+    date: Mapped[str] = mapped_column(Text, primary_key=True)
+    segment_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    centroid: Mapped[Any] = mapped_column(Vector(768), nullable=False)
+    image_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    activity_group: Mapped[str | None] = mapped_column(Text)
+    location_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    updated: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class DayLocationVisit(Base):
+    """
+    Materialised location visit of a day (services/location_visits.py), kept
+    so a rebuild can reuse the LLM description and event lookup of every visit
+    whose inputs did not change.
+
+    ``signature`` hashes the visit's grouping (segments, place, span, coords);
+    ``content_sig`` hashes what its description was written from (notes,
+    people, event); ``event_sig`` hashes the event-lookup arguments (NULL when
+    the visit does not qualify). ``description`` is NULL when the LLM gave none
+    and the build fell back to a segment note — it is retried next time.
+    """
+    __tablename__ = "day_location_visits"
+    __table_args__ = (
+        Index("ix_day_location_visits_content", "device", "date", "content_sig"),
+    )
+
+    device: Mapped[str] = mapped_column(Text, primary_key=True)
+    date: Mapped[str] = mapped_column(Text, primary_key=True)
+    visit_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    signature: Mapped[str] = mapped_column(String(40), primary_key=True)
+    content_sig: Mapped[str] = mapped_column(String(40), nullable=False)
+    event_sig: Mapped[str | None] = mapped_column(String(40))
+    event_context: Mapped[str | None] = mapped_column(Text)
+    description: Mapped[str | None] = mapped_column(Text)
+    updated: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
 class BioDayStats(Base):
     """Per-day biometric aggregates, computed by the nightly Celery task."""
     __tablename__ = "bio_day_stats"
@@ -24,7 +24,7 @@ from collections import Counter
 from sqlalchemy.orm import Session
 from mongodb_odm import Document
 
-from schemas import ChatMemory, ChatThread, DaySummary, GPSInfo, GridImage, LifelogImage, LocationInfo, PeriodSummary, ResultSegment
+from schemas import ChatMemory, ChatThread, DayRollup, DaySummary, GPSInfo, GridImage, LifelogImage, LocationInfo, PeriodSummary, ResultSegment
 from database.models import Image, ImageGPS, Location
 
 logger = logging.getLogger(__name__)
@@ -326,6 +326,139 @@ class ImageRecord:
             "total_pages": total_pages,
         }
 
+    # ------------------------------------------------------------------
+    # find_segments_columnar() — same day/hour grouping as find_segments,
+    # as parallel arrays built straight from query tuples
+    # ------------------------------------------------------------------
+    @classmethod
+    def find_segments_columnar(
+        cls,
+        session: Session,
+        date: str,
+        device: str,
+        deleted: bool = False,
+        hour: str = "",
+        today: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Columnar form of ``find_segments`` (all segments, no paging) for busy
+        days, where building a GridImage per image and a GPSInfo per GPS row
+        dominates the response time.
+
+        Returns plain JSON-ready dicts:
+            segments:  {segmentId, imageOffsets, gpsOffsets, location}
+                       — segment i owns images[imageOffsets[i]:imageOffsets[i+1]]
+                       and gps[gpsOffsets[i]:gpsOffsets[i+1]]; ``location``
+                       indexes ``locations`` (or is null)
+            images:    {imagePath, thumbnail, timestamp, timezone, isVideo,
+                        activity, activityGroup, activityDescription,
+                        activityConfidence, new}
+            gps:       {latitude, longitude, timestamp}  — every point, in
+                       time order within its segment (no stop subsampling)
+            locations: [LocationInfo]  — one per distinct segment location
+
+        Segment and image order match ``find_segments``. Grid thumbnails
+        follow the ``*_grid`` naming convention and are not repeated.
+        """
+        filters = [Image.date == date, Image.device == device, Image.deleted == deleted]
+        if hour:
+            filters.append(Image.hour == str(hour).zfill(2))
+
+        rows = session.execute(
+            select(
+                Image.segment_id,
+                Image.image_path,
+                Image.thumbnail,
+                Image.timestamp,
+                Image.timezone,
+                Image.is_video,
+                Image.activity,
+                Image.activity_group,
+                Image.activity_description,
+                Image.activity_confidence,
+                Image.new,
+                Image.location_id,
+            )
+            .where(*filters)
+            .order_by(asc(Image.segment_id), asc(Image.timestamp))
+        ).all()
+
+        gps_rows = session.execute(
+            select(Image.segment_id, ImageGPS.latitude, ImageGPS.longitude, ImageGPS.timestamp)
+            .join(ImageGPS, ImageGPS.image_id == Image.id)
+            .where(*filters)
+            .order_by(asc(Image.segment_id), asc(Image.timestamp))
+        ).all()
+
+        by_seg: dict[Any, list] = {}
+        for row in rows:
+            by_seg.setdefault(row[0], []).append(row)
+        gps_by_seg: dict[Any, list] = {}
+        for row in gps_rows:
+            gps_by_seg.setdefault(row[0], []).append(row)
+
+        seg_keys = sorted(by_seg, key=lambda k: (k is None, k if k is not None else 0), reverse=today)
+
+        # Most-common location per segment, then one query for those locations.
+        seg_location: dict[Any, Any] = {}
+        for key in seg_keys:
+            counts = Counter(r.location_id for r in by_seg[key] if r.location_id is not None)
+            if counts:
+                seg_location[key] = counts.most_common(1)[0][0]
+        location_ids = list(dict.fromkeys(seg_location.values()))
+        loc_by_id: dict[Any, Location] = {}
+        if location_ids:
+            loc_by_id = {
+                loc.id: loc
+                for loc in session.execute(
+                    select(Location).where(Location.id.in_(location_ids))
+                ).scalars()
+            }
+        loc_index = {lid: i for i, lid in enumerate(lid for lid in location_ids if lid in loc_by_id)}
+
+        image_cols: dict[str, list] = {
+            name: [] for name in (
+                "imagePath", "thumbnail", "timestamp", "timezone", "isVideo", "activity",
+                "activityGroup", "activityDescription", "activityConfidence", "new",
+            )
+        }
+        gps_cols: dict[str, list] = {"latitude": [], "longitude": [], "timestamp": []}
+        segments: dict[str, list] = {"segmentId": [], "imageOffsets": [0], "gpsOffsets": [0], "location": []}
+
+        for key in seg_keys:
+            seg_rows = by_seg[key][::-1] if today else by_seg[key]
+            for r in seg_rows:
+                image_cols["imagePath"].append(r.image_path)
+                image_cols["thumbnail"].append(r.thumbnail)
+                image_cols["timestamp"].append(r.timestamp.isoformat() if r.timestamp else None)
+                image_cols["timezone"].append(r.timezone)
+                image_cols["isVideo"].append(r.is_video)
+                image_cols["activity"].append(r.activity)
+                image_cols["activityGroup"].append(r.activity_group)
+                image_cols["activityDescription"].append(r.activity_description)
+                image_cols["activityConfidence"].append(r.activity_confidence)
+                image_cols["new"].append(r.new if r.new is not None else True)
+            for g in gps_by_seg.get(key, []):
+                gps_cols["latitude"].append(g.latitude)
+                gps_cols["longitude"].append(g.longitude)
+                gps_cols["timestamp"].append(g.timestamp)
+
+            segments["segmentId"].append(key)
+            segments["imageOffsets"].append(len(image_cols["imagePath"]))
+            segments["gpsOffsets"].append(len(gps_cols["latitude"]))
+            segments["location"].append(loc_index.get(seg_location.get(key)))
+
+        locations = [
+            LocationInfo.model_validate(loc_by_id[lid].__dict__).model_dump(mode="json", by_alias=True)
+            for lid in loc_index
+        ]
+        return {
+            "segments": segments,
+            "images": image_cols,
+            "gps": gps_cols,
+            "locations": locations,
+        }
+
 
 # ---------------------------------------------------------------------------
 # DaySummaryRecord
@@ -335,6 +468,15 @@ class DaySummaryRecord(Document, DaySummary):
         collection_name = "day_summaries"
 
 
+# ---------------------------------------------------------------------------
+# DayRollupRecord — compact per-day projection of DaySummaryRecord, keyed by
+# {device, date}; maintained by services.day_rollup.
+# ---------------------------------------------------------------------------
+class DayRollupRecord(Document, DayRollup):
+    class ODMConfig(Document.ODMConfig):
+        collection_name = "day_rollups"
+
+
 # ---------------------------------------------------------------------------
 # PeriodSummaryRecord — multi-day roll-up (week / month / trip / custom).
 # De-facto keyed by {device, kind, start_date, end_date}.
@@ -20,6 +20,6 @@ elif mode == "ollama":
     MixedContent = MixedContent
     get_visual_content = get_visual_content
 
-
-
-
+# Shared rate-limit/concurrency gate for the active provider (see dispatcher.py).
+from integrations.llm.dispatcher import LLMDispatcher, RetryLater  # noqa: E402
+llm_dispatcher = LLMDispatcher(mode)
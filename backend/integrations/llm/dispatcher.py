@@ -0,0 +1,245 @@
+"""Rate-limit-aware gate for LLM calls made from Celery tasks.
+
+Annotation used to handle a provider rate limit by ``time.sleep``-ing inside the
+task, which froze the whole ``llm`` queue worker for up to a minute per burst.
+Instead, every call goes through ``LLMDispatcher.slot()``, which
+
+- takes a token from a per-provider token bucket kept in Redis, so all workers
+  (threads and processes) share one budget,
+- caps in-flight calls per provider (expiring per-call leases),
+- honours a shared cool-down after any worker sees a 429,
+
+and raises ``RetryLater`` instead of waiting. Tasks hand that to
+``retry_llm_task``, which re-queues with a countdown and frees the worker for the
+next message. Only failed calls count toward ``LLM_MAX_RETRIES``; a deferral
+(no call made) does not.
+
+Queue-wait (publish → start) and call latency are accumulated per provider in
+Redis (``llm:metrics:<provider>``) and read back with ``llm_metrics()``.
+"""
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from integrations.sessions.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# (requests per minute, max in-flight calls). Override per provider with
+# LLM_RPM_<PROVIDER> / LLM_CONCURRENCY_<PROVIDER>.
+_DEFAULT_LIMITS = {
+    "openai": (300, 8),
+    "gemini": (60, 4),
+    "ollama": (600, 1),  # local GPU — one generation at a time
+}
+
+# Celery priorities (Redis transport: 0 = served first). Segments of the live
+# day are annotated ahead of backfill so the UI catches up first.
+LIVE_PRIORITY = 0
+BACKFILL_PRIORITY = 6
+
+LLM_MAX_RETRIES = 5
+_DEFAULT_RETRY_DELAY = 10
+# A leaked in-flight lease (worker killed mid-call) expires after this.
+_LEASE_TTL = 300
+
+# KEYS[1] bucket hash; ARGV: refill rate (tokens/s), capacity.
+# Returns "0" when a token was taken, else the seconds until one is available.
+_TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or capacity
+local ts = tonumber(b[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+# KEYS[1] lease zset (member = lease id, score = expiry); ARGV: limit, ttl, id.
+# Drops expired leases, then takes one if under the limit. Returns 1 / 0.
+_LEASE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+
+class RetryLater(Exception):
+    """The call was not made (or failed transiently); retry after ``countdown`` s.
+    ``deferred`` is True when no call was attempted (budget / concurrency /
+    cool-down), so the retry should not count as a failure."""
+
+    def __init__(self, countdown: float, reason: str = "", deferred: bool = False):
+        super().__init__(reason or f"retry in {countdown:.0f}s")
+        self.countdown = max(1, int(round(countdown)))
+        self.reason = reason
+        self.deferred = deferred
+
+
+def retry_llm_task(task, e: RetryLater) -> None:
+    """Re-queue a bound Celery task after ``e`` (raises celery's ``Retry``).
+
+    Deferrals retry without limit — the baseline blocked until budget was free,
+    and a backlog larger than the token bucket must not burn the task's retries.
+    Failed calls are counted in the ``llm_failures`` kwarg; once that passes
+    ``LLM_MAX_RETRIES`` this returns instead, and the caller gives up. Tasks
+    using it must be declared with ``max_retries=None`` and accept
+    ``llm_failures``.
+    """
+    kwargs = dict(task.request.kwargs or {})
+    if not e.deferred:
+        failures = int(kwargs.get("llm_failures", 0)) + 1
+        if failures > LLM_MAX_RETRIES:
+            return
+        kwargs["llm_failures"] = failures
+    raise task.retry(countdown=e.countdown, kwargs=kwargs)
+
+
+def retry_delay_for(e: Exception) -> tuple[float, bool]:
+    """Seconds to wait before retrying after ``e``, and whether it was a rate limit.
+
+    Understands Gemini ``ClientError`` details (``retryDelay``) and OpenAI-style
+    ``Retry-After`` headers without importing either SDK.
+    """
+    status = getattr(e, "code", None) or getattr(e, "status_code", None)
+    rate_limited = status == 429
+    delay: float = _DEFAULT_RETRY_DELAY
+
+    details = getattr(e, "details", None)
+    if isinstance(details, dict):
+        for detail in details.get("error", {}).get("details", []) or []:
+            if "retryDelay" in detail:
+                delay = int(str(detail["retryDelay"]).replace("s", "")) + 10
+                rate_limited = True
+
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                delay = float(retry_after) + 1
+                rate_limited = True
+            except ValueError:
+                pass
+    return delay, rate_limited
+
+
+def llm_priority(date: str) -> int:
+    """Celery priority for annotating a segment of ``date`` (YYYY-MM-DD)."""
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
+    return LIVE_PRIORITY if date >= yesterday else BACKFILL_PRIORITY
+
+
+def queued_at(request) -> Optional[float]:
+    """Publish time stamped by the ``before_task_publish`` hook in tasks/celery_app.py."""
+    value = getattr(request, "queued_at", None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get("queued_at")
+    return float(value) if value is not None else None
+
+
+class LLMDispatcher:
+    def __init__(self, provider: str):
+        rpm, concurrency = _DEFAULT_LIMITS.get(provider, (60, 2))
+        self.provider = provider
+        self.rpm = int(os.getenv(f"LLM_RPM_{provider.upper()}", rpm))
+        self.concurrency = int(os.getenv(f"LLM_CONCURRENCY_{provider.upper()}", concurrency))
+        self._bucket_key = f"llm:bucket:{provider}"
+        self._lease_key = f"llm:leases:{provider}"
+        self._cooldown_key = f"llm:cooldown:{provider}"
+        self._metrics_key = f"llm:metrics:{provider}"
+        self._take_token = redis_client.client.register_script(_TOKEN_BUCKET_LUA)
+        self._take_lease = redis_client.client.register_script(_LEASE_LUA)
+
+    def _record(self, **fields: int) -> None:
+        try:
+            pipe = redis_client.client.pipeline(transaction=False)
+            for name, amount in fields.items():
+                pipe.hincrby(self._metrics_key, name, int(amount))
+            pipe.execute()
+        except Exception as e:
+            logger.debug("llm metrics update failed: %s", e)
+
+    def _acquire(self) -> str:
+        """Take a rate token and an in-flight lease; returns the lease id."""
+        cooldown_ms = redis_client.client.pttl(self._cooldown_key)
+        if cooldown_ms and cooldown_ms > 0:
+            raise RetryLater(cooldown_ms / 1000 + random.uniform(0, 5), "provider cooling down", deferred=True)
+
+        wait = float(self._take_token(keys=[self._bucket_key], args=[self.rpm / 60, max(1, self.rpm // 6)]))
+        if wait > 0:
+            raise RetryLater(wait + random.uniform(0, 2), "rate budget exhausted", deferred=True)
+
+        lease = uuid.uuid4().hex
+        if not int(self._take_lease(keys=[self._lease_key], args=[self.concurrency, _LEASE_TTL, lease])):
+            raise RetryLater(random.uniform(2, 8), "concurrency limit reached", deferred=True)
+        return lease
+
+    @contextmanager
+    def slot(self, enqueued_at: Optional[float] = None):
+        """Gate one LLM call. Raises ``RetryLater`` instead of sleeping, both when
+        no budget is available and when the wrapped call fails transiently."""
+        try:
+            lease = self._acquire()
+        except RetryLater as e:
+            self._record(deferred=1)
+            logger.info("LLM %s call deferred %ss: %s", self.provider, e.countdown, e.reason)
+            raise
+
+        start = time.time()
+        if enqueued_at is not None:
+            self._record(queue_wait_ms=max(0, (start - enqueued_at) * 1000), queue_waits=1)
+        try:
+            yield
+        except (KeyboardInterrupt, RetryLater):
+            raise
+        except Exception as e:
+            delay, rate_limited = retry_delay_for(e)
+            if rate_limited:
+                # Make every worker back off, not just this one.
+                redis_client.client.set(self._cooldown_key, 1, px=int(delay * 1000))
+                self._record(rate_limited=1)
+            else:
+                self._record(errors=1)
+            raise RetryLater(delay, f"{type(e).__name__}: {e}") from e
+        finally:
+            redis_client.client.zrem(self._lease_key, lease)
+            self._record(calls=1, call_ms=(time.time() - start) * 1000)
+
+
+def llm_metrics() -> dict[str, dict]:
+    """Accumulated dispatcher metrics per provider, with averages."""
+    out: dict[str, dict] = {}
+    for provider in _DEFAULT_LIMITS:
+        raw = redis_client.client.hgetall(f"llm:metrics:{provider}")
+        if not raw:
+            continue
+        m = {k.decode(): int(v) for k, v in raw.items()}
+        calls, waits = m.get("calls", 0), m.get("queue_waits", 0)
+        m["avg_call_ms"] = round(m.get("call_ms", 0) / calls) if calls else 0
+        m["avg_queue_wait_ms"] = round(m.get("queue_wait_ms", 0) / waits) if waits else 0
+        out[provider] = m
+    return out
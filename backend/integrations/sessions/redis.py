@@ -1,9 +1,37 @@
 import redis
 import json
+import threading
+import time
+from collections import Counter
+
+
+class _CountingConnection(redis.Connection):
+    """Counts physical connects for core.connections' reuse metrics."""
+
+    def on_connect(self):
+        super().on_connect()
+        from core.connections import record_connection_opened
+        record_connection_opened("redis")
+
+
+# One pool per (host, port, db) per process, so every RedisClient() shares
+# sockets instead of each module holding its own pool. redis-py resets a pool
+# after fork on first use (pid check).
+_pools: dict[tuple, redis.ConnectionPool] = {}
+
+
+def _pool(host: str, port: int, db: int) -> redis.ConnectionPool:
+    key = (host, port, db)
+    if key not in _pools:
+        _pools[key] = redis.ConnectionPool(
+            host=host, port=port, db=db, connection_class=_CountingConnection
+        )
+    return _pools[key]
+
 
 class RedisClient:
     def __init__(self, host='localhost', port=6379, db=0):
-        self.client = redis.StrictRedis(host=host, port=port, db=db)
+        self.client = redis.StrictRedis(connection_pool=_pool(host, port, db))
 
     def set_value(self, key, value):
         self.client.set(key, value)
@@ -48,12 +76,120 @@ class RedisClient:
 redis_client = RedisClient()
 
 
+# ---------------------------------------------------------------------------
+# Versioned per-day caches
+# ---------------------------------------------------------------------------
+# Browse/day-nav entries embed a per-(device, date) version counter (plus a
+# global one for cross-day changes such as location relabels) in their key.
+# Invalidation is a single INCR: readers immediately build the new key, and the
+# orphaned entries age out on their own short TTL. No keyspace SCAN.
+
+_DAY_VERSION_TTL = 7 * 24 * 3600  # far longer than any cached entry's TTL
+_GLOBAL_VERSION_KEY = "cachever:global"
+_CACHE_STATS_KEY = "cache:stats"
+_STATS_FLUSH_EVERY = 50
+
+_stats: Counter = Counter()
+_stats_lock = threading.Lock()
+
+
+def _day_version_key(device: str, date: str) -> str:
+    return f"cachever:{device}:{date}"
+
+
+def record_cache_event(family: str, outcome: str) -> None:
+    with _stats_lock:
+        _stats[f"{family}:{outcome}"] += 1
+        if sum(_stats.values()) < _STATS_FLUSH_EVERY:
+            return
+        pending = dict(_stats)
+        _stats.clear()
+    try:
+        pipe = redis_client.client.pipeline(transaction=False)
+        for field, n in pending.items():
+            pipe.hincrby(_CACHE_STATS_KEY, field, n)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+class DayCache:
+    """One family of per-(device, date) cached JSON payloads."""
+
+    def __init__(self, family: str):
+        self.family = family
+
+    def key(self, device: str, date: str, *parts) -> str:
+        day_ver, global_ver = redis_client.client.mget(
+            _day_version_key(device, date), _GLOBAL_VERSION_KEY
+        )
+        version = f"{int(day_ver or 0)}.{int(global_ver or 0)}"
+        return ":".join([self.family, device, date, version, *map(str, parts)])
+
+    def get_json(self, key: str):
+        value = redis_client.get_json(key)
+        record_cache_event(self.family, "hit" if value is not None else "miss")
+        return value
+
+    def set_json(self, key: str, data, ttl_seconds: int) -> None:
+        redis_client.set_json_with_ttl(key, data, ttl_seconds)
+
+    def get_bytes(self, key: str) -> bytes | None:
+        """Raw cached payload (e.g. a pre-compressed response body)."""
+        value = redis_client.get_value(key)
+        record_cache_event(self.family, "hit" if value is not None else "miss")
+        return value
+
+    def set_bytes(self, key: str, data: bytes, ttl_seconds: int) -> None:
+        redis_client.set_with_ttl(key, data, ttl_seconds)
+
+
+def cache_stats() -> dict[str, dict]:
+    """Hit/miss counts and hit rate per cache family (flushed in batches)."""
+    out: dict[str, dict] = {}
+    for field, n in redis_client.client.hgetall(_CACHE_STATS_KEY).items():
+        family, outcome = field.decode().rsplit(":", 1)
+        out.setdefault(family, {"hit": 0, "miss": 0})[outcome] = int(n)
+    for counts in out.values():
+        total = counts["hit"] + counts["miss"]
+        counts["hit_rate"] = round(counts["hit"] / total, 3) if total else 0.0
+    return out
+
+
 def bust_day_caches(device: str, date: str) -> None:
-    """Delete every browse/day-nav cache for a device+date, across all key shapes:
-    browse:day:<dev>:<date>, browse:segment:<dev>:<date>:*, browse:<dev>:<date>:<hour>,
-    day-nav:v2:<dev>:<date>, segs_complete:<dev>:<date>. The glob `*` spans ':' so one
-    pattern per family covers every variant (and future cache-key version bumps).
-    """
-    redis_client.delete_pattern(f"browse:*{device}:{date}*")
-    redis_client.delete_pattern(f"day-nav:*{device}:{date}")
-    redis_client.delete_value(f"segs_complete:{device}:{date}")
+    """Invalidate every browse/day-nav cache for a device+date by bumping the
+    day's version (see DayCache), and drop the segs_complete marker."""
+    pipe = redis_client.client.pipeline(transaction=False)
+    pipe.incr(_day_version_key(device, date))
+    pipe.expire(_day_version_key(device, date), _DAY_VERSION_TTL)
+    pipe.delete(f"segs_complete:{device}:{date}")
+    pipe.execute()
+
+
+def bust_all_day_caches() -> None:
+    """Invalidate browse/day-nav caches for every device and day (e.g. after a
+    location relabel, whose names appear in any day's payload)."""
+    redis_client.client.incr(_GLOBAL_VERSION_KEY)
+
+
+# ---------------------------------------------------------------------------
+# Cross-process rate limiting
+# ---------------------------------------------------------------------------
+
+def throttle(name: str, interval_s: float) -> None:
+    """Block until ``interval_s`` has passed since the last ``throttle(name)``
+    call in ANY process on this Redis — the per-process ``_last_*`` timestamps
+    in the geocoder clients only space calls within one worker, so parallel
+    backfill workers would multiply the request rate. The slot is a
+    ``SET NX PX`` key; without Redis this returns immediately and the caller's
+    local spacing still applies."""
+    key = f"throttle:{name}"
+    ms = max(1, int(interval_s * 1000))
+    while True:
+        try:
+            if redis_client.client.set(key, 1, nx=True, px=ms):
+                return
+            wait_ms = redis_client.client.pttl(key)
+        except redis.RedisError:
+            return
+        time.sleep(max(wait_ms, 1) / 1000)
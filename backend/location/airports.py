@@ -10,15 +10,25 @@ frequently unavailable.  So airports are resolved from a bundled subset of the
 public-domain OurAirports dataset (large + medium fields) via point-in-radius.
 No network call → reliable.
 
+Airports are bucketed once into a CELL_DEG lat/lon grid. A query checks only
+the cells that can hold an airport within the largest footprint radius, so its
+cost does not grow with the size of the gazetteer. ``nearest_airports``
+resolves whole coordinate arrays in one vectorised pass.
+``location/benchmark_airports.py`` checks the index against a full scan.
+
 Public API:
-    nearest_airport(lat, lon) -> dict | None
+    nearest_airport(lat, lon)    -> dict | None
+    nearest_airports(lats, lons) -> list[dict | None]
 """
 
 import json
 import math
 import os
+from collections import defaultdict
 from functools import lru_cache
 
+import numpy as np
+
 _DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "airports.json")
 
 # Max distance (km) from the gazetteer reference point to still count as being
@@ -26,6 +36,15 @@ _DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "airports.json")
 # medium fields are tighter.  Airports sit far apart, so generous radii rarely
 # collide — and when they could, the nearest one wins.
 _RADIUS_KM = {"large": 6.0, "medium": 3.5}
+_DEFAULT_RADIUS_KM = 3.5
+_MAX_RADIUS_KM = max(_RADIUS_KM.values())
+
+# Grid cell size. A cell (≈11 km of latitude) is taller than the largest
+# footprint radius, so a query checks at most one row above and below; the
+# columns checked widen with latitude as meridians converge.
+CELL_DEG = 0.1
+_KM_PER_DEG = 111.195
+_EARTH_R_KM = 6371.0
 
 
 @lru_cache(maxsize=1)
@@ -34,6 +53,40 @@ def _airports() -> list[dict]:
         return json.load(f)
 
 
+@lru_cache(maxsize=1)
+def _index() -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[tuple[int, int], np.ndarray]]:
+    """(lat, lon, radius_km) arrays over the gazetteer, and its grid buckets:
+    cell → indices of the airports whose reference point lies in it."""
+    airports = _airports()
+    lat = np.array([a["lat"] for a in airports], dtype=float)
+    lon = np.array([a["lon"] for a in airports], dtype=float)
+    radius = np.array([_RADIUS_KM.get(a["type"], _DEFAULT_RADIUS_KM) for a in airports], dtype=float)
+    buckets: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for i, cell in enumerate(zip(np.floor(lat / CELL_DEG).astype(int), np.floor(lon / CELL_DEG).astype(int))):
+        buckets[(int(cell[0]), int(cell[1]))].append(i)
+    return lat, lon, radius, {k: np.asarray(v) for k, v in buckets.items()}
+
+
+_N_LON_CELLS = int(round(360 / CELL_DEG))
+
+
+@lru_cache(maxsize=4096)
+def _cell_candidates(row: int, col: int) -> np.ndarray:
+    """Indices of every airport that can contain a point in cell (row, col)."""
+    _, _, _, buckets = _index()
+    # Narrowest longitude degree over the three rows searched sets the width.
+    lat_edge = min(89.9, max(abs((row - 1) * CELL_DEG), abs((row + 2) * CELL_DEG)))
+    km_per_lon_deg = _KM_PER_DEG * math.cos(math.radians(lat_edge))
+    span = min(_N_LON_CELLS // 2, math.ceil(_MAX_RADIUS_KM / km_per_lon_deg / CELL_DEG))
+    found = [
+        buckets[(r, c)]
+        for r in (row - 1, row, row + 1)
+        for c in range(col - span, col + span + 1)
+        if (r, c) in buckets
+    ]
+    return np.concatenate(found) if found else np.zeros(0, dtype=int)
+
+
 def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     R = 6371.0
     p1, p2 = math.radians(lat1), math.radians(lat2)
@@ -43,19 +96,66 @@ def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return 2 * R * math.asin(math.sqrt(a))
 
 
+def nearest_airports(lats, lons) -> list[dict | None]:
+    """
+    ``nearest_airport`` for every (lat, lon) pair: each point is paired with
+    its grid cell's candidates, and all pairs are measured in one vectorised
+    haversine.
+    """
+    lat = np.asarray(lats, dtype=float).ravel()
+    lon = np.asarray(lons, dtype=float).ravel()
+    out: list[dict | None] = [None] * len(lat)
+    if not len(lat):
+        return out
+    a_lat, a_lon, a_radius, _ = _index()
+    airports = _airports()
+
+    cells = np.stack([np.floor(lat / CELL_DEG), np.floor(lon / CELL_DEG)], axis=1).astype(np.int64)
+    uniq, inverse = np.unique(cells, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    per_cell = [_cell_candidates(int(r), int(c)) for r, c in uniq]
+    cell_n = np.array([len(c) for c in per_cell])
+    if not cell_n.sum():
+        return out
+    flat = np.concatenate(per_cell)
+    cell_start = np.cumsum(cell_n) - cell_n
+
+    # (point, candidate) pairs: point k repeated once per candidate of its cell.
+    pt_n = cell_n[inverse]
+    pair_pt = np.repeat(np.arange(len(lat)), pt_n)
+    within = np.arange(len(pair_pt)) - np.repeat(np.cumsum(pt_n) - pt_n, pt_n)
+    pair_a = flat[np.repeat(cell_start[inverse], pt_n) + within]
+
+    p1, p2 = np.radians(lat[pair_pt]), np.radians(a_lat[pair_a])
+    dlam = np.radians(a_lon[pair_a] - lon[pair_pt])
+    h = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlam / 2) ** 2
+    d = 2 * _EARTH_R_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+    inside = d <= a_radius[pair_a]
+
+    # Nearest containing airport per point: sort the inside pairs by (point, d)
+    # and keep each point's first.
+    pair_pt, pair_a, d = pair_pt[inside], pair_a[inside], d[inside]
+    order = np.lexsort((d, pair_pt))
+    pair_pt, pair_a = pair_pt[order], pair_a[order]
+    first = np.concatenate(([True], pair_pt[1:] != pair_pt[:-1])) if len(pair_pt) else np.zeros(0, bool)
+    for k, i in zip(pair_pt[first].tolist(), pair_a[first].tolist()):
+        out[k] = airports[i]
+    return out
+
+
 def nearest_airport(lat: float, lon: float) -> dict | None:
     """
     Return the airport whose footprint contains this point, or None.
 
-    A coarse lat/lon box prefilter (~16 km) skips the haversine for all but a
-    handful of candidates, so the full-table scan stays cheap per call.
+    Only the airports bucketed around the point's grid cell are measured.
     """
+    airports = _airports()
+    _, _, a_radius, _ = _index()
     best: dict | None = None
     best_d: float | None = None
-    for a in _airports():
-        if abs(a["lat"] - lat) > 0.15 or abs(a["lon"] - lon) > 0.2:
-            continue
+    for i in _cell_candidates(math.floor(lat / CELL_DEG), math.floor(lon / CELL_DEG)).tolist():
+        a = airports[i]
         d = _haversine_km(lat, lon, a["lat"], a["lon"])
-        if d <= _RADIUS_KM.get(a["type"], 3.5) and (best_d is None or d < best_d):
+        if d <= a_radius[i] and (best_d is None or d < best_d):
             best, best_d = a, d
     return best
@@ -0,0 +1,152 @@
+"""
+backfill.py
+-----------
+Re-run the GPS pipeline over many (device, date) days in parallel.
+
+A backfill after an algorithm change used to call ``run_pipeline`` day by day,
+serially (``/location/process-gps?date=all``, ``recompute_modes.py``), which
+took hours. A backfill run here:
+
+- plans its days up front (``gps_days`` / ``plan``). A dry run reports which
+  days would change: their input signature differs from the last successful
+  run, or the run is forced.
+- fans the days out. ``tasks.start_gps_backfill`` uses a Celery group and
+  ``backfill_gps.py --workers N`` uses a local process pool; both call
+  ``run_day``.
+- checkpoints each completed day under the run id in Redis. Re-running the same
+  id skips what is already done, so an interrupted backfill resumes where it
+  stopped.
+- reports progress (``BackfillRun.progress``): counts of ok / failed / skipped
+  days and the total.
+
+Geocoder spacing holds across all workers: Nominatim and Overpass calls go
+through the shared Redis ``throttle``.
+"""
+
+import logging
+import time
+import uuid
+from datetime import date as date_cls
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.connections import connections
+from database.models import Device, RawGPS
+from integrations.sessions.redis import redis_client
+from location.gps_pipeline import _day_gps_signature, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+_RUN_TTL = 7 * 24 * 3600
+
+
+def gps_days(
+    session: Session,
+    devices: list[str] | None = None,
+    start: str | None = None,
+    end: str | None = None,
+) -> list[tuple[str, str]]:
+    """(device, date) pairs with raw GPS, oldest first, optionally limited to
+    ``devices`` and the inclusive YYYY-MM-DD range [start, end]."""
+    day = func.date(RawGPS.timestamp)
+    query = select(Device.device_id, day).join(Device, Device.id == RawGPS.device_id)
+    if devices:
+        query = query.where(Device.device_id.in_(devices))
+    if start:
+        query = query.where(day >= date_cls.fromisoformat(start))
+    if end:
+        query = query.where(day <= date_cls.fromisoformat(end))
+    rows = session.execute(query.distinct().order_by(day)).all()
+    return [(d, dt.strftime("%Y-%m-%d")) for d, dt in rows]
+
+
+def plan(session: Session, days: list[tuple[str, str]], force: bool = False) -> list[tuple[str, str]]:
+    """The subset of ``days`` a non-forced run would actually reprocess: those
+    whose input signature differs from the one stored by their last successful
+    run (see ``run_pipeline``). With ``force`` every day is reprocessed."""
+    if force:
+        return list(days)
+    keys = [f"gps_sig:{device}:{date}" for device, date in days]
+    stored = redis_client.client.mget(keys) if keys else []
+    return [
+        (device, date)
+        for (device, date), old in zip(days, stored)
+        if old is None or old.decode() != _day_gps_signature(session, device, date)
+    ]
+
+
+class BackfillRun:
+    """Checkpoint + progress counters of one backfill, in Redis under its id."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self._done = f"gps_backfill:{run_id}:done"
+        self._stats = f"gps_backfill:{run_id}"
+
+    @classmethod
+    def create(cls, total: int, modes_only: bool, force: bool, run_id: str | None = None) -> "BackfillRun":
+        """Start a run, or resume ``run_id``. A resumed run keeps its original
+        ``started`` time; its counters restart, and the days it already finished
+        count as ``skipped`` instead of being counted twice."""
+        run = cls(run_id or uuid.uuid4().hex[:12])
+        pipe = redis_client.client.pipeline(transaction=False)
+        pipe.hdel(run._stats, "ok", "failed", "skipped")
+        pipe.hset(run._stats, mapping={
+            "total": total, "modes_only": int(modes_only), "force": int(force),
+        })
+        pipe.hsetnx(run._stats, "started", int(time.time()))
+        pipe.expire(run._stats, _RUN_TTL)
+        pipe.execute()
+        return run
+
+    def is_done(self, device: str, date: str) -> bool:
+        return bool(redis_client.client.sismember(self._done, f"{device}/{date}"))
+
+    def record(self, device: str, date: str, outcome: str) -> None:
+        """Count one day as ``ok`` / ``failed`` / ``skipped``; ok and skipped
+        days are checkpointed so a resumed run does not repeat them."""
+        pipe = redis_client.client.pipeline(transaction=False)
+        pipe.hincrby(self._stats, outcome, 1)
+        if outcome != "failed":
+            pipe.sadd(self._done, f"{device}/{date}")
+            pipe.expire(self._done, _RUN_TTL)
+        pipe.execute()
+
+    def progress(self) -> dict:
+        raw = {k.decode(): v.decode() for k, v in redis_client.client.hgetall(self._stats).items()}
+        if not raw:
+            return {}
+        counts = {k: int(raw.get(k, 0)) for k in ("total", "ok", "failed", "skipped")}
+        finished = counts["ok"] + counts["failed"] + counts["skipped"]
+        elapsed = max(1, int(time.time()) - int(raw.get("started", time.time())))
+        return {
+            "run_id": self.run_id,
+            **counts,
+            "remaining": max(0, counts["total"] - finished),
+            "modes_only": raw.get("modes_only") == "1",
+            "force": raw.get("force") == "1",
+            "elapsed_s": elapsed,
+            "days_per_min": round(60 * finished / elapsed, 2),
+        }
+
+
+def run_day(run_id: str, device: str, date: str, modes_only: bool = False, force: bool = False) -> str:
+    """Run the pipeline for one day of backfill ``run_id`` and record the
+    outcome. Returns "ok", "failed" or "skipped" (already checkpointed)."""
+    run = BackfillRun(run_id)
+    if run.is_done(device, date):
+        run.record(device, date, "skipped")
+        return "skipped"
+    outcome = "ok"
+    with Session(connections.engine) as session:
+        try:
+            # modes_only clears the stored modes inside the pipeline's own
+            # transaction, so a failure here leaves them intact.
+            run_pipeline(session, device, date, modes_only=modes_only, force=force)
+        except Exception:
+            session.rollback()
+            outcome = "failed"
+            logger.exception("Backfill %s failed for %s/%s", run_id, device, date)
+    run.record(device, date, outcome)
+    return outcome
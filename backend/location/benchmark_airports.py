@@ -0,0 +1,114 @@
+"""
+benchmark_airports.py
+---------------------
+Check the grid-indexed airport lookup in location/airports.py against the
+original linear scan (kept below as the reference) and time both.
+
+Queries mix points jittered around random airports (inside, on the edge of and
+just outside their footprints) with points scattered over land and sea. Results
+are checked against an exact full scan; exits non-zero on any disagreement.
+
+Usage:
+    python -m location.benchmark_airports                  # 20k queries
+    python -m location.benchmark_airports --queries 200000 --no-reference
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+
+from location import airports as ap
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("benchmark_airports")
+
+
+def reference_nearest_airport(lat: float, lon: float) -> dict | None:
+    best: dict | None = None
+    best_d: float | None = None
+    for a in ap._airports():
+        if abs(a["lat"] - lat) > 0.15 or abs(a["lon"] - lon) > 0.2:
+            continue
+        d = ap._haversine_km(lat, lon, a["lat"], a["lon"])
+        if d <= ap._RADIUS_KM.get(a["type"], 3.5) and (best_d is None or d < best_d):
+            best, best_d = a, d
+    return best
+
+
+def exact_nearest_airport(lat: float, lon: float) -> dict | None:
+    """Full scan without the box prefilter: the reference's box is too narrow
+    in longitude near the poles, so correctness is checked against this."""
+    a_lat, a_lon, a_radius, _ = ap._index()
+    p1, p2 = np.radians(lat), np.radians(a_lat)
+    h = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(a_lon - lon) / 2) ** 2
+    d = 2 * 6371.0 * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+    d = np.where(d <= a_radius, d, np.inf)
+    best = int(np.argmin(d))
+    return ap._airports()[best] if np.isfinite(d[best]) else None
+
+
+def queries(n: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    airports = ap._airports()
+    near = n // 2
+    picks = rng.integers(0, len(airports), near)
+    # Up to ~9 km from the reference point: inside, across the radius, outside.
+    dist_deg = rng.uniform(0, 0.08, near)
+    bearing = rng.uniform(0, 2 * np.pi, near)
+    base_lat = np.array([airports[i]["lat"] for i in picks])
+    base_lon = np.array([airports[i]["lon"] for i in picks])
+    lat_near = base_lat + dist_deg * np.cos(bearing)
+    lon_near = base_lon + dist_deg * np.sin(bearing) / np.maximum(np.cos(np.radians(base_lat)), 0.2)
+    lat_far = rng.uniform(-60, 70, n - near)
+    lon_far = rng.uniform(-180, 180, n - near)
+    return np.concatenate([lat_near, lat_far]), np.concatenate([lon_near, lon_far])
+
+
+def _key(a: dict | None):
+    return None if a is None else a["id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-reference", action="store_true", help="time the index only")
+    args = parser.parse_args()
+
+    lat, lon = queries(args.queries, args.seed)
+    ap._index()  # build outside the timings, as a long-lived worker would
+
+    t0 = time.perf_counter()
+    single = [ap.nearest_airport(float(a), float(b)) for a, b in zip(lat, lon)]
+    t_single = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batched = ap.nearest_airports(lat, lon)
+    t_batch = time.perf_counter() - t0
+    n = len(lat)
+    logger.info("%d queries, %d inside an airport | index: %.1f µs/query single, %.1f µs/query batched",
+                n, sum(a is not None for a in batched), 1e6 * t_single / n, 1e6 * t_batch / n)
+
+    ok = [_key(a) for a in single] == [_key(a) for a in batched]
+    if not ok:
+        logger.error("single and batched lookups disagree")
+    if not args.no_reference:
+        t0 = time.perf_counter()
+        ref = [reference_nearest_airport(float(a), float(b)) for a, b in zip(lat, lon)]
+        t_ref = time.perf_counter() - t0
+        exact = [exact_nearest_airport(float(a), float(b)) for a, b in zip(lat, lon)]
+        diff = sum(_key(e) != _key(b) for e, b in zip(exact, batched))
+        if diff:
+            logger.error("%d lookups differ from the exact scan", diff)
+            ok = False
+        logger.info("reference scan: %.1f µs/query (%.0fx slower than batched), %d box-prefilter misses — %s",
+                    1e6 * t_ref / n, t_ref / max(t_batch, 1e-9),
+                    sum(_key(r) != _key(e) for r, e in zip(ref, exact)),
+                    "identical" if not diff else "MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
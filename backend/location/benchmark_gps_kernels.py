@@ -0,0 +1,254 @@
+"""
+benchmark_gps_kernels.py
+------------------------
+Check the numpy kernels in location/gps_kernels.py against the original
+per-point loops (kept below as the reference) and time both.
+
+Tracks are synthetic 1 Hz days (stays with drift and brief excursions, walks,
+drives, teleports and multipath spikes), or a recorded device/day from Postgres.
+Exits non-zero if any kernel disagrees with its reference.
+
+Usage:
+    python -m location.benchmark_gps_kernels                       # 10k/50k/200k
+    python -m location.benchmark_gps_kernels --sizes 50000 --no-reference
+    python -m location.benchmark_gps_kernels --device allie --date 2026-06-14
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+
+from location import gps_kernels as gk
+from location.gps_kernels import haversine_distance
+from location.gps_pipeline import (
+    EXCURSION_GRACE, MIN_SPEED_DT, SPEED_THRESHOLD, SPIKE_OFFSET_M, SPIKE_RATIO,
+    STAY_DIST, STAY_TIME,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("benchmark_gps_kernels")
+
+_M_PER_DEG = 111_320.0
+
+
+# ─── Reference: the original loops ───────────────────────────────────────────
+
+def reference_stay_points(lat, lon, ts, dist_thresh=STAY_DIST, time_thresh=STAY_TIME,
+                          excursion_grace=EXCURSION_GRACE):
+    n = len(lat)
+    cluster = np.full(n, -1, dtype=int)
+
+    def _secs(a, b):
+        return (ts[b] - ts[a]) / np.timedelta64(1, "s")
+
+    stay_id = 0
+    i = 0
+    while i < n:
+        last_in = i
+        j = i + 1
+        while j < n:
+            d = haversine_distance(lat[i], lon[i], lat[j], lon[j], 0, 0)
+            if d <= dist_thresh:
+                last_in = j
+                j += 1
+                continue
+            k = j
+            returned = False
+            while k < n and _secs(j, k) <= excursion_grace:
+                if haversine_distance(lat[i], lon[i], lat[k], lon[k], 0, 0) <= dist_thresh:
+                    returned = True
+                    break
+                k += 1
+            if returned:
+                last_in = k
+                j = k + 1
+            else:
+                break
+        if _secs(i, last_in) >= time_thresh:
+            cluster[i:last_in + 1] = stay_id
+            stay_id += 1
+            i = last_in + 1
+        else:
+            i += 1
+    return cluster
+
+
+def reference_speed_outliers(lat, lon, alt, ts, threshold_ms=SPEED_THRESHOLD):
+    n = len(lat)
+    keep = np.ones(n, dtype=bool)
+    if n <= 2:
+        return keep
+
+    def _dist(a, b):
+        return haversine_distance(lat[a], lon[a], lat[b], lon[b], alt[a], alt[b])
+
+    def _speed(a, b):
+        dt = (ts[b] - ts[a]) / np.timedelta64(1, "s")
+        return np.inf if dt <= 0 else _dist(a, b) / dt
+
+    last = 0
+    for i in range(1, n):
+        if _speed(last, i) <= threshold_ms:
+            last = i
+            continue
+        j = i + 1
+        if j < n and _speed(i, j) <= threshold_ms and _speed(last, j) > threshold_ms:
+            keep[last] = False
+            last = i
+        else:
+            keep[i] = False
+
+    idx = np.flatnonzero(keep).tolist()
+    for a, b, c in zip(idx, idx[1:], idx[2:]):
+        d_in, d_out, chord = _dist(a, b), _dist(b, c), _dist(a, c)
+        detour = d_in + d_out - chord
+        if min(d_in, d_out) > SPIKE_OFFSET_M and detour > SPIKE_RATIO * max(chord, SPIKE_OFFSET_M):
+            keep[b] = False
+    return keep
+
+
+def reference_kinematics(ts, lat, lon, alt):
+    n = len(lat)
+    span = haversine_distance(lat[0], lon[0], lat[-1], lon[-1], alt[0], alt[-1])
+    path = 0.0
+    for i in range(1, n):
+        path += haversine_distance(lat[i - 1], lon[i - 1], lat[i], lon[i], alt[i - 1], alt[i])
+    straightness = span / path if path > 0 else 1.0
+    speeds = []
+    anchor = 0
+    for i in range(1, n):
+        dt = (ts[i] - ts[anchor]) / np.timedelta64(1, "s")
+        if dt < MIN_SPEED_DT:
+            continue
+        speeds.append(haversine_distance(lat[anchor], lon[anchor], lat[i], lon[i], alt[anchor], alt[i]) / dt)
+        anchor = i
+    if not speeds:
+        dt = (ts[-1] - ts[0]) / np.timedelta64(1, "s")
+        return (span / dt if dt > 0 else 0.0), span, straightness
+    return float(np.percentile(speeds, 85)), span, straightness
+
+
+# ─── Inputs ──────────────────────────────────────────────────────────────────
+
+def synthetic_track(n: int, seed: int = 0):
+    """A 1 Hz track alternating stays (±8 m drift, occasional 80 m excursions),
+    walks and drives, with a sprinkling of teleports and multipath spikes."""
+    rng = np.random.default_rng(seed)
+    east = np.empty(n)
+    north = np.empty(n)
+    x = y = 0.0
+    i = 0
+    stay = True
+    while i < n:
+        kind = "stay" if stay else rng.choice(["walk", "drive"], p=[0.7, 0.3])
+        stay = not stay
+        length = min(n - i, int(rng.integers(120, 1800)))
+        if kind == "stay":
+            east[i:i + length] = x + rng.normal(0, 8, length)
+            north[i:i + length] = y + rng.normal(0, 8, length)
+            for _ in range(length // 600):
+                s = i + int(rng.integers(0, length))
+                east[s:s + int(rng.integers(3, 40))] += 80
+        else:
+            speed = 1.4 if kind == "walk" else 15.0
+            heading = rng.uniform(0, 2 * np.pi)
+            steps = speed + rng.normal(0, 0.3, length)
+            turn = np.cumsum(rng.normal(0, 0.05, length)) + heading
+            east[i:i + length] = x + np.cumsum(steps * np.cos(turn)) + rng.normal(0, 4, length)
+            north[i:i + length] = y + np.cumsum(steps * np.sin(turn)) + rng.normal(0, 4, length)
+        x, y = east[i + length - 1], north[i + length - 1]
+        i += length
+
+    glitches = rng.choice(n, size=max(1, n // 2000), replace=False)
+    east[glitches] += rng.choice([150.0, 5000.0], size=len(glitches))
+
+    lat0, lon0 = 53.35, -6.26
+    lat = lat0 + north / _M_PER_DEG
+    lon = lon0 + east / (_M_PER_DEG * np.cos(np.radians(lat0)))
+    alt = 20 + np.cumsum(rng.normal(0, 0.05, n))
+    ts = np.datetime64("2026-06-14T00:00:00", "ns") + (np.arange(n) * 1_000_000_000).astype("timedelta64[ns]")
+    return lat, lon, alt, ts
+
+
+def recorded_track(device: str, date: str):
+    import os
+    from dotenv import load_dotenv
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from location.gps_pipeline import load_all_points
+
+    load_dotenv()
+    Session = sessionmaker(bind=create_engine(os.environ["PG_URI"]))
+    with Session() as session:
+        df = load_all_points(session, device, date)
+    return (
+        df["latitude"].to_numpy(dtype=float),
+        df["longitude"].to_numpy(dtype=float),
+        df["elevation"].fillna(0.0).to_numpy(dtype=float),
+        df["timestamp"].values,
+    )
+
+
+# ─── Runner ──────────────────────────────────────────────────────────────────
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def run(label: str, lat, lon, alt, ts, reference: bool) -> bool:
+    ts_ns = gk.as_ns(ts)
+    keep, t_keep = _timed(gk.speed_outlier_mask, lat, lon, alt, ts_ns,
+                          SPEED_THRESHOLD, SPIKE_OFFSET_M, SPIKE_RATIO)
+    f_lat, f_lon, f_alt, f_ts = lat[keep], lon[keep], alt[keep], ts[keep]
+    stays, t_stay = _timed(gk.stay_point_labels, f_lat, f_lon, ts_ns[keep],
+                           STAY_DIST, STAY_TIME, EXCURSION_GRACE)
+    kin, t_kin = _timed(gk.track_kinematics, ts_ns[keep], f_lat, f_lon, f_alt, MIN_SPEED_DT)
+    logger.info("%s: %d fixes, %d dropped, %d stays | kernels: outliers %.2fs, stays %.2fs, kinematics %.3fs",
+                label, len(keep), int((~keep).sum()), int(stays.max(initial=-1)) + 1, t_keep, t_stay, t_kin)
+    if not reference:
+        return True
+
+    ref_keep, r_keep = _timed(reference_speed_outliers, lat, lon, alt, ts)
+    ref_stays, r_stay = _timed(reference_stay_points, f_lat, f_lon, f_ts)
+    ref_kin, r_kin = _timed(reference_kinematics, f_ts, f_lat, f_lon, f_alt)
+    ok = True
+    if not np.array_equal(ref_keep, keep):
+        logger.error("%s: outlier mask differs at %d points", label, int((ref_keep != keep).sum()))
+        ok = False
+    if not np.array_equal(ref_stays, stays):
+        logger.error("%s: stay labels differ at %d points", label, int((ref_stays != stays).sum()))
+        ok = False
+    if not np.allclose(ref_kin, kin, rtol=1e-9, atol=1e-9):
+        logger.error("%s: kinematics differ: %s vs %s", label, ref_kin, kin)
+        ok = False
+    logger.info("%s: reference: outliers %.2fs, stays %.2fs, kinematics %.3fs — %s",
+                label, r_keep, r_stay, r_kin, "identical" if ok else "MISMATCH")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--device", help="benchmark a recorded day instead of synthetic tracks")
+    parser.add_argument("--date", help="YYYY-MM-DD, with --device")
+    parser.add_argument("--no-reference", action="store_true",
+                        help="time the kernels only (the reference loops take minutes at 200k)")
+    args = parser.parse_args()
+
+    if args.device:
+        cases = [(f"{args.device}/{args.date}", recorded_track(args.device, args.date))]
+    else:
+        cases = [(f"synthetic {n}", synthetic_track(n, args.seed)) for n in args.sizes]
+
+    ok = all([run(label, *track, reference=not args.no_reference) for label, track in cases])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
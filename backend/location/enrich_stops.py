@@ -6,19 +6,30 @@ Geocode GPS segments using:
   2. Wikidata                          — description + P31 type labels
   3. Nominatim (zoom=10)               — city-level clusters for move "A → B" names
 
+Every lookup goes through the persistent ``geocode_cache`` first; the network
+calls themselves live on ``geocoders`` so tests can swap in local stand-ins
+(``use_geocoders``).
+
 Public API:
     enrich_stop(lat, lon)                       → dict
     enrich_move(gps_pts, fallback_lat, fallback_lon) → dict
+    prewarm_geocode_cache(session)              → dict
 """
 
 import logging
 import time
+from dataclasses import dataclass
+from typing import Callable
 
 import numpy as np
 import requests
 from sklearn.cluster import DBSCAN
+from sqlalchemy import select
 
+from database.models import Location
 from location.airports import nearest_airport
+from location.geocode_cache import geo_cell, geocode_cache
+from integrations.sessions.redis import throttle
 
 logger = logging.getLogger(__name__)
 
@@ -57,14 +68,15 @@ _SUBURB_KEYS = (
 _NOM_URL = "https://nominatim.openstreetmap.org/reverse"
 _NOM_RATE = 1.1   # seconds between requests (Nominatim policy: max 1 req/s)
 _last_nom: float = 0.0
-_nom_cache: dict = {}
 
 # ─── Overpass ─────────────────────────────────────────────────────────────────
 
 _OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 _OVERPASS_RATE = 2.0
 _last_overpass: float = 0.0
-_overpass_cache: dict[tuple, str] = {}
+# Cells whose Overpass call failed in this process — not retried until restart
+# (errors are never written to the persistent cache).
+_overpass_failed: set[str] = set()
 
 # Nominatim OSM classes that indicate a non-POI result — road, bench, boundary, etc.
 _NON_POI_CLASSES = {"highway", "boundary", "waterway", "natural", "place"}
@@ -88,20 +100,14 @@ is_in({lat},{lon})->.a;
 out 5;"""
 
 
-def overpass_named_place(lat: float, lon: float) -> str:
-    """
-    Find the named POI area that actually contains this point.
-    Uses is_in — only matches if the point is geometrically inside the polygon.
-    Returns the place name string, or "" if not inside any known POI area.
-    """
+def _fetch_overpass_named_place(lat: float, lon: float) -> str | None:
+    """Overpass ``is_in`` query (rate-limited). "" when inside no named area,
+    None on error."""
     global _last_overpass
-    cache_key = (round(lat, 4), round(lon, 4))
-    if cache_key in _overpass_cache:
-        return _overpass_cache[cache_key]
-
     wait = _OVERPASS_RATE - (time.monotonic() - _last_overpass)
     if wait > 0:
         time.sleep(wait)
+    throttle("overpass", _OVERPASS_RATE)
 
     query = _OVERPASS_QUERY_TMPL.format(lat=lat, lon=lon)
     try:
@@ -111,23 +117,53 @@ def overpass_named_place(lat: float, lon: float) -> str:
         _last_overpass = time.monotonic()
     except Exception as exc:
         logger.warning("Overpass error at (%.5f, %.5f): %s", lat, lon, exc)
-        _overpass_cache[cache_key] = ""
-        return ""
+        return None
 
-    name = ""
     for el in elements:
         n = el.get("tags", {}).get("name", "")
         if n:
-            name = n
-            break
+            return n
+    return ""
 
-    _overpass_cache[cache_key] = name
-    return name
 
+def overpass_named_place(lat: float, lon: float) -> str:
+    """
+    Find the named POI area that actually contains this point.
+    Uses is_in — only matches if the point is geometrically inside the polygon.
+    Returns the place name string, or "" if not inside any known POI area.
+    """
+    cell = geo_cell(lat, lon, 18)
+    if cell in _overpass_failed:
+        return ""
+    name = geocode_cache.lookup(
+        "overpass", cell, 0, lambda: geocoders.overpass_named_place(lat, lon),
+    )
+    if name is None:
+        _overpass_failed.add(cell)
+    return name or ""
 
-def nominatim_reverse(lat: float, lon: float, zoom: int = 14, extratags: bool = False) -> dict:
-    """Rate-limited Nominatim reverse geocode. Returns raw JSON dict or {}."""
+
+def _fetch_nominatim(params: dict) -> dict | None:
+    """Rate-limited Nominatim reverse call. Raw JSON dict, or None on error."""
     global _last_nom
+    wait = _NOM_RATE - (time.monotonic() - _last_nom)
+    if wait > 0:
+        time.sleep(wait)
+    throttle("nominatim", _NOM_RATE)
+
+    try:
+        r = requests.get(_NOM_URL, params=params, headers=_HEADERS, timeout=10)
+        r.raise_for_status()
+        raw = r.json()
+        _last_nom = time.monotonic()
+    except Exception as exc:
+        logger.warning("Nominatim error at (%.5f, %.5f): %s", params["lat"], params["lon"], exc)
+        return None
+    return raw
+
+
+def nominatim_reverse(lat: float, lon: float, zoom: int = 14, extratags: bool = False) -> dict:
+    """Cached, rate-limited Nominatim reverse geocode. Returns raw JSON dict or {}."""
     if zoom > 18:
         zoom = 18
 
@@ -142,14 +178,6 @@ def nominatim_reverse(lat: float, lon: float, zoom: int = 14, extratags: bool =
         lat = round(lat, 5)
         lon = round(lon, 5)
 
-    cache_key = (lat, lon, zoom, extratags)
-    if cache_key in _nom_cache:
-        return _nom_cache[cache_key]
-
-    wait = _NOM_RATE - (time.monotonic() - _last_nom)
-    if wait > 0:
-        time.sleep(wait)
-
     params: dict = {
         "lat": lat, "lon": lon, "format": "json",
         "zoom": zoom, "addressdetails": 1,
@@ -157,17 +185,12 @@ def nominatim_reverse(lat: float, lon: float, zoom: int = 14, extratags: bool =
     if extratags:
         params["extratags"] = 1
 
-    try:
-        r = requests.get(_NOM_URL, params=params, headers=_HEADERS, timeout=10)
-        r.raise_for_status()
-        raw = r.json()
-        _last_nom = time.monotonic()
-    except Exception as exc:
-        logger.warning("Nominatim error at (%.5f, %.5f): %s", lat, lon, exc)
-        return {}
-
-    _nom_cache[cache_key] = raw
-    return raw
+    raw = geocode_cache.lookup(
+        "nominatim+extratags" if extratags else "nominatim",
+        geo_cell(lat, lon, zoom), zoom,
+        lambda: geocoders.nominatim(params),
+    )
+    return raw or {}
 
 
 def _enclosing_area(lat: float, lon: float) -> dict:
@@ -218,7 +241,6 @@ def _parse_admin(raw: dict) -> dict:
 # ─── Wikidata ─────────────────────────────────────────────────────────────────
 
 _WD_API = "https://www.wikidata.org/w/api.php"
-_wd_cache: dict[str, dict] = {}
 
 # Common P31 (instance-of) QIDs → human label; unknown QIDs pass through as-is
 _P31_LABELS: dict[str, str] = {
@@ -233,13 +255,9 @@ _P31_LABELS: dict[str, str] = {
 }
 
 
-def wikidata_fetch(qid: str) -> dict:
-    """
-    Fetch English label, description, and P31 (instance-of) types for a QID.
-    Returns {} on error.
-    """
-    if qid in _wd_cache:
-        return _wd_cache[qid]
+def _fetch_wikidata(qid: str) -> dict | None:
+    """English label, description, and P31 (instance-of) types for a QID, or
+    None on error."""
     try:
         r = requests.get(
             _WD_API,
@@ -255,8 +273,7 @@ def wikidata_fetch(qid: str) -> dict:
         entity = r.json().get("entities", {}).get(qid, {})
     except Exception as exc:
         logger.warning("Wikidata error for %s: %s", qid, exc)
-        _wd_cache[qid] = {}
-        return {}
+        return None
 
     label = entity.get("labels", {}).get("en", {}).get("value", "")
     description = entity.get("descriptions", {}).get("en", {}).get("value", "")
@@ -267,9 +284,36 @@ def wikidata_fetch(qid: str) -> dict:
     ]
     instance_of = [_P31_LABELS.get(q, q) for q in p31_qids]
 
-    result = {"label": label, "description": description, "instance_of": instance_of}
-    _wd_cache[qid] = result
-    return result
+    return {"label": label, "description": description, "instance_of": instance_of}
+
+
+def wikidata_fetch(qid: str) -> dict:
+    """
+    Fetch English label, description, and P31 (instance-of) types for a QID.
+    Returns {} on error.
+    """
+    return geocode_cache.lookup("wikidata", qid, 0, lambda: geocoders.wikidata(qid)) or {}
+
+
+# ─── Network geocoders (swappable) ────────────────────────────────────────────
+
+@dataclass
+class Geocoders:
+    """The network calls behind the cache. Each returns None on failure."""
+    nominatim: Callable[[dict], dict | None] = _fetch_nominatim
+    overpass_named_place: Callable[[float, float], str | None] = _fetch_overpass_named_place
+    wikidata: Callable[[str], dict | None] = _fetch_wikidata
+
+
+geocoders = Geocoders()
+
+
+def use_geocoders(replacement: Geocoders) -> Geocoders:
+    """Swap the network geocoders (e.g. for local stand-ins in tests); returns
+    the previous set so it can be restored."""
+    global geocoders
+    previous, geocoders = geocoders, replacement
+    return previous
 
 
 # ─── Move segment helpers ─────────────────────────────────────────────────────
@@ -565,3 +609,32 @@ def enrich_move(
         "postcode": "",
         "address": "",
     }
+
+
+# ─── Cache pre-warm ───────────────────────────────────────────────────────────
+
+def prewarm_geocode_cache(session, limit: int | None = None) -> dict:
+    """Fill the geocode cache for every known stop ``Location`` (its centroid's
+    Nominatim/Overpass lookups, as ``enrich_stop`` makes them, plus its Wikidata
+    entity), so the pipeline's first pass over familiar places makes no network
+    calls. Already-cached cells cost one table read each."""
+    stmt = (
+        select(Location.latitude, Location.longitude, Location.wikidata_id)
+        .where(Location.stop.is_(True), Location.latitude.isnot(None), Location.longitude.isnot(None))
+        .order_by(Location.id)
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    rows = session.execute(stmt).all()
+
+    done = 0
+    for lat, lon, qid in rows:
+        try:
+            enrich_stop(lat, lon)
+            if qid:
+                wikidata_fetch(qid)
+            done += 1
+        except Exception as exc:
+            logger.warning("prewarm failed at (%.5f, %.5f): %s", lat, lon, exc)
+    logger.info("Geocode cache pre-warmed for %d/%d locations", done, len(rows))
+    return {"locations": len(rows), "warmed": done}
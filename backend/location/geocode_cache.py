@@ -0,0 +1,197 @@
+"""
+geocode_cache.py
+----------------
+Persistent cache in front of every reverse-geocode / POI network lookup
+(Nominatim, Overpass, Wikidata).
+
+The per-process dicts this replaces vanished on every worker restart, so a
+forced ``run_pipeline`` re-geocoded the same home/work stops every day, sleeping
+for the Nominatim rate limit each time. Entries now live in the
+``geocode_cache`` table, shared by the API and Celery processes, with a small
+in-process LRU in front of it.
+
+- Keys are (provider, geohash cell, zoom). The cell precision follows the zoom
+  (``precision_for_zoom``), so a stop centroid that jitters by a few metres from
+  day to day lands on the cached answer.
+- Empty answers are cached too (negative caching), for NEGATIVE_TTL. A fetch
+  that fails (returns ``None``) is never cached, so it is retried next time.
+- Hits/misses are counted per provider with ``record_cache_event`` and show up
+  in ``cache_stats()`` as ``geocode:<provider>``.
+
+The network calls are passed in by the caller (see ``enrich_stops.Geocoders``),
+and the store can be swapped for ``MemoryGeocodeStore`` in tests.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy.dialects.postgresql import insert
+
+from database.models import GeocodeCacheEntry
+from integrations.sessions.redis import record_cache_event
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_TTL = timedelta(days=90)
+NEGATIVE_TTL = timedelta(days=7)
+_L1_SIZE = 4096
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat: float, lon: float, precision: int) -> str:
+    """Standard base32 geohash of (lat, lon)."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    out = []
+    bits, ch, even = 0, 0, True
+    while len(out) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch, lon_lo = (ch << 1) | 1, mid
+            else:
+                ch, lon_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = (ch << 1) | 1, mid
+            else:
+                ch, lat_hi = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def precision_for_zoom(zoom: int) -> int:
+    """Geohash precision whose cell roughly matches what a lookup at ``zoom``
+    resolves: ~1.2 km for city level (≤10), ~150 m for suburb/area (≤16),
+    ~38×19 m for a venue (zoom 18)."""
+    if zoom <= 10:
+        return 6
+    if zoom <= 16:
+        return 7
+    return 8
+
+
+def geo_cell(lat: float, lon: float, zoom: int) -> str:
+    return geohash(lat, lon, precision_for_zoom(zoom))
+
+
+def _is_negative(payload) -> bool:
+    # Nominatim answers "nothing here" with {"error": "Unable to geocode"}.
+    return not payload or (isinstance(payload, dict) and "error" in payload)
+
+
+class PostgresGeocodeStore:
+    """``geocode_cache`` table access, one short session per call."""
+
+    def __init__(self, session_factory=None):
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def get(self, provider: str, cell: str, zoom: int) -> tuple[Any, datetime] | None:
+        with self._session() as session:
+            row = session.get(GeocodeCacheEntry, (provider, cell, zoom))
+            if row is None or row.expires_at <= datetime.now(timezone.utc):
+                return None
+            return row.payload, row.expires_at
+
+    def put(self, provider: str, cell: str, zoom: int, payload, expires_at: datetime) -> None:
+        now = datetime.now(timezone.utc)
+        stmt = insert(GeocodeCacheEntry).values(
+            provider=provider, cell=cell, zoom=zoom,
+            payload=payload, fetched_at=now, expires_at=expires_at,
+        ).on_conflict_do_update(
+            index_elements=["provider", "cell", "zoom"],
+            set_={"payload": payload, "fetched_at": now, "expires_at": expires_at},
+        )
+        with self._session() as session:
+            session.execute(stmt)
+            session.commit()
+
+
+class MemoryGeocodeStore:
+    """In-process stand-in for ``PostgresGeocodeStore`` (tests, scripts)."""
+
+    def __init__(self):
+        self.rows: dict[tuple, tuple[Any, datetime]] = {}
+
+    def get(self, provider: str, cell: str, zoom: int):
+        hit = self.rows.get((provider, cell, zoom))
+        if hit is None or hit[1] <= datetime.now(timezone.utc):
+            return None
+        return hit
+
+    def put(self, provider: str, cell: str, zoom: int, payload, expires_at: datetime) -> None:
+        self.rows[(provider, cell, zoom)] = (payload, expires_at)
+
+
+class GeocodeCache:
+    def __init__(self, store=None, l1_size: int = _L1_SIZE):
+        self.store = store or PostgresGeocodeStore()
+        self._l1: OrderedDict = OrderedDict()
+        self._l1_size = l1_size
+        self._lock = threading.Lock()
+
+    def _remember(self, key: tuple, payload, expires_at: datetime) -> None:
+        with self._lock:
+            self._l1[key] = (payload, expires_at.timestamp())
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_size:
+                self._l1.popitem(last=False)
+
+    def lookup(self, provider: str, cell: str, zoom: int, fetch: Callable[[], Any]):
+        """Cached value for the key, else ``fetch()`` stored under it.
+
+        ``fetch`` returns the provider's answer (empty for "nothing here") or
+        ``None`` when the call failed; failures are passed through uncached.
+        A broken store degrades to calling ``fetch`` every time.
+        """
+        key = (provider, cell, zoom)
+        family = f"geocode:{provider}"
+        with self._lock:
+            hit = self._l1.get(key)
+            if hit is not None and hit[1] > time.time():
+                self._l1.move_to_end(key)
+                record_cache_event(family, "hit")
+                return hit[0]
+
+        try:
+            stored = self.store.get(*key)
+        except Exception as e:
+            logger.debug("geocode cache read failed for %s: %s", key, e)
+            stored = None
+        if stored is not None:
+            payload, expires_at = stored
+            self._remember(key, payload, expires_at)
+            record_cache_event(family, "hit")
+            return payload
+
+        record_cache_event(family, "miss")
+        payload = fetch()
+        if payload is None:
+            return None
+        ttl = NEGATIVE_TTL if _is_negative(payload) else POSITIVE_TTL
+        expires_at = datetime.now(timezone.utc) + ttl
+        try:
+            self.store.put(*key, payload, expires_at)
+        except Exception as e:
+            logger.debug("geocode cache write failed for %s: %s", key, e)
+        self._remember(key, payload, expires_at)
+        return payload
+
+
+geocode_cache = GeocodeCache()
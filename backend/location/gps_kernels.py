@@ -0,0 +1,229 @@
+"""Array kernels for the per-point steps of the GPS pipeline.
+
+Stay-point detection, the teleport/spike outlier passes and segment kinematics
+used to walk each track in Python, calling a scalar haversine for every pair —
+including a look-ahead scan of the whole excursion-grace window for each anchor —
+so a full day of 1 Hz phone GPS took tens of seconds. The functions here keep the
+exact semantics of those loops but evaluate distances as whole numpy slices:
+
+- stay points: haversine from the anchor to a window of following fixes at once,
+  with the grace rule checked over the in-radius chain instead of point by point,
+- teleport pass: consecutive speeds are precomputed, so the sequential anchor
+  walk only runs scalar checks around the (rare) jumps,
+- spike pass and kinematics: fully vectorised,
+- segments and image matching: run-length boundaries of the label/place
+  columns, and one ``searchsorted`` matching every image to its nearest fix.
+
+Everything takes plain arrays (timestamps as int64 nanoseconds, see ``as_ns``) so
+the kernels carry no pandas overhead; ``location/benchmark_gps_kernels.py``
+checks them against the original loops and times them.
+"""
+import numpy as np
+
+
+def haversine_distance(lat1, lon1, lat2, lon2, alt1, alt2):
+    """Distance in metres between two lat/lon points."""
+    R = 6_371_000
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = np.radians(lat2 - lat1)
+    dlam = np.radians(lon2 - lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    d = 2 * R * np.arcsin(np.sqrt(a))
+
+    # Apply vertical (altitude) distance
+    if alt1 is None or alt2 is None:
+        alt1 = alt2 = 0
+    dz = alt2 - alt1
+    return np.sqrt(d ** 2 + dz ** 2)
+
+
+def as_ns(ts) -> np.ndarray:
+    """datetime64 timestamps (any unit) → int64 nanoseconds."""
+    return np.asarray(ts).astype("datetime64[ns]").astype(np.int64)
+
+
+def stay_point_labels(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    ts_ns: np.ndarray,
+    dist_thresh: float,
+    time_thresh: float,
+    excursion_grace: float,
+) -> np.ndarray:
+    """Stay label per point (-1 = move, 0,1,2,… per stay) for one time-ordered
+    track. Same rule as ``gps_pipeline.detect_stay_points``.
+
+    For an anchor ``i`` the in-radius points after it form a chain; the stay
+    follows the chain while each hop over out-of-radius points returns within
+    ``excursion_grace`` seconds of the first point it skipped. Distances are
+    computed for a window of fixes at a time, starting at about twice the grace
+    window and doubling until the chain's end is known.
+    """
+    n = len(lat)
+    cluster = np.full(n, -1, dtype=int)
+    if n == 0:
+        return cluster
+    window_ns = int(2 * excursion_grace * 1e9)
+
+    def _stay_end(i: int) -> int:
+        end = max(int(np.searchsorted(ts_ns, ts_ns[i] + window_ns, side="right")), i + 16)
+        while True:
+            end = min(end, n)
+            d = haversine_distance(lat[i], lon[i], lat[i + 1:end], lon[i + 1:end], 0, 0)
+            chain = np.concatenate(([i], np.flatnonzero(d <= dist_thresh) + i + 1))
+            prev, nxt = chain[:-1], chain[1:]
+            # A hop over out-of-radius points must land within the grace window
+            # of the first point it skipped (prev + 1), else the stay ends at prev.
+            ok = (nxt == prev + 1) | ((ts_ns[nxt] - ts_ns[prev + 1]) / 1e9 <= excursion_grace)
+            broken = np.flatnonzero(~ok)
+            if broken.size:
+                return int(prev[broken[0]])
+            last_in = int(chain[-1])
+            if end == n:
+                return last_in
+            # Everything after last_in in the window is out of radius; once the
+            # window reaches past the grace period nothing later can rejoin.
+            if last_in < end - 1 and (ts_ns[end] - ts_ns[last_in + 1]) / 1e9 > excursion_grace:
+                return last_in
+            end = i + 1 + 2 * (end - i)
+
+    stay_id = 0
+    i = 0
+    while i < n:
+        last_in = _stay_end(i)
+        if (ts_ns[last_in] - ts_ns[i]) / 1e9 >= time_thresh:
+            cluster[i:last_in + 1] = stay_id
+            stay_id += 1
+            i = last_in + 1
+        else:
+            i += 1
+    return cluster
+
+
+def speed_outlier_mask(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    alt: np.ndarray,
+    ts_ns: np.ndarray,
+    threshold_ms: float,
+    spike_offset_m: float,
+    spike_ratio: float,
+) -> np.ndarray:
+    """Keep-mask for one time-ordered track: teleport pass (last-good anchor +
+    look-ahead) then round-trip spike pass, as in
+    ``gps_pipeline.filter_speed_outliers``."""
+    n = len(lat)
+    keep = np.ones(n, dtype=bool)
+    if n <= 2:
+        return keep
+
+    def _dist(a, b):
+        return haversine_distance(lat[a], lon[a], lat[b], lon[b], alt[a], alt[b])
+
+    def _speed(a: int, b: int) -> float:
+        dt = (ts_ns[b] - ts_ns[a]) / 1e9
+        return np.inf if dt <= 0 else _dist(a, b) / dt
+
+    dt = np.diff(ts_ns) / 1e9
+    hop = _dist(slice(0, n - 1), slice(1, n))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        step_speed = np.concatenate(([0.0], np.where(dt > 0, hop / np.where(dt > 0, dt, 1.0), np.inf)))
+    jumps = np.flatnonzero(step_speed > threshold_ms)
+
+    # ── Teleport pass ──
+    # While the anchor is the previous point, speed(last, i) is step_speed[i],
+    # so skip straight to the next precomputed jump; only after a drop (anchor
+    # lagging behind) are speeds checked one by one until it catches up.
+    last, i = 0, 1
+    while i < n:
+        if last == i - 1:
+            pos = int(np.searchsorted(jumps, i))
+            if pos == len(jumps):
+                break
+            i = int(jumps[pos])
+            last = i - 1
+        elif _speed(last, i) <= threshold_ms:
+            last = i
+            i += 1
+            continue
+        j = i + 1
+        if j < n and step_speed[j] <= threshold_ms and _speed(last, j) > threshold_ms:
+            keep[last] = False
+            last = i
+        else:
+            keep[i] = False
+        i += 1
+
+    # ── Spike pass over the survivors (no cascading: judged on the same idx) ──
+    idx = np.flatnonzero(keep)
+    if len(idx) >= 3:
+        a, b, c = idx[:-2], idx[1:-1], idx[2:]
+        d_in, d_out, chord = _dist(a, b), _dist(b, c), _dist(a, c)
+        detour = d_in + d_out - chord
+        spike = (np.minimum(d_in, d_out) > spike_offset_m) & (
+            detour > spike_ratio * np.maximum(chord, spike_offset_m)
+        )
+        keep[b[spike]] = False
+    return keep
+
+
+def track_kinematics(
+    ts_ns: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    alt: np.ndarray,
+    min_speed_dt: float,
+) -> tuple[float, float, float]:
+    """(p85 chord speed m/s, span m, straightness) of a time-ordered window of
+    at least two fixes — the body of ``gps_pipeline._window_kinematics``."""
+    span = float(haversine_distance(lat[0], lon[0], lat[-1], lon[-1], alt[0], alt[-1]))
+    path = float(haversine_distance(lat[:-1], lon[:-1], lat[1:], lon[1:], alt[:-1], alt[1:]).sum())
+    straightness = span / path if path > 0 else 1.0
+
+    # Speed-sample anchors: each is the first fix ≥ min_speed_dt after the last.
+    n = len(ts_ns)
+    nxt = np.searchsorted(ts_ns, ts_ns + int(round(min_speed_dt * 1e9)), side="left")
+    nxt = np.maximum(nxt, np.arange(1, n + 1))
+    anchors = [0]
+    while nxt[anchors[-1]] < n:
+        anchors.append(int(nxt[anchors[-1]]))
+    if len(anchors) < 2:
+        # Window too short to fill one speed baseline: overall chord speed.
+        dt = (ts_ns[-1] - ts_ns[0]) / 1e9
+        return (span / dt if dt > 0 else 0.0), span, straightness
+
+    a, b = np.asarray(anchors[:-1]), np.asarray(anchors[1:])
+    speeds = haversine_distance(lat[a], lon[a], lat[b], lon[b], alt[a], alt[b]) / ((ts_ns[b] - ts_ns[a]) / 1e9)
+    return float(np.percentile(speeds, 85)), span, straightness
+
+
+def run_starts(label: np.ndarray, place: np.ndarray) -> np.ndarray:
+    """Start index of each segment run in one time-ordered track: a new run
+    begins wherever the stop/move label changes, or where the place changes
+    inside a stop run (back-to-back stays at two places). Moves never split on
+    place — their place_id is None/NaN."""
+    n = len(label)
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    prev_stop = label[:-1] == 1
+    changed = (label[1:] != label[:-1]) | (prev_stop & (place[1:] != place[:-1]))
+    return np.concatenate(([0], np.flatnonzero(changed) + 1))
+
+
+def nearest_fix(point_ns: np.ndarray, image_ns: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Match every image timestamp to the sorted GPS fixes at once.
+
+    Returns ``(j, nearest, gap_ns)``: the insertion index of each image
+    (``bisect_left``, so ``j - 1`` / ``j`` are its left / right fixes), the
+    index of the closer of the two (the right one on a tie), and the absolute
+    time gap to it in nanoseconds. ``point_ns`` must be non-empty.
+    """
+    n = len(point_ns)
+    j = np.searchsorted(point_ns, image_ns, side="left")
+    left = np.maximum(j - 1, 0)
+    right = np.minimum(j, n - 1)
+    d_left = np.abs(image_ns - point_ns[left])
+    d_right = np.abs(point_ns[right] - image_ns)
+    use_right = (j < n) & ((j == 0) | (d_right <= d_left))
+    nearest = np.where(use_right, right, left)
+    return j, nearest, np.where(use_right, d_right, d_left)
@@ -1,20 +1,24 @@
-import bisect
 from collections import Counter, defaultdict
 import logging
+import time
 import uuid
 import pandas as pd
 import numpy as np
-from datetime import timedelta, timezone
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 from sklearn.cluster import DBSCAN
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm.session import Session
-from sqlalchemy import case, delete, func, or_, select, update
+from sqlalchemy import case, delete, false, func, or_, select, update
+from database.bulk import log_rate, stage_rows
 from database.models import RawGPS, Device, ImageGPS, Image, Location, GpsStopSegment
 from location.enrich_stops import enrich_stop, enrich_move
 from location import poi_gazetteer as pgaz
-from location.utils import find_timezone
+from location import timezones as tzs
 from location import transport_mode as tmode
+from location import gps_kernels as gk
+from location.known_places import KnownPlaces
+from location.gps_kernels import haversine_distance
 
 from services.segmentation import load_all_segments
 from integrations.sessions.redis import redis_client
@@ -66,20 +70,62 @@ MERGE_EPS = 0.15 / 6371    # ~150 m
 
 # ─── Step 1: Load all points for a device/date into a single DataFrame ─────────
 
-def load_all_points(session: Session, device: str, date: str) -> pd.DataFrame:
-    # date is expected in 'YYYY-MM-DD' format; adjust as needed
-    stmt = select(RawGPS).join(Device, Device.id == RawGPS.device_id).where(Device.device_id == device, func.date(RawGPS.timestamp) == date).order_by(RawGPS.timestamp)
-    all_points = session.execute(stmt).scalars().all()
-    all_points = [p.__dict__ for p in all_points]  # Convert ORM objects to dicts
-    if not all_points:
+# Only the columns the pipeline reads — no ORM objects, no instance state.
+RAW_GPS_COLUMNS = (
+    RawGPS.latitude,
+    RawGPS.longitude,
+    RawGPS.elevation,
+    RawGPS.timestamp,
+    RawGPS.timezone,
+    RawGPS.accuracy,
+)
+
+
+def day_bounds(date: str, tz: str | None = None) -> tuple[datetime, datetime]:
+    """Half-open naive-UTC ``[start, end)`` of calendar day ``date`` (YYYY-MM-DD)
+    as seen in ``tz``. raw_gps timestamps are stored naive UTC, so the default
+    (UTC) matches the former ``date(timestamp) = date`` filter; a range compare
+    lets Postgres drive the scan from the (device_id, timestamp) unique index
+    instead of evaluating date() on every row of the device."""
+    day = datetime.strptime(date, "%Y-%m-%d")
+    zone = ZoneInfo(tz) if tz else timezone.utc
+    start, end = (
+        d.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+        for d in (day, day + timedelta(days=1))
+    )
+    return start, end
+
+
+def load_all_points(session: Session, device: str, date: str, tz: str | None = None,
+                    since: datetime | None = None) -> pd.DataFrame:
+    """The day's raw fixes, time-ordered; from ``since`` (naive UTC) onward
+    when given, for an incremental run."""
+    start, end = day_bounds(date, tz)
+    if since is not None:
+        start = max(start, since)
+    result = session.execute(
+        select(*RAW_GPS_COLUMNS)
+        .join(Device, Device.id == RawGPS.device_id)
+        .where(Device.device_id == device, RawGPS.timestamp >= start, RawGPS.timestamp < end)
+        .order_by(RawGPS.timestamp)
+    )
+    rows = result.all()
+    if not rows:
         return pd.DataFrame(columns=["latitude", "longitude", "elevation", "timestamp"])
 
-    df = pd.DataFrame(all_points)
-    df.sort_values("timestamp", inplace=True)
+    # Build the frame column-wise straight from the result tuples.
+    columns = dict(zip(result.keys(), zip(*rows)))
+    df = pd.DataFrame({
+        "latitude": np.asarray(columns["latitude"], dtype=float),
+        "longitude": np.asarray(columns["longitude"], dtype=float),
+        "elevation": np.asarray(columns["elevation"], dtype=float),
+        "timestamp": pd.to_datetime(columns["timestamp"]),
+        "timezone": pd.Series(columns["timezone"], dtype=object),
+        "accuracy": np.asarray(columns["accuracy"], dtype=float),
+    })
     # add date column as "YYYY-MM-DD" string for easier merging later
     df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d")
     df["formatted_time"] = df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
-    df.reset_index(drop=True, inplace=True)
     return df
 
 # ─── Step 1b: Quality gate — drop low-accuracy fixes ─────────────────────────
@@ -121,22 +167,6 @@ def assign_tracks_by_gap(df: pd.DataFrame, gap_seconds: int = GAP_SECONDS) -> pd
 
 # ─── Step 3: Filter speed outliers ───────────────────────────────────────────
 
-def haversine_distance(lat1, lon1, lat2, lon2, alt1, alt2):
-    """Distance in metres between two lat/lon points."""
-    R = 6_371_000
-    phi1, phi2 = np.radians(lat1), np.radians(lat2)
-    dphi = np.radians(lat2 - lat1)
-    dlam = np.radians(lon2 - lon1)
-    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
-    d = 2 * R * np.arcsin(np.sqrt(a))
-
-    # Apply vertical (altitude) distance
-    if alt1 is None or alt2 is None:
-        alt1 = alt2 = 0
-    dz = alt2 - alt1
-    return np.sqrt(d ** 2 + dz ** 2)
-
-
 def filter_speed_outliers(df: pd.DataFrame, threshold_ms: float = SPEED_THRESHOLD) -> pd.DataFrame:
     """
     Drop GPS outliers per track in two passes:
@@ -161,45 +191,13 @@ def filter_speed_outliers(df: pd.DataFrame, threshold_ms: float = SPEED_THRESHOL
             rows.append(grp)
             continue
 
-        lat = grp["latitude"].values
-        lon = grp["longitude"].values
-        alt = grp["elevation"].fillna(0.0).values
-        ts  = grp["timestamp"].values
-
-        def _seconds(a: int, b: int) -> float:
-            return (ts[b] - ts[a]) / np.timedelta64(1, "s")
-
-        def _dist(a: int, b: int) -> float:
-            return haversine_distance(lat[a], lon[a], lat[b], lon[b], alt[a], alt[b])
-
-        def _speed(a: int, b: int) -> float:
-            dt = _seconds(a, b)
-            return np.inf if dt <= 0 else _dist(a, b) / dt
-
-        # ── Pass 1: teleport removal with last-good anchor + look-ahead ──
-        keep = np.ones(n, dtype=bool)
-        last = 0
-        for i in range(1, n):
-            if _speed(last, i) <= threshold_ms:
-                last = i
-                continue
-            # Jump from anchor. If the next sample agrees with i but not with the
-            # anchor, the anchor was the outlier; otherwise i is.
-            j = i + 1
-            if j < n and _speed(i, j) <= threshold_ms and _speed(last, j) > threshold_ms:
-                keep[last] = False
-                last = i
-            else:
-                keep[i] = False
-
-        # ── Pass 2: round-trip spike removal over the survivors ──
-        idx = np.flatnonzero(keep).tolist()
-        for a, b, c in zip(idx, idx[1:], idx[2:]):
-            d_in, d_out, chord = _dist(a, b), _dist(b, c), _dist(a, c)
-            detour = d_in + d_out - chord
-            if min(d_in, d_out) > SPIKE_OFFSET_M and detour > SPIKE_RATIO * max(chord, SPIKE_OFFSET_M):
-                keep[b] = False
-
+        keep = gk.speed_outlier_mask(
+            grp["latitude"].to_numpy(dtype=float),
+            grp["longitude"].to_numpy(dtype=float),
+            grp["elevation"].fillna(0.0).to_numpy(dtype=float),
+            gk.as_ns(grp["timestamp"].values),
+            threshold_ms, SPIKE_OFFSET_M, SPIKE_RATIO,
+        )
         rows.append(grp[keep])
 
     if not rows:
@@ -233,51 +231,12 @@ def detect_stay_points(
     (no DBSCAN-style chaining), while the grace window keeps a single stay from
     being split into stop→walk→stop by transient jitter.
     """
-    n = len(grp)
-    cluster = np.full(n, -1, dtype=int)
-    lat = grp["latitude"].values
-    lon = grp["longitude"].values
-    ts = grp["timestamp"].values  # numpy datetime64[ns]
-
-    def _secs(a, b):
-        return (ts[b] - ts[a]) / np.timedelta64(1, "s")
-
-    stay_id = 0
-    i = 0
-    while i < n:
-        last_in = i             # last point confirmed within dist_thresh of anchor i
-        j = i + 1
-        while j < n:
-            d = haversine_distance(lat[i], lon[i], lat[j], lon[j], 0, 0)
-            if d <= dist_thresh:
-                last_in = j
-                j += 1
-                continue
-            # Out of radius: peek ahead — does the track return to the anchor
-            # within the grace window? If so, absorb the excursion as drift.
-            k = j
-            returned = False
-            while k < n and _secs(j, k) <= excursion_grace:
-                if haversine_distance(lat[i], lon[i], lat[k], lon[k], 0, 0) <= dist_thresh:
-                    returned = True
-                    break
-                k += 1
-            if returned:
-                last_in = k     # points j..k are drift belonging to this stay
-                j = k + 1
-            else:
-                break           # genuine departure — stay ends at last_in
-
-        # Stay spans anchor i .. last_in inclusive.
-        dwell = _secs(i, last_in)
-        if dwell >= time_thresh:
-            cluster[i:last_in + 1] = stay_id
-            stay_id += 1
-            i = last_in + 1     # resume after the stay (drift points consumed)
-        else:
-            i += 1              # too brief — anchor moves on by one point
-
-    return cluster
+    return gk.stay_point_labels(
+        grp["latitude"].to_numpy(dtype=float),
+        grp["longitude"].to_numpy(dtype=float),
+        gk.as_ns(grp["timestamp"].values),
+        dist_thresh, time_thresh, excursion_grace,
+    )
 
 
 def annotate_track(grp: pd.DataFrame) -> pd.DataFrame:
@@ -535,62 +494,64 @@ def build_segments(df: pd.DataFrame) -> tuple[pd.DataFrame, list[dict]]:
     Collapse consecutive same-label rows (within each track) into segments.
     Returns a list of dicts with keys:
         track_id, start, end, label, centroid_lat, centroid_lon, place_id
+
+    Run boundaries come from run-length encoding the label/place columns
+    (``gps_kernels.run_starts``) and each segment's stats are computed on array
+    slices, not per-row DataFrame lookups.
     """
     segments = []
 
     for track_id, grp in df.groupby("track_id"):
-        grp = grp.sort_values("timestamp").reset_index(drop=True)
-        seg_start = 0
-
-        for i in range(1, len(grp) + 1):
-            boundary = (
-                i == len(grp)
-                or grp.loc[i, "label_smooth"] != grp.loc[seg_start, "label_smooth"]
-            )
-            # Within a stop run, also break when place_id changes so two
-            # back-to-back stays (no move point between them) don't collapse
-            # into one segment with a blended centroid. Only checked for stops,
-            # where place_id is always a valid string — avoids NaN!=NaN on moves.
-            if not boundary and grp.loc[seg_start, "label_smooth"] == 1:
-                boundary = grp.loc[i, "place_id"] != grp.loc[seg_start, "place_id"]
-
-
-
-            if boundary:
-                seg = grp.iloc[seg_start:i]
-                # Remove outliers from the segment before calculating centroid and other stats
-                lat_vals = seg["latitude"].values
-                lon_vals = seg["longitude"].values
-                lat_mask = remove_outliers(lat_vals)
-                lon_mask = remove_outliers(lon_vals)
-                # Accuracy-weight the centroid by the horizontal accuracy radius
-                # (1/accuracy²) so a few loose urban-canyon fixes don't drag a stop
-                # off its true venue. None when accuracy is absent → plain mean,
-                # matching prior behaviour.
-                w = _accuracy_weights(seg["accuracy"].values) if "accuracy" in seg else None
-
-                entry = {
-                    "track_id":     track_id,
-                    "start":        seg["formatted_time"].iloc[0],
-                    "end":          seg["formatted_time"].iloc[-1],
-                    "start_ts":     seg["timestamp"].iloc[0],
-                    "end_ts":       seg["timestamp"].iloc[-1],
-                    "is_stop":      seg["label_smooth"].iloc[0],
-                    "centroid_lat": _weighted_mean(lat_vals, lat_mask, w),
-                    "centroid_lon": _weighted_mean(lon_vals, lon_mask, w),
-                    "centroid_alt": seg["elevation"].mean(),
-                    "start_lat":    seg["latitude"].iloc[0],
-                    "start_lon":    seg["longitude"].iloc[0],
-                    "start_alt":    seg["elevation"].iloc[0],
-                    "end_lat":      seg["latitude"].iloc[-1],
-                    "end_lon":      seg["longitude"].iloc[-1],
-                    "end_alt":      seg["elevation"].iloc[-1],
-                    "n_points":     len(seg),
-                    "place_id":     seg["place_id"].iloc[0] if "place_id" in seg else None,
-                    "interpolated": seg["interpolated"].mode()[0] if "interpolated" in seg else None,
-                }
-                segments.append(entry)
-                seg_start = i
+        grp = grp.sort_values("timestamp")
+        label = grp["label_smooth"].to_numpy()
+        has_place = "place_id" in grp
+        place = grp["place_id"].to_numpy(dtype=object) if has_place else np.full(len(grp), None, dtype=object)
+        lat = grp["latitude"].to_numpy(dtype=float)
+        lon = grp["longitude"].to_numpy(dtype=float)
+        alt = grp["elevation"].to_numpy(dtype=float)
+        ts = grp["timestamp"].to_numpy()
+        ftime = grp["formatted_time"].to_numpy(dtype=object)
+        # Accuracy-weight the centroid by the horizontal accuracy radius
+        # (1/accuracy²) so a few loose urban-canyon fixes don't drag a stop
+        # off its true venue. None when accuracy is absent → plain mean,
+        # matching prior behaviour.
+        accuracy = grp["accuracy"].to_numpy(dtype=float) if "accuracy" in grp else None
+        interp = grp["interpolated"].to_numpy(dtype=bool) if "interpolated" in grp else None
+
+        starts = gk.run_starts(label, place)
+        ends = np.append(starts[1:], len(grp))
+        for s, e in zip(starts.tolist(), ends.tolist()):
+            # Remove outliers from the segment before calculating centroid and other stats
+            lat_vals, lon_vals, alt_vals = lat[s:e], lon[s:e], alt[s:e]
+            w = _accuracy_weights(accuracy[s:e]) if accuracy is not None else None
+            alt_known = alt_vals[~np.isnan(alt_vals)]
+            if interp is not None:
+                # Majority vote; a tie goes to False (Series.mode()[0] order).
+                n_interp = int(interp[s:e].sum())
+                interpolated = n_interp > (e - s) - n_interp
+            else:
+                interpolated = None
+
+            segments.append({
+                "track_id":     track_id,
+                "start":        ftime[s],
+                "end":          ftime[e - 1],
+                "start_ts":     pd.Timestamp(ts[s]),
+                "end_ts":       pd.Timestamp(ts[e - 1]),
+                "is_stop":      label[s],
+                "centroid_lat": _weighted_mean(lat_vals, remove_outliers(lat_vals), w),
+                "centroid_lon": _weighted_mean(lon_vals, remove_outliers(lon_vals), w),
+                "centroid_alt": alt_known.mean() if len(alt_known) else np.nan,
+                "start_lat":    lat_vals[0],
+                "start_lon":    lon_vals[0],
+                "start_alt":    alt_vals[0],
+                "end_lat":      lat_vals[-1],
+                "end_lon":      lon_vals[-1],
+                "end_alt":      alt_vals[-1],
+                "n_points":     e - s,
+                "place_id":     place[s] if has_place else None,
+                "interpolated": interpolated,
+            })
 
     # Sort segments by start time, then stitch away spurious drift moves that
     # split one visit into stop→move→stop at the same place.
@@ -601,142 +562,113 @@ def build_segments(df: pd.DataFrame) -> tuple[pd.DataFrame, list[dict]]:
 
 
 # ─── Step 7: Assign GPS points to images based on timestamp proximity ────────────────
-def assign_gps_to_images(session, date, device, points, point_timestamps):
-    # Assign GPS data to images
-    images = session.execute(
-        select(Image.id, Image.image_path, Image.timestamp).where(
-            Image.device == device,
-            Image.date == date
-        )
+NEAREST_MAX_GAP_S = 60     # seconds — beyond this an image's position is interpolated
+
+
+def assign_gps_to_images(session, date, device, df: pd.DataFrame,
+                         since: datetime | None = None) -> list[dict]:
+    """
+    One row per image of the day with its GPS position: the nearest fix when one
+    lies within NEAREST_MAX_GAP_S, otherwise interpolated between the fixes either
+    side (great-circle for flight gaps, linear otherwise) or clamped to the only
+    side there is.
+
+    ``df`` is the day's processed, time-sorted point frame. All images are
+    matched with a single ``np.searchsorted`` over the int64 timestamps and
+    interpolated as arrays; only the flight check and slerp (few gaps) run per
+    item. With ``since``, only images from then on are matched (incremental run).
+    """
+    query = select(Image.id, Image.image_path, Image.timestamp).where(
+        Image.device == device,
+        Image.date == date
+    )
+    if since is not None:
+        query = query.where(Image.timestamp >= since)
+    images = session.execute(query).all()
+    if len(images) == 0 or len(df) == 0:
+        return []  # No images (or no GPS) for this date, skip processing
+
+    p_ts = df["timestamp"].to_numpy()
+    p_ns = gk.as_ns(p_ts)
+    p_lat = df["latitude"].to_numpy(dtype=float)
+    p_lon = df["longitude"].to_numpy(dtype=float)
+    p_alt = df["elevation"].to_numpy(dtype=float)
+    p_tz = df["timezone"].to_numpy(dtype=object) if "timezone" in df else np.full(len(df), None, dtype=object)
+    p_ftime = df["formatted_time"].to_numpy(dtype=object)
+    p_track = df["track_id"].to_numpy(dtype=object)
+    p_interp = df["interpolated"].to_numpy(dtype=object) if "interpolated" in df else np.full(len(df), None, dtype=object)
+
+    # ensure naive datetimes for comparison
+    img_dt = [image.timestamp.replace(tzinfo=None) for image in images]
+    img_ns = gk.as_ns(np.array(img_dt, dtype="datetime64[ns]"))
+
+    n = len(p_ns)
+    j, nearest, gap_ns = gk.nearest_fix(p_ns, img_ns)
+    has_left, has_right = j > 0, j < n
+    left, right = np.maximum(j - 1, 0), np.minimum(j, n - 1)
+
+    far = gap_ns > NEAREST_MAX_GAP_S * 1_000_000_000
+    # Far from any fix: take the left side's fix (right when there is no left)
+    # and interpolate between the two when both exist.
+    src = np.where(far, np.where(has_left, left, right), nearest)
+    lat, lon, alt = p_lat[src], p_lon[src], p_alt[src]
+
+    total_s = (p_ns[right] - p_ns[left]) / 1e9
+    between = far & has_left & has_right & (total_s > 0)
+    ratio = np.zeros(len(images))
+    ratio[between] = ((img_ns - p_ns[left]) / 1e9)[between] / total_s[between]
+    lat = np.where(between, p_lat[left] + ratio * (p_lat[right] - p_lat[left]), lat)
+    lon = np.where(between, p_lon[left] + ratio * (p_lon[right] - p_lon[left]), lon)
+    alt = np.where(between, p_alt[left] + ratio * (p_alt[right] - p_alt[left]), alt)
+
+    # Flight hops curve over hundreds of km, so a straight lat/lon blend would
+    # place mid-flight images far off the real path. Slerp along the great
+    # circle instead when both ends are airports (or the hop is unambiguously
+    # airborne). is_flight_pair does two airport-polygon lookups — once per gap.
+    for gap_j in np.unique(j[between]).tolist():
+        a, b = gap_j - 1, gap_j
+        if not tmode.is_flight_pair(p_lat[a], p_lon[a], p_lat[b], p_lon[b], (p_ns[b] - p_ns[a]) / 1e9):
+            continue
+        for k in np.flatnonzero(between & (j == gap_j)).tolist():
+            lat[k], lon[k] = tmode.great_circle_point(p_lat[a], p_lon[a], p_lat[b], p_lon[b], ratio[k])
+
+    logger.debug(
+        "assign_gps_to_images %s/%s: %d images, within_30s=%d within_60s=%d gap_too_large=%d",
+        device, date, len(images), int((gap_ns <= 30_000_000_000).sum()),
+        int(((gap_ns > 30_000_000_000) & ~far).sum()), int(far.sum()),
     )
-    images = list(images)
-    if len(images) == 0:
-        return []  # No images for this date, skip processing
 
-    stats = Counter()
-    gaps = []  # track actual time deltas for distribution insight
     rows = []
-    # Memoize the flight decision per GPS gap (keyed by the right point's index).
-    # Many consecutive images interpolate within the same (left, right) pair, and
-    # is_flight_pair does two airport-polygon lookups — compute it once per gap.
-    flight_gap_cache: dict[int, bool] = {}
-
-    for image in images:
-        img_ts = image.timestamp.replace(
-            tzinfo=None
-        )  # ensure naive datetime for comparison
-
-        # Find insertion point
-        j = bisect.bisect_left(point_timestamps, img_ts)
-
-        # Get candidates either side
-        candidates = []
-        if j < len(points):
-            candidates.append(points[j])
-        if j > 0:
-            candidates.append(points[j - 1])
-
-        if not candidates:
-            stats["no_gps_data"] += 1
-            continue  # No GPS data at all
-
-        closest = min(candidates, key=lambda p: abs(p["timestamp"] - img_ts))
-        closest = closest.copy()  # avoid mutating original point
-        gap_s = abs(closest["timestamp"] - img_ts)
-        gaps.append(gap_s)
-
-        if gap_s <= timedelta(seconds=30):
-            stats["within_30s"] += 1
-        elif gap_s <= timedelta(seconds=60):
-            stats["within_60s"] += 1
-        else:
-            stats["gap_too_large"] += 1
-            # interpolation could be done here
-            left = points[j - 1] if j > 0 else None
-            right = points[j] if j < len(points) else None
-            closest = left.copy() if left else right.copy() if right else None
-            assert closest is not None, "Logic error: at least one candidate should exist"
-            if left and right:
-                total_gap = (right["timestamp"] - left["timestamp"]).total_seconds()
-                if total_gap > 0:
-                    img_gap = (img_ts - left["timestamp"]).total_seconds()
-                    ratio = img_gap / total_gap
-                    # Flight hops curve over hundreds of km, so a straight lat/lon
-                    # blend would place mid-flight images far off the real path.
-                    # Slerp along the great circle instead when both ends are
-                    # airports (or the hop is unambiguously airborne).
-                    is_flight = flight_gap_cache.get(j)
-                    if is_flight is None:
-                        is_flight = tmode.is_flight_pair(
-                            left["latitude"], left["longitude"],
-                            right["latitude"], right["longitude"], total_gap,
-                        )
-                        flight_gap_cache[j] = is_flight
-                    if is_flight:
-                        lat_i, lon_i = tmode.great_circle_point(
-                            left["latitude"], left["longitude"],
-                            right["latitude"], right["longitude"], ratio,
-                        )
-                    else:
-                        lat_i = left["latitude"] + ratio * (right["latitude"] - left["latitude"])
-                        lon_i = left["longitude"] + ratio * (right["longitude"] - left["longitude"])
-                    closest.update(
-                        {
-                            "latitude": lat_i,
-                            "longitude": lon_i,
-                            "elevation": left["elevation"]
-                            + ratio * (right["elevation"] - left["elevation"]),
-                            "timestamp": img_ts,
-                            "date": date,
-                            "interpolated": True,
-                            "track_id": left["track_id"],  # assign to left track by default
-                        }
-                    )
-                else:
-                    closest.update(
-                        {
-                            "latitude": left["latitude"],
-                            "longitude": left["longitude"],
-                            "elevation": left["elevation"],
-                            "timestamp": img_ts,
-                            "interpolated": True,
-                            "track_id": left["track_id"],  # assign to left track by default
-                        }
-                    )
-            elif left:
-                closest.update(
-                    {
-                        "latitude": left["latitude"],
-                        "longitude": left["longitude"],
-                        "elevation": left["elevation"],
-                        "timestamp": img_ts,
-                        "interpolated": True,
-                        "track_id": left["track_id"],  # assign to left track by default
-                    }
-                )
-            elif right:
-                closest.update(
-                    {
-                        "latitude": right["latitude"],
-                        "longitude": right["longitude"],
-                        "elevation": right["elevation"],
-                        "timestamp": img_ts,
-                        "interpolated": True,
-                        "track_id": right["track_id"],  # assign to right track by default
-                    }
-                )
-            else:
-                logger.warning(
-                    f"Warning: No GPS data to interpolate for image {image.image_path} at {img_ts}"
-                )
+    for k, image in enumerate(images):
+        p = int(src[k])
+        rows.append({
+            "image_id":       image.id,
+            "image_path":     image.image_path,
+            "date":           date,
+            "latitude":       float(lat[k]),
+            "longitude":      float(lon[k]),
+            "elevation":      float(alt[k]),
+            "timestamp":      img_dt[k] if far[k] else pd.Timestamp(p_ts[p]),
+            "timezone":       p_tz[p],
+            "formatted_time": p_ftime[p],
+            "track_id":       p_track[p],
+            "interpolated":   True if far[k] else p_interp[p],
+            "gaps_s":         gap_ns[k] / 1e9,
+        })
+    return rows
 
-        closest["image_id"] = image.id
-        closest["image_path"] = image.image_path
-        closest["gaps_s"] = gap_s.total_seconds()
-        closest["date"] = date
-        rows.append(closest)
 
-    return rows
+_IMAGE_TZ_STAGE = {
+    "id": "uuid",
+    "timezone": "text",
+    "local_timestamp": "timestamptz",
+    "year": "int4",
+    "month": "int4",
+    "day": "int4",
+    "hour": "int4",
+    "seconds_from_midnight": "int4",
+    "date": "text",
+}
 
 
 def _apply_timezone_to_images(session, tz_by_image_id: dict) -> int:
@@ -752,45 +684,37 @@ def _apply_timezone_to_images(session, tz_by_image_id: dict) -> int:
         return 0
 
     ids = list(tz_by_image_id.keys())
-    utc_by_id = {
-        r.id: r.timestamp
-        for r in session.execute(select(Image.id, Image.timestamp).where(Image.id.in_(ids)))
-    }
-
-    updates = []
-    for image_id, tz_name in tz_by_image_id.items():
-        utc = utc_by_id.get(image_id)
-        if utc is None:
-            continue
-        try:
-            tz = ZoneInfo(tz_name)
-        except (ZoneInfoNotFoundError, ValueError):
-            # A malformed stored zone must skip its own row, not abort the batch.
-            logger.warning("Skipping image %s: bad timezone %r", image_id, tz_name)
-            continue
-        local = utc.replace(tzinfo=timezone.utc).astimezone(tz)
-        updates.append({
-
-            "id": image_id,
-            "timezone": tz_name,
-            "local_timestamp": local,
-            "year": local.year,
-            "month": local.month,
-            "day": local.day,
-            "hour": local.hour,
-            "seconds_from_midnight": local.hour * 3600 + local.minute * 60 + local.second,
-            "date": local.strftime("%Y-%m-%d"),
-        })
+    rows = session.execute(select(Image.id, Image.timestamp).where(Image.id.in_(ids))).all()
+    rows = [r for r in rows if r.timestamp is not None]
+    if not rows:
+        return 0
+
+    # Converted per distinct zone, not per image. A malformed stored zone drops
+    # only its own rows (local_fields logs and skips them), not the batch.
+    tz_names = [tz_by_image_id[r.id] for r in rows]
+    local = tzs.local_fields([r.timestamp for r in rows], tz_names)
+    updates = [
+        {"id": rows[k].id, "timezone": tz_names[k], **fields}
+        for k, fields in zip(local.index, local.to_dict("records"))
+    ]
 
     if not updates:
         return 0
 
-    # ORM bulk UPDATE by primary key: each dict carries "id" (the pk) + the
-    # columns to set, no WHERE — same form as populate_locations.py.
-    stmt = update(Image).execution_options(synchronize_session=None)
-    for i in range(0, len(updates), 100):
-        session.execute(stmt, updates[i:i + 100])
-    return len(updates)
+    # COPY into a staging table, then one UPDATE … FROM (database/bulk.py).
+    started = time.perf_counter()
+    stage, n = stage_rows(
+        session, "stage_image_tz", _IMAGE_TZ_STAGE,
+        (tuple(u[col] for col in _IMAGE_TZ_STAGE) for u in updates),
+    )
+    session.execute(
+        update(Image)
+        .where(Image.id == stage.c.id)
+        .values({col: stage.c[col] for col in _IMAGE_TZ_STAGE if col != "id"})
+        .execution_options(synchronize_session=False)
+    )
+    log_rate("Image timezone update", n, started)
+    return n
 
 
 # ─── Step 8: Geocode segments → Location table ───────────────────────────────
@@ -901,24 +825,38 @@ def enrich_and_index_segments(
     df: pd.DataFrame,
     device: str,
     date: str | None = None,
+    since: datetime | None = None,
 ) -> None:
     """
     For every segment:
-      - Stop  → enrich_stop(centroid) via Nominatim zoom=18 + Wikidata
+      - Stop  → the device's known Location within SNAP_RADIUS_M (known_places),
+                else enrich_stop(centroid) via Nominatim zoom=18 + Wikidata
       - Move  → enrich_move(gps_pts) builds "City A → City B" from track points
 
     Upserts a Location row (keyed on OSM element id or rounded coords) and
     bulk-updates Image.location_id for all images in the segment's time window.
+
+    ``since`` marks an incremental run: ``segments`` cover only the day from
+    then on, and the day's persisted stop segments before it are kept.
     """
     # Pass 1: enrich all stop segments up front so move segments can reference
     # their neighbours' names when building "StopBefore → StopAfter" labels.
+    # A stop at one of the device's established places snaps to that Location
+    # and skips disambiguation and geocoding entirely.
+    known = KnownPlaces.load(session, device)
     stop_geos: dict[int, dict] = {}
+    snapped_stops: dict[int, dict] = {}
     for i, seg in enumerate(segments):
         lat = seg.get("centroid_lat")
         lon = seg.get("centroid_lon")
         if lat is None or lon is None or pd.isna(lat) or pd.isna(lon):
             continue
         if bool(seg.get("is_stop")):
+            snapped = known.snap(float(lat), float(lon))
+            if snapped:
+                stop_geos[i] = snapped_stops[i] = snapped
+                logger.info("Stop segment %d snapped to known place %s", i, snapped["name"])
+                continue
             # Visual disambiguation: pull nearby venues from the offline gazetteer
             # and let the stop's own photos pick which one, correcting a centroid
             # that drifted onto the shop next door. Falls through to Nominatim
@@ -940,6 +878,8 @@ def enrich_and_index_segments(
             stop = enrich_stop(float(lat), float(lon), poi=poi)
             stop_geos[i] = stop
             logger.info("Stop segment %d enriched to %s", i, stop.get("name"))
+    logger.info("Stops for %s: %d snapped to known places, %d geocoded",
+                device, len(snapped_stops), len(stop_geos) - len(snapped_stops))
 
     # User-confirmed locations are stable within a run (only stop_correction sets
     # the flag, never enrich), so fetch them once instead of a correlated subquery
@@ -1015,102 +955,109 @@ def enrich_and_index_segments(
                         "start_time": s_dt, "end_time": e_dt,
                         "latitude": float(lat), "longitude": float(lon),
                         "place_id": seg.get("place_id"),
-                        "timezone": find_timezone(float(lon), float(lat)),
+                        "timezone": tzs.timezone_at(float(lon), float(lat)),
                         "location_id": pinned,
                     })
                 continue
 
-        if is_stop:
-            geo = stop_geos.get(i) or enrich_stop(float(lat), float(lon))
+        snapped = snapped_stops.get(i)
+        if snapped:
+            # Known place: reuse its Location as-is, no geocoding and no upsert.
+            location_id = snapped["location_id"]
+            name = snapped["name"]
+            tz = snapped["timezone"] or tzs.timezone_at(float(lon), float(lat))
         else:
-            seg_df = (
-                df[(df["timestamp"] >= start_ts) & (df["timestamp"] <= end_ts)]
-                if start_ts is not None and end_ts is not None
-                else pd.DataFrame()
-            )
-            gps_pts = (
-                list(zip(seg_df["latitude"].tolist(), seg_df["longitude"].tolist()))
-                if not seg_df.empty else []
+            if is_stop:
+                geo = stop_geos.get(i) or enrich_stop(float(lat), float(lon))
+            else:
+                seg_df = (
+                    df[(df["timestamp"] >= start_ts) & (df["timestamp"] <= end_ts)]
+                    if start_ts is not None and end_ts is not None
+                    else pd.DataFrame()
+                )
+                gps_pts = (
+                    list(zip(seg_df["latitude"].tolist(), seg_df["longitude"].tolist()))
+                    if not seg_df.empty else []
+                )
+                geo = enrich_move(gps_pts, fallback_lat=float(lat), fallback_lon=float(lon))
+
+                # Override move name with adjacent stop names when available.
+                prev_stop = next((stop_geos[j] for j in range(i - 1, -1, -1) if j in stop_geos), None)
+                next_stop = next((stop_geos[j] for j in range(i + 1, len(segments)) if j in stop_geos), None)
+                from_name = prev_stop.get("name") if prev_stop else None
+                to_name = next_stop.get("name") if next_stop else None
+                if from_name and to_name:
+                    geo = {**geo, "name": f"{from_name} → {to_name}"}
+                elif from_name:
+                    geo = {**geo, "name": f"From {from_name}"}
+                elif to_name:
+                    geo = {**geo, "name": f"To {to_name}"}
+
+            # Dedup key — in priority: OSM element id → Wikidata QID → 5-decimal coords
+            # 5 decimal places ≈ 1 m precision, preventing false merges of nearby places
+            if geo.get("osm_id"):
+                raw_key = f"osm_{geo['osm_type']}{geo['osm_id']}"
+            elif geo.get("wikidata_id"):
+                raw_key = f"wikidata_{geo['wikidata_id']}"
+            else:
+                raw_key = f"nominatim_{lat:.5f}_{lon:.5f}"
+            key = f"stop={is_stop},{raw_key}"
+
+            tz = tzs.timezone_at(float(lon), float(lat))
+
+            # ── Map geo dict → Location columns ──────────────────────────────────
+            name = geo.get("name") or geo.get("suburb") or geo.get("city") or "Unknown"
+            cats = geo.get("categories", [])
+            categories_str = "; ".join(cats[:5]) if cats else ""
+            address = geo.get("address", "") or name
+
+            stmt = insert(Location).values(
+                id=uuid.uuid4(),
+                key=key,
+                name=name,
+                stop=is_stop,
+                # admin hierarchy
+                suburb=geo.get("suburb") or None,
+                city=geo.get("city") or None,
+                region=geo.get("region") or None,
+                country=geo.get("country", ""),
+                postcode=geo.get("postcode") or None,
+                # geocoder output
+                address=address,
+                timezone=tz,
+                latitude=float(lat),
+                longitude=float(lon),
+                # OSM provenance
+                osm_type=geo.get("osm_type") or None,
+                osm_id=geo.get("osm_id") or None,
+                # Wikidata
+                wikidata_id=geo.get("wikidata_id") or None,
+                description=geo.get("description") or None,
+                categories=categories_str or None,
             )
-            geo = enrich_move(gps_pts, fallback_lat=float(lat), fallback_lon=float(lon))
-
-            # Override move name with adjacent stop names when available.
-            prev_stop = next((stop_geos[j] for j in range(i - 1, -1, -1) if j in stop_geos), None)
-            next_stop = next((stop_geos[j] for j in range(i + 1, len(segments)) if j in stop_geos), None)
-            from_name = prev_stop.get("name") if prev_stop else None
-            to_name = next_stop.get("name") if next_stop else None
-            if from_name and to_name:
-                geo = {**geo, "name": f"{from_name} → {to_name}"}
-            elif from_name:
-                geo = {**geo, "name": f"From {from_name}"}
-            elif to_name:
-                geo = {**geo, "name": f"To {to_name}"}
-
-        # Dedup key — in priority: OSM element id → Wikidata QID → 5-decimal coords
-        # 5 decimal places ≈ 1 m precision, preventing false merges of nearby places
-        if geo.get("osm_id"):
-            raw_key = f"osm_{geo['osm_type']}{geo['osm_id']}"
-        elif geo.get("wikidata_id"):
-            raw_key = f"wikidata_{geo['wikidata_id']}"
-        else:
-            raw_key = f"nominatim_{lat:.5f}_{lon:.5f}"
-        key = f"stop={is_stop},{raw_key}"
-
-        tz = find_timezone(float(lon), float(lat))
-
-        # ── Map geo dict → Location columns ──────────────────────────────────
-        name = geo.get("name") or geo.get("suburb") or geo.get("city") or "Unknown"
-        cats = geo.get("categories", [])
-        categories_str = "; ".join(cats[:5]) if cats else ""
-        address = geo.get("address", "") or name
-
-        stmt = insert(Location).values(
-            id=uuid.uuid4(),
-            key=key,
-            name=name,
-            stop=is_stop,
-            # admin hierarchy
-            suburb=geo.get("suburb") or None,
-            city=geo.get("city") or None,
-            region=geo.get("region") or None,
-            country=geo.get("country", ""),
-            postcode=geo.get("postcode") or None,
-            # geocoder output
-            address=address,
-            timezone=tz,
-            latitude=float(lat),
-            longitude=float(lon),
-            # OSM provenance
-            osm_type=geo.get("osm_type") or None,
-            osm_id=geo.get("osm_id") or None,
-            # Wikidata
-            wikidata_id=geo.get("wikidata_id") or None,
-            description=geo.get("description") or None,
-            categories=categories_str or None,
-        )
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["key"],
-            set_={
-                "name": stmt.excluded.name,
-                "suburb": stmt.excluded.suburb,
-                "city": stmt.excluded.city,
-                "region": stmt.excluded.region,
-                "country": stmt.excluded.country,
-                "postcode": stmt.excluded.postcode,
-                "address": stmt.excluded.address,
-                "timezone": stmt.excluded.timezone,
-                "latitude": stmt.excluded.latitude,
-                "longitude": stmt.excluded.longitude,
-                "osm_type": stmt.excluded.osm_type,
-                "osm_id": stmt.excluded.osm_id,
-                "wikidata_id": stmt.excluded.wikidata_id,
-                "description": stmt.excluded.description,
-                "categories": stmt.excluded.categories,
-            },
-        ).returning(Location.id)
-
-        location_id = session.execute(stmt).scalar()
-        session.flush()
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={
+                    "name": stmt.excluded.name,
+                    "suburb": stmt.excluded.suburb,
+                    "city": stmt.excluded.city,
+                    "region": stmt.excluded.region,
+                    "country": stmt.excluded.country,
+                    "postcode": stmt.excluded.postcode,
+                    "address": stmt.excluded.address,
+                    "timezone": stmt.excluded.timezone,
+                    "latitude": stmt.excluded.latitude,
+                    "longitude": stmt.excluded.longitude,
+                    "osm_type": stmt.excluded.osm_type,
+                    "osm_id": stmt.excluded.osm_id,
+                    "wikidata_id": stmt.excluded.wikidata_id,
+                    "description": stmt.excluded.description,
+                    "categories": stmt.excluded.categories,
+                },
+            ).returning(Location.id)
+
+            location_id = session.execute(stmt).scalar()
+            session.flush()
 
         if location_id and start_ts is not None and end_ts is not None:
             start_dt = start_ts.to_pydatetime() if hasattr(start_ts, "to_pydatetime") else start_ts
@@ -1133,7 +1080,7 @@ def enrich_and_index_segments(
                     "location_id": location_id,
                 })
 
-        logger.info(f"Upserted location {name} (stop={is_stop}) with key={key} and assigned to images between {start_ts} and {end_ts}")
+        logger.info(f"Assigned location {name} (stop={is_stop}, known={bool(snapped)}) to images between {start_ts} and {end_ts}")
 
     # ── Gap-fill: assign every still-unlocated image to the nearest segment ───────
     # The per-segment windows above (start-PRE .. end+POST) are NOT time-contiguous:
@@ -1179,14 +1126,16 @@ def enrich_and_index_segments(
 
     # Persist stop segments for the day (replace-all so a re-run is idempotent),
     # so the timeline can render places with no photos. Deduped on (device,
-    # start_time); collisions keep the last-seen window.
+    # start_time); collisions keep the last-seen window. An incremental run
+    # replaces only the rows it recomputed.
     if date:
-        session.execute(
-            delete(GpsStopSegment).where(
-                GpsStopSegment.device == device,
-                GpsStopSegment.date == date,
-            )
+        replaced = delete(GpsStopSegment).where(
+            GpsStopSegment.device == device,
+            GpsStopSegment.date == date,
         )
+        if since is not None:
+            replaced = replaced.where(GpsStopSegment.start_time >= since)
+        session.execute(replaced)
         seen: dict = {}
         for r in stop_rows:
             seen[(r["device"], r["start_time"])] = r
@@ -1229,29 +1178,9 @@ def _window_kinematics(
     n = hi_i - lo_i
     if n < 2:
         return 0.0, 0.0, 1.0, n
-    lat, lon, alt, ts = lat[lo_i:hi_i], lon[lo_i:hi_i], alt[lo_i:hi_i], ts[lo_i:hi_i]
-    span = haversine_distance(lat[0], lon[0], lat[-1], lon[-1], alt[0], alt[-1])
-    # Cumulative path length (sum of consecutive hops) → straightness = span/path.
-    path = 0.0
-    for i in range(1, n):
-        path += haversine_distance(lat[i - 1], lon[i - 1], lat[i], lon[i], alt[i - 1], alt[i])
-    straightness = span / path if path > 0 else 1.0
-    speeds = []
-    anchor = 0
-    for i in range(1, n):
-        dt = (ts[i] - ts[anchor]) / np.timedelta64(1, "s")
-        if dt < MIN_SPEED_DT:
-            continue
-        d = haversine_distance(lat[anchor], lon[anchor], lat[i], lon[i], alt[anchor], alt[i])
-        speeds.append(d / dt)
-        anchor = i
-    # Window too short to fill one speed baseline: fall back to overall chord speed.
-    if not speeds:
-        dt = (ts[-1] - ts[0]) / np.timedelta64(1, "s")
-        if dt <= 0:
-            return 0.0, span, straightness, n
-        return span / dt, span, straightness, n
-    p85 = float(np.percentile(speeds, 85))
+    p85, span, straightness = gk.track_kinematics(
+        gk.as_ns(ts[lo_i:hi_i]), lat[lo_i:hi_i], lon[lo_i:hi_i], alt[lo_i:hi_i], MIN_SPEED_DT
+    )
     return p85, span, straightness, n
 
 
@@ -1519,11 +1448,52 @@ def refine_segment_mode(session: Session, device: str, date: str, segment_id: in
 
 # ─── Persistence ──────────────────────────────────────────────────────────────
 
+_IMAGE_GPS_STAGE = {
+    "image_id": "uuid",
+    "latitude": "float8",
+    "longitude": "float8",
+    "elevation": "float8",
+    "timestamp": "float8",
+    "timezone": "text",
+    "formatted_time": "text",
+    "source": "text",
+    "gap_s": "float8",
+    "mode": "text",
+}
+
+
+def _clear_day_modes(session: Session, device: str, date: str) -> None:
+    """NULL the day's ImageGPS.mode so the upsert below takes the recomputed
+    value. Not committed here — it lands with the upsert."""
+    session.execute(
+        update(ImageGPS)
+        .where(ImageGPS.image_id.in_(
+            select(Image.id).where(Image.device == device, Image.date == date)
+        ))
+        .values(mode=None)
+    )
+
+
 def _upsert_image_gps(session, rows: list[dict]) -> None:
-    """Insert/update a batch of ImageGPS rows, preserving any already-stored mode —
+    """Insert/update the day's ImageGPS rows, preserving any already-stored mode —
     except a generic ``vehicle``, which a newly-resolved specific sub-mode
-    (tram/train/ferry/…) is allowed to overwrite. Other stored modes stay put."""
-    stmt = insert(ImageGPS).values(rows)
+    (tram/train/ferry/…) is allowed to overwrite. Other stored modes stay put.
+
+    All rows are COPYed into a staging table and applied with a single
+    INSERT … SELECT … ON CONFLICT (see database/bulk.py)."""
+    if not rows:
+        return
+    started = time.perf_counter()
+    stage, n = stage_rows(
+        session, "stage_image_gps", _IMAGE_GPS_STAGE,
+        (tuple(r.get(col) for col in _IMAGE_GPS_STAGE) for r in rows),
+    )
+    # INSERT … SELECT skips Python-side column defaults, so new rows get
+    # ``interpolated`` explicitly (an update leaves it as stored).
+    stmt = insert(ImageGPS).from_select(
+        ["id", "interpolated", *_IMAGE_GPS_STAGE],
+        select(func.gen_random_uuid(), false(), *(stage.c[col] for col in _IMAGE_GPS_STAGE)),
+    )
     # Keep the stored mode, unless it is the generic "vehicle" and the incoming row
     # carries a specific sub-mode — then upgrade. New rows (stored mode NULL) take
     # the incoming value as before.
@@ -1551,6 +1521,7 @@ def _upsert_image_gps(session, rows: list[dict]) -> None:
         },
     )
     session.execute(stmt)
+    log_rate("ImageGPS upsert", n, started)
 
 
 def _apply_activity_mode_overrides(session, device: str, date: str) -> int:
@@ -1593,43 +1564,114 @@ def _apply_activity_mode_overrides(session, device: str, date: str) -> int:
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
-def _day_gps_signature(session: Session, device: str, date: str, raw_df: pd.DataFrame) -> str:
+def _day_gps_signature(session: Session, device: str, date: str) -> str:
     """Cheap fingerprint of a day's inputs — raw-GPS count + latest fix time + image
     count. When it is unchanged from the last successful run, re-running the pipeline
     would only re-geocode identical stops (re-hitting Nominatim/Overpass/LLM) and risk
-    reverting a name a later annotated run had corrected. So we skip on a match."""
-    raw_n = len(raw_df)
-    raw_max = str(raw_df["timestamp"].max()) if raw_n else ""
+    reverting a name a later annotated run had corrected. So we skip on a match.
+    Aggregated in SQL so an incremental run need not load the whole day."""
+    start, end = day_bounds(date)
+    raw_n, raw_max = session.execute(
+        select(func.count(), func.max(RawGPS.timestamp))
+        .join(Device, Device.id == RawGPS.device_id)
+        .where(Device.device_id == device, RawGPS.timestamp >= start, RawGPS.timestamp < end)
+    ).one()
     img_n = session.execute(
         select(func.count()).select_from(Image)
         .where(Image.device == device, Image.date == date, Image.deleted == False)
     ).scalar() or 0
-    return f"{raw_n}:{raw_max}:{img_n}"
+    return f"{raw_n}:{pd.Timestamp(raw_max) if raw_max else ''}:{img_n}"
+
+
+# ─── Incremental live-day runs ───────────────────────────────────────────────
+# The live day is re-run every few minutes as fixes arrive. Everything before
+# the day's last persisted stop is closed: a new fix can only extend that stay
+# or start something after it. An incremental run therefore loads fixes from
+# the start of that stop onward, recomputes segments, image GPS, modes and
+# geocoding for that suffix only, and keeps the frozen prefix (its
+# gps_stop_segments rows, ImageGPS rows and image locations) as it is.
+
+def incremental_cutoff(session: Session, device: str, date: str) -> datetime | None:
+    """Start (naive UTC) of the day's last persisted stop segment, from which an
+    incremental run recomputes. None when a full run is needed instead: no stop
+    persisted yet, or an image before the cutoff still has no ImageGPS row (a
+    late upload the frozen prefix never saw)."""
+    cutoff = session.execute(
+        select(func.max(GpsStopSegment.start_time))
+        .where(GpsStopSegment.device == device, GpsStopSegment.date == date)
+    ).scalar()
+    if cutoff is None:
+        return None
+    unmatched = session.execute(
+        select(Image.id)
+        .outerjoin(ImageGPS, ImageGPS.image_id == Image.id)
+        .where(
+            Image.device == device, Image.date == date, Image.deleted == False,  # noqa: E712
+            Image.timestamp < cutoff, ImageGPS.image_id.is_(None),
+        )
+        .limit(1)
+    ).first()
+    return None if unmatched else cutoff
+
+
+def _align_place_ids(session: Session, device: str, date: str, df: pd.DataFrame,
+                     since: datetime) -> pd.DataFrame:
+    """Map the suffix's place_<N> labels onto the frozen prefix's: a suffix
+    place within MERGE_EPS of a frozen stop takes its place_id, any other gets
+    the next unused number, so ids stay consistent across the whole day."""
+    frozen = session.execute(
+        select(GpsStopSegment.place_id, GpsStopSegment.latitude, GpsStopSegment.longitude)
+        .where(
+            GpsStopSegment.device == device, GpsStopSegment.date == date,
+            GpsStopSegment.start_time < since, GpsStopSegment.place_id.like("place_%"),
+        )
+    ).all()
+    suffix = df[df["place_id"].notna()].groupby("place_id")[["latitude", "longitude"]].mean()
+    if suffix.empty:
+        return df
+
+    next_n = 1 + max((int(r.place_id.split("_", 1)[1]) for r in frozen), default=-1)
+    f_lat = np.array([r.latitude for r in frozen], dtype=float)
+    f_lon = np.array([r.longitude for r in frozen], dtype=float)
+    merge_m = MERGE_EPS * 6_371_000
+    mapping = {}
+    for place_id, c in suffix.iterrows():
+        if len(frozen):
+            d = haversine_distance(c["latitude"], c["longitude"], f_lat, f_lon, 0, 0)
+            k = int(np.argmin(d))
+            if d[k] <= merge_m:
+                mapping[place_id] = frozen[k].place_id
+                continue
+        mapping[place_id] = f"place_{next_n}"
+        next_n += 1
+    df["place_id"] = df["place_id"].map(mapping).where(df["place_id"].notna(), None)
+    return df
 
 
 def run_pipeline(session: Session, device: str, date: str, modes_only: bool = False,
-                 force: bool = False):
+                 force: bool = False, incremental: bool = False):
     """
     ``modes_only=True`` recomputes/refreshes only the per-segment transport mode (steps up to the ImageGPS mode upsert) and skips the slow tail — geocoding
     (enrich_and_index_segments) and segment annotation (load_all_segments). Used
     to backfill modes after the GPS-authoritative fusion change without
-    re-hitting Nominatim/Overpass/LLM. Clear ImageGPS.mode first, else the
-    COALESCE upsert keeps the stored value.
+    re-hitting Nominatim/Overpass/LLM. The day's stored ImageGPS.mode is cleared
+    in the same transaction as the upsert (else the COALESCE keeps the stored
+    value), so a failed run leaves the old modes in place.
 
     ``force=True`` bypasses the unchanged-day skip guard — use it for a manual
     re-geocode (e.g. after a code change). The automatic live-GPS trigger leaves it
     False so a day whose GPS/images haven't changed is not reprocessed again and
     again (which needlessly re-geocodes and can revert corrected stop names).
+
+    ``incremental=True`` (the live-day trigger) recomputes only from the day's
+    last persisted stop onward (see ``incremental_cutoff``), falling back to a
+    full run when there is nothing to keep. Ignored with ``force``/``modes_only``.
     """
     logger.info(f"Processing device={device} date={date}")
-    df = load_all_points(session, device, date)
-    if len(df) == 0:
-        logger.warning(f"No GPS data found for device={device} date={date}, skipping.")
-        return
 
     # Skip when nothing about the day changed since the last successful full run.
     sig_key = f"gps_sig:{device}:{date}"
-    sig = _day_gps_signature(session, device, date, df)
+    sig = _day_gps_signature(session, device, date)
     if not modes_only and not force:
         try:
             if redis_client.get_value(sig_key) == sig.encode():
@@ -1638,6 +1680,14 @@ def run_pipeline(session: Session, device: str, date: str, modes_only: bool = Fa
         except Exception as _e:
             logger.debug("run_pipeline sig check failed for %s/%s: %s", device, date, _e)
 
+    since = incremental_cutoff(session, device, date) if incremental and not (force or modes_only) else None
+    df = load_all_points(session, device, date, since=since)
+    if len(df) == 0:
+        logger.warning(f"No GPS data found for device={device} date={date}, skipping.")
+        return
+    if since is not None:
+        logger.info("Incremental run for %s/%s from %s: %d fixes", device, date, since, len(df))
+
     # 1b. Quality gate — drop fixes reporting a loose accuracy radius before any
     # track/stay processing, so junk never reaches stay detection or the filters.
     df = filter_low_accuracy(df)
@@ -1659,6 +1709,8 @@ def run_pipeline(session: Session, device: str, date: str, modes_only: bool = Fa
 
     # 5. Assigning stop_id and place_id, so we can group by them when building segments.
     df = assign_stop_and_place_ids(df)
+    if since is not None:
+        df = _align_place_ids(session, device, date, df, since)
     df["interpolated"] = df.get("interpolated", False)  # Ensure the column exists
 
     # Fill in gaps between tracks with interpolated points, so we can build segments that span the whole day and not just individual tracks.
@@ -1670,24 +1722,27 @@ def run_pipeline(session: Session, device: str, date: str, modes_only: bool = Fa
     df, segments = build_segments(df)
 
     # 7. Assigning GPS points to images by finding the nearest GPS point (or interpolated point in a gap) for each image timestamp, and calculating the corresponding timezone.
-    all_points = df.to_dict(orient="records")
-    point_timestamps = df["timestamp"].tolist()
     image_data = []
     session.rollback()
 
     # Insert assigned GPS data for images in batches
-    data = assign_gps_to_images(session, date, device, all_points, point_timestamps)
+    data = assign_gps_to_images(session, date, device, df, since=since)
 
     # 7b. Classify transport mode per segment (GPS kinematics + CLIP visual),
     # tagging each image row with its segment's mode.
     logger.debug(f"Computing transport modes for {len(segments)} segments and {len(data)} images")
     compute_segment_modes(session, segments, df, device, date, data)
 
+    # Fixes without a stored zone are resolved in one batched call; the result
+    # is written back to `data` so ImageGPS and Image get the same zone.
+    missing = [d for d in data if str(d["timezone"]) in ("None", "nan", "")]
+    if missing:
+        zones = tzs.timezones_at([d["longitude"] for d in missing], [d["latitude"] for d in missing])
+        for d, tz in zip(missing, zones):
+            d["timezone"] = tz
+
     rows = []
     for d in data:
-        if str(d["timezone"]) in ("None", "nan", ""):
-            d["timezone"] = find_timezone(d["longitude"], d["latitude"])
-
         rows.append(
             {
                 "image_id": d["image_id"],
@@ -1702,23 +1757,14 @@ def run_pipeline(session: Session, device: str, date: str, modes_only: bool = Fa
                 "mode": d.get("mode"),
             }
         )
-
-        if len(rows) >= 100:
-            _upsert_image_gps(session, rows)
-            rows = []
-
-    if rows:
-        _upsert_image_gps(session, rows)
+    if modes_only:
+        _clear_day_modes(session, device, date)
+    _upsert_image_gps(session, rows)
 
     # Update timezone + local wall-clock fields on each Image from the GPS-derived
     # zone. Always overwrite (no null-guard): the camera may have stored a stale
     # capture-side timezone at ingest, which left local_timestamp/date/hour wrong.
-    tz_by_image_id = {}
-    for d in data:
-        tz = d["timezone"]
-        if str(tz) in ("None", "nan", ""):
-            tz = find_timezone(d["longitude"], d["latitude"])
-        tz_by_image_id[d["image_id"]] = str(tz)
+    tz_by_image_id = {d["image_id"]: str(d["timezone"]) for d in data}
     _apply_timezone_to_images(session, tz_by_image_id)
 
     image_data.extend(data)
@@ -1729,7 +1775,7 @@ def run_pipeline(session: Session, device: str, date: str, modes_only: bool = Fa
         return
 
     # 8. Enriching segments with place info and indexing them for search.
-    enrich_and_index_segments(session, segments, df, device, date=date)
+    enrich_and_index_segments(session, segments, df, device, date=date, since=since)
     session.commit()
     # session.execute(
     #     update(Image)
@@ -0,0 +1,97 @@
+"""
+known_places.py
+---------------
+Snap a stop to a place the device has already resolved, before any geocoder
+call.
+
+Most stops on a typical day are somewhere the wearer has been many times
+(home, work, the usual café), yet every run sent each of them through POI
+disambiguation, Nominatim and Wikidata again, sleeping for their rate limits.
+``KnownPlaces`` loads the device's stop history once per run: every persisted
+``gps_stop_segments`` centroid with its resolved Location, kept in a haversine
+BallTree. A new stop whose centroid lies within SNAP_RADIUS_M of a past one
+takes that Location directly. Only a place that is established is used: one
+seen on at least SNAP_MIN_DAYS distinct days, or one the user confirmed or
+labelled. Genuinely new places still go through the full path.
+
+Public API:
+    KnownPlaces.load(session, device)  → KnownPlaces
+    KnownPlaces.snap(lat, lon)         → dict | None
+"""
+
+import logging
+import uuid
+
+import numpy as np
+from sklearn.neighbors import BallTree
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session
+
+from database.models import GpsStopSegment, Location, LocationLabel
+
+logger = logging.getLogger(__name__)
+
+# Within GPS drift of a past centroid, but tighter than the ~40 m POI search
+# radius so an occasional visit to the shop next door is still disambiguated.
+SNAP_RADIUS_M = 20.0
+SNAP_MIN_DAYS = 3
+
+_EARTH_R = 6_371_000.0
+
+
+class KnownPlaces:
+    def __init__(self, coords: np.ndarray, location_ids: list[uuid.UUID], locations: dict[uuid.UUID, dict]):
+        self._location_ids = location_ids
+        self._locations = locations
+        self._tree = BallTree(np.radians(coords), metric="haversine") if len(coords) else None
+
+    @classmethod
+    def load(cls, session: Session, device: str) -> "KnownPlaces":
+        days = func.count(func.distinct(GpsStopSegment.date))
+        labelled = exists().where(LocationLabel.location_id == Location.id)
+        established = session.execute(
+            select(Location, days.label("days"), labelled.label("labelled"))
+            .join(GpsStopSegment, GpsStopSegment.location_id == Location.id)
+            .where(GpsStopSegment.device == device, Location.stop.is_(True))
+            .group_by(Location.id)
+        ).all()
+        locations = {
+            loc.id: {
+                "location_id": loc.id,
+                "name": loc.name or "",
+                "osm_type": loc.osm_type or "",
+                "osm_id": loc.osm_id or "",
+                "wikidata_id": loc.wikidata_id or "",
+                "timezone": loc.timezone,
+            }
+            for loc, n_days, is_labelled in established
+            if n_days >= SNAP_MIN_DAYS or loc.user_confirmed or is_labelled
+        }
+        if not locations:
+            return cls(np.empty((0, 2)), [], {})
+
+        rows = session.execute(
+            select(GpsStopSegment.latitude, GpsStopSegment.longitude, GpsStopSegment.location_id)
+            .where(
+                GpsStopSegment.device == device,
+                GpsStopSegment.location_id.in_(list(locations)),
+                GpsStopSegment.latitude.isnot(None),
+                GpsStopSegment.longitude.isnot(None),
+            )
+        ).all()
+        coords = np.array([(r.latitude, r.longitude) for r in rows], dtype=float).reshape(-1, 2)
+        logger.info("Known places for %s: %d locations from %d past stops", device, len(locations), len(rows))
+        return cls(coords, [r.location_id for r in rows], locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def snap(self, lat: float, lon: float) -> dict | None:
+        """The established Location of the nearest past stop within
+        SNAP_RADIUS_M of (lat, lon), or None for a new place."""
+        if self._tree is None:
+            return None
+        dist, idx = self._tree.query(np.radians([[lat, lon]]), k=1)
+        if dist[0][0] * _EARTH_R > SNAP_RADIUS_M:
+            return None
+        return self._locations[self._location_ids[int(idx[0][0])]]
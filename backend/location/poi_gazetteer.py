@@ -34,6 +34,8 @@ import requests
 from sqlalchemy import func, select
 from sqlalchemy.dialects.postgresql import insert
 from location.transport_mode import _haversine_m
+from location.geocode_cache import geo_cell, geocode_cache
+from integrations.sessions.redis import throttle
 from sqlalchemy.orm import Session
 
 # ImageEmbedding is the populated CLIP/search embedding (clip_embedding table is
@@ -125,6 +127,7 @@ def _run_overpass(query: str, ctx: str) -> list[dict] | None:
         wait = _OVERPASS_RATE - (time.monotonic() - _last_overpass)
         if wait > 0:
             time.sleep(wait)
+        throttle("overpass", _OVERPASS_RATE)
         try:
             r = requests.post(_OVERPASS_URL, data={"data": query},
                               headers=_OVERPASS_HEADERS, timeout=_OVERPASS_TIMEOUT + 60)
@@ -243,11 +246,9 @@ def nearby_pois(session: Session, lat: float, lon: float,
 # bus-stop nodes. Instead the pipeline calls this ONLY for a stop that the
 # neighbour-mode gate flags as a transit waypoint (a stationary stop bracketed by
 # a vehicle/flight leg). Results are kept out of osm_pois so the general candidate
-# pool stays clean; a small in-process TTL cache avoids re-hitting Overpass when
-# the same day reprocesses.
+# pool stays clean; the shared geocode cache (per ~150 m cell) avoids re-hitting
+# Overpass when the same day reprocesses.
 _TRANSIT_RADIUS_M = 250.0
-_TRANSIT_TTL_S = 6 * 3600
-_transit_cache: dict[tuple, tuple[float, list[dict]]] = {}
 
 _TRANSIT_TMPL = """[out:json][timeout:{t}];
 (
@@ -276,14 +277,26 @@ def nearby_transit_pois(lat: float, lon: float) -> list[dict]:
     lists. Best-effort: returns [] on any Overpass failure. Gated by the caller —
     only meant to run for stops the neighbour-mode gate marks as transit.
     """
-    key = (round(lat, 3), round(lon, 3))
-    hit = _transit_cache.get(key)
-    if hit and (time.monotonic() - hit[0]) < _TRANSIT_TTL_S:
-        return hit[1]
+    # Fetched (and cached) around the rounded point so nearby stops share one
+    # entry; distances are then re-measured from the actual stop.
+    rlat, rlon = round(lat, 3), round(lon, 3)
+    found = geocode_cache.lookup(
+        "transit", geo_cell(rlat, rlon, 16), 0, lambda: _fetch_transit_pois(rlat, rlon),
+    )
+    if not found:
+        return []  # nothing near, or a failure (not cached — retried next run)
+    out = [
+        {**c, "distance_m": _haversine_m(lat, lon, c["latitude"], c["longitude"])}
+        for c in found
+    ]
+    return sorted(out, key=lambda c: c["distance_m"])
 
+
+def _fetch_transit_pois(lat: float, lon: float) -> list[dict] | None:
+    """Named transit venues around (lat, lon), deduped by name. None on give-up."""
     elements = _fetch_transit_overpass(lat, lon)
     if elements is None:
-        return []  # don't cache a failure — retry next run
+        return None
 
     out: list[dict] = []
     for el in elements:
@@ -327,9 +340,7 @@ def nearby_transit_pois(lat: float, lon: float) -> list[dict]:
         key_c = (_rank(c["category"]), c["distance_m"])
         if prev is None or key_c < (_rank(prev["category"]), prev["distance_m"]):
             best[c["name"]] = c
-    deduped = sorted(best.values(), key=lambda c: c["distance_m"])
-    _transit_cache[key] = (time.monotonic(), deduped)
-    return deduped
+    return sorted(best.values(), key=lambda c: c["distance_m"])
 
 
 def stop_visual_vector(session: Session, device: str, start_ts, end_ts) -> np.ndarray | None:
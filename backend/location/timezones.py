@@ -0,0 +1,123 @@
+"""
+timezones.py
+------------
+Batched offline timezone resolution and UTC → local wall-clock conversion.
+
+``find_timezone`` answers one point at a time, and the pipeline called it per
+image (twice), per stop and per GPS upload, then built a ``ZoneInfo`` and
+converted every image's timestamp one by one. A day's images almost always
+share one or two zones, so:
+
+- ``timezones_at`` resolves whole coordinate arrays through a grid of
+  CELL_DEG cells. A cell is resolved once, by sampling a 3×3 lattice over it.
+  If every sample agrees, the whole cell takes that zone. A cell that a border
+  crosses is marked mixed, and its points fall back to the per-point
+  ``find_timezone``.
+- ``zone_info`` memoises ``ZoneInfo`` objects and returns None for a bad name.
+- ``local_fields`` converts UTC timestamps to the Image local-time columns,
+  one vectorised ``tz_convert`` per distinct zone.
+
+Coordinates are (longitude, latitude), the same order as ``find_timezone``.
+"""
+
+import logging
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from location.utils import find_timezone, find_timezone_coarse
+
+logger = logging.getLogger(__name__)
+
+# ~2 km: small enough that a border rarely slips between the 3×3 samples,
+# large enough that a day of images hits a handful of cells.
+CELL_DEG = 0.02
+_SAMPLES = (0.0, 0.5, 1.0)
+
+_cells: dict[tuple[int, int], str | None] = {}
+_cells_lock = threading.Lock()
+
+
+def _cell_zone(cell: tuple[int, int]) -> str | None:
+    """The zone covering all of ``cell``, or None when a border crosses it."""
+    with _cells_lock:
+        if cell in _cells:
+            return _cells[cell]
+    lat0, lon0 = cell[0] * CELL_DEG, cell[1] * CELL_DEG
+    zones = {
+        find_timezone_coarse(round(lon0 + fx * CELL_DEG, 4), round(lat0 + fy * CELL_DEG, 4))
+        for fy in _SAMPLES for fx in _SAMPLES
+    }
+    zone = zones.pop() if len(zones) == 1 else None
+    with _cells_lock:
+        _cells[cell] = zone
+    return zone
+
+
+def timezones_at(longitude, latitude) -> np.ndarray:
+    """IANA zone name for every (longitude, latitude) pair, as an object array.
+    Points whose zone cannot be determined get "UTC", as in ``find_timezone``."""
+    lon = np.asarray(longitude, dtype=float).ravel()
+    lat = np.asarray(latitude, dtype=float).ravel()
+    out = np.empty(len(lon), dtype=object)
+    if not len(lon):
+        return out
+    keys = np.stack([np.floor(lat / CELL_DEG), np.floor(lon / CELL_DEG)], axis=1).astype(np.int64)
+    cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    for c, cell in enumerate(cells):
+        members = np.flatnonzero(inverse == c)
+        zone = _cell_zone((int(cell[0]), int(cell[1])))
+        if zone is not None:
+            out[members] = zone
+        else:
+            for k in members:
+                out[k] = find_timezone(float(lon[k]), float(lat[k]))
+    return out
+
+
+def timezone_at(longitude: float, latitude: float) -> str:
+    """Single-point ``timezones_at``."""
+    return str(timezones_at([longitude], [latitude])[0])
+
+
+@lru_cache(maxsize=None)
+def zone_info(tz_name: str) -> ZoneInfo | None:
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def local_fields(utc, tz_names) -> pd.DataFrame:
+    """Image local-time columns for naive-UTC timestamps ``utc`` in the zones
+    ``tz_names`` (same length): local_timestamp (aware), year, month, day,
+    hour, seconds_from_midnight and date (YYYY-MM-DD). Indexed by input
+    position; inputs with an unknown zone are logged and left out."""
+    utc = pd.DatetimeIndex(pd.to_datetime(utc))
+    utc = utc.tz_localize("UTC") if utc.tz is None else utc.tz_convert("UTC")
+    names = np.asarray(tz_names, dtype=object)
+    parts = []
+    for name in pd.unique(names):
+        zone = zone_info(str(name))
+        if zone is None:
+            logger.warning("Skipping %d timestamps: bad timezone %r", int((names == name).sum()), name)
+            continue
+        idx = np.flatnonzero(names == name)
+        local = utc[idx].tz_convert(zone)
+        parts.append(pd.DataFrame({
+            "local_timestamp": pd.Series(local.to_pydatetime(), index=idx, dtype=object),
+            "year": local.year,
+            "month": local.month,
+            "day": local.day,
+            "hour": local.hour,
+            "seconds_from_midnight": local.hour * 3600 + local.minute * 60 + local.second,
+            "date": local.strftime("%Y-%m-%d"),
+        }, index=idx))
+    if not parts:
+        return pd.DataFrame(columns=["local_timestamp", "year", "month", "day", "hour",
+                                     "seconds_from_midnight", "date"])
+    return pd.concat(parts).sort_index()
@@ -31,10 +31,10 @@ def remove_physical_images(session, device_id: str, image_paths: list[str]):
             # os.remove(full_path)
             temp_backup(full_path)
 
-        # Thumbnail + its small grid derivative, keyed by stem (original may be
-        # .jpg or .webp; thumbnails are always .webp).
+        # Thumbnail + its grid and LLM-payload derivatives, keyed by stem
+        # (original may be .jpg or .webp; thumbnails are always .webp).
         stem = image_path.rsplit(".", 1)[0]
-        for rel in (f"{stem}.webp", f"{stem}_grid.webp"):
+        for rel in (f"{stem}.webp", f"{stem}_grid.webp", f"{stem}_llm.jpg"):
             thumbnail_path = os.path.join(THUMBNAIL_DIR, device_id, rel)
             if os.path.exists(thumbnail_path):
                 os.remove(thumbnail_path)
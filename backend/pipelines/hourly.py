@@ -1,5 +1,3 @@
-from integrations.sessions.redis import RedisClient
-
-redis_client = RedisClient()
+from integrations.sessions.redis import redis_client
 
 
@@ -0,0 +1,54 @@
+"""
+prewarm_geocode_cache.py
+------------------------
+Fill the persistent geocode cache (geocode_cache table) from the existing stop
+Locations, so the next pipeline runs over familiar places make no Nominatim /
+Overpass / Wikidata calls. Rate-limited like the pipeline itself; cells already
+cached are skipped after one table read.
+
+Usage:
+    python prewarm_geocode_cache.py --dry-run      # count stop locations, do nothing
+    python prewarm_geocode_cache.py --limit 20     # warm 20 locations (test)
+    python prewarm_geocode_cache.py                # all stop locations
+"""
+
+import argparse
+import logging
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("prewarm_geocode_cache")
+
+from database.models import Location  # noqa: E402
+from integrations.sessions.redis import cache_stats  # noqa: E402
+from location.enrich_stops import prewarm_geocode_cache  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="only warm this many locations")
+    parser.add_argument("--dry-run", action="store_true", help="count stop locations and exit")
+    args = parser.parse_args()
+
+    Session = sessionmaker(bind=create_engine(os.environ["PG_URI"]))
+    with Session() as session:
+        if args.dry_run:
+            n = session.execute(
+                select(func.count()).select_from(Location).where(Location.stop.is_(True))
+            ).scalar()
+            logger.info("%d stop locations would be warmed", n)
+            return
+        result = prewarm_geocode_cache(session, limit=args.limit)
+    logger.info("Done: %s", result)
+    logger.info("Geocode cache stats: %s", {
+        k: v for k, v in cache_stats().items() if k.startswith("geocode:")
+    })
+
+
+if __name__ == "__main__":
+    main()
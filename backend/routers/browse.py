@@ -1,7 +1,9 @@
+import gzip
+import json
 import logging
 import os
 from typing import Annotated, Any, List, Literal, Optional
-from fastapi import Depends, APIRouter, HTTPException, Query
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response
 from fastapi.encoders import jsonable_encoder
 from collections import Counter
 from sqlalchemy import asc, update
@@ -21,9 +23,11 @@ from database.types import ImageRecord, _orm_to_lifelog, _orm_to_grid
 from core.dependencies import CamelCaseModel
 from pipelines.all import process_image
 from services.anonymise import anonymise_image
+from services.browse_prefetch import mark_prefetched, note_cache_hit, record_warm, schedule_prefetch
+from services.day_freshness import day_freshness
 from services.segmentation import load_all_segments
 from services.utils import get_thumbnail_path
-from integrations.sessions.redis import redis_client
+from integrations.sessions.redis import DayCache, redis_client
 
 from tasks import anonymise_image_task
 
@@ -31,9 +35,22 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 _SEG_COMPLETE_TTL = 3600 * 10  # seconds to cache "all images segmented" per device/date
-_BROWSE_CACHE_TTL_TODAY = 60
+# Keys carry the day's freshness token, so new/deleted images miss on their
+# own; the live-day TTL only bounds changes that bypass bust_day_caches().
+_BROWSE_CACHE_TTL_TODAY = 300
 _BROWSE_CACHE_TTL_PAST = 600
 
+# Versioned per-day caches — invalidated in O(1) by bust_day_caches().
+_DAY_NAV_CACHE = DayCache("day-nav:v6")
+_BROWSE_DAY_CACHE = DayCache("browse:day")
+_BROWSE_HOUR_CACHE = DayCache("browse:hour")
+_BROWSE_SEGMENT_CACHE = DayCache("browse:segment")
+# format=columnar payloads, stored gzip-compressed and served as-is.
+_BROWSE_DAY_COL_CACHE = DayCache("browse:day:col")
+_BROWSE_HOUR_COL_CACHE = DayCache("browse:hour:col")
+
+BrowseFormat = Literal["json", "columnar"]
+
 
 def _maybe_load_segments(session: Session, device: str, date: str) -> None:
     """
@@ -287,6 +304,28 @@ def _fetch_location_display(session, location_ids, username: str | None) -> dict
     return out
 
 
+def _browse_ttl(date: str) -> int:
+    today = datetime.now().strftime("%Y-%m-%d")
+    return _BROWSE_CACHE_TTL_TODAY if date == today else _BROWSE_CACHE_TTL_PAST
+
+
+def _gzip_json(payload) -> bytes:
+    return gzip.compress(json.dumps(payload, separators=(",", ":")).encode(), compresslevel=6)
+
+
+def _precompressed_response(request: Request, body: bytes) -> Response:
+    """Serve a cached gzip body without re-encoding. GZipMiddleware passes
+    responses that already carry Content-Encoding through untouched; clients
+    that don't accept gzip get it inflated."""
+    if "gzip" in request.headers.get("accept-encoding", "").lower():
+        return Response(
+            body,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(gzip.decompress(body), media_type="application/json")
+
+
 @router.get("/day-nav")
 async def get_day_nav(
     device: str,
@@ -297,12 +336,21 @@ async def get_day_nav(
 ):
     """Lightweight segment metadata for DayNavBar — no LLM, no day-summary dependency."""
     _require_owner(access_level)
+    schedule_prefetch(device, date, user.username)
 
-    cache_key = f"day-nav:v6:{device}:{date}"
-    cached = redis_client.get_json(cache_key)
+    cache_key = _DAY_NAV_CACHE.key(device, date, day_freshness(session, device, date).token)
+    cached = _DAY_NAV_CACHE.get_json(cache_key)
     if cached is not None:
+        note_cache_hit("day-nav", cache_key)
         return cached
 
+    segments = _build_day_nav(session, device, date, user.username)
+    if segments:
+        _DAY_NAV_CACHE.set_json(cache_key, segments, _browse_ttl(date))
+    return segments
+
+
+def _build_day_nav(session: Session, device: str, date: str, username: str | None) -> list:
     from services.summary import _fetch_segment_locations
 
     rows = session.execute(
@@ -324,9 +372,9 @@ async def get_day_nav(
         .order_by(func.min(Image.timestamp).asc())
     ).all()
 
-    seg_to_location = _fetch_segment_locations(session, device, date, username=user.username)
+    seg_to_location = _fetch_segment_locations(session, device, date, username=username)
     seg_mode = _fetch_segment_modes(session, device, date)
-    seg_label_kind = _fetch_segment_label_kinds(session, device, date, username=user.username)
+    seg_label_kind = _fetch_segment_label_kinds(session, device, date, username=username)
 
     segments = []
     image_windows: list[tuple] = []  # (start_dt, end_dt) of image segments, for gap-detection
@@ -362,7 +410,7 @@ async def get_day_nav(
     ).scalars().all()
     if stop_rows:
         loc_display = _fetch_location_display(
-            session, [s.location_id for s in stop_rows], user.username
+            session, [s.location_id for s in stop_rows], username
         )
         # Only the image-FREE parts of a stop become "no photos" cells. A stop
         # that partially overlaps photos (e.g. a morning at home whose photos
@@ -419,21 +467,17 @@ async def get_day_nav(
                     "noRecording": False,
                 })
 
-    if not segments:
-        return []
-
     segments.sort(key=lambda s: s["startTime"] or "")
-
-    today = datetime.now().strftime("%Y-%m-%d")
-    ttl = _BROWSE_CACHE_TTL_TODAY if date == today else _BROWSE_CACHE_TTL_PAST
-    redis_client.set_json_with_ttl(cache_key, segments, ttl)
     return segments
 
 
 @router.get("/get-segments-by-date", response_model=dict)
 async def get_segments_by_date(
+    request: Request,
     device: str,
     date: str = "",
+    format: BrowseFormat = "json",
+    user=Depends(get_user),
     access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
     session: Session = Depends(get_session),
 ):
@@ -443,12 +487,32 @@ async def get_segments_by_date(
         date = datetime.now().strftime("%Y-%m-%d")
 
     _maybe_load_segments(session, device, date)
+    schedule_prefetch(device, date, user.username)
+    token = day_freshness(session, device, date).token
+
+    if format == "columnar":
+        col_key = _BROWSE_DAY_COL_CACHE.key(device, date, token)
+        body = _BROWSE_DAY_COL_CACHE.get_bytes(col_key)
+        if body is None:
+            columns = ImageRecord.find_segments_columnar(
+                session, date=date, device=device, today=(date == datetime.now().strftime("%Y-%m-%d")),
+            )
+            body = _gzip_json({"format": "columnar", "date": date, **columns})
+            _BROWSE_DAY_COL_CACHE.set_bytes(col_key, body, _browse_ttl(date))
+        return _precompressed_response(request, body)
 
-    cache_key = f"browse:day:{device}:{date}"
-    cached = redis_client.get_json(cache_key)
+    cache_key = _BROWSE_DAY_CACHE.key(device, date, token)
+    cached = _BROWSE_DAY_CACHE.get_json(cache_key)
     if cached is not None:
+        note_cache_hit("day", cache_key)
         return cached
 
+    response = _build_day_segments(session, device, date)
+    _BROWSE_DAY_CACHE.set_json(cache_key, response, _browse_ttl(date))
+    return response
+
+
+def _build_day_segments(session: Session, device: str, date: str) -> dict:
     today = datetime.now().strftime("%Y-%m-%d")
     results = ImageRecord.find_segments(
         session,
@@ -460,22 +524,54 @@ async def get_segments_by_date(
         hour="",
         today=(date == today),
     )
-
-    response = jsonable_encoder({
+    return jsonable_encoder({
         "date": date,
         "segments": results["segments"],
     })
 
-    ttl = _BROWSE_CACHE_TTL_TODAY if date == today else _BROWSE_CACHE_TTL_PAST
-    redis_client.set_json_with_ttl(cache_key, response, ttl)
-    return response
+
+def warm_browse_day(session: Session, device: str, date: str, username: str | None) -> dict[str, str]:
+    """
+    Build the day-nav and day-segments caches for one day unless they are
+    already present (run by the prefetch task, see services.browse_prefetch).
+    Uses the same keys the endpoints compute, so the next request hits.
+    Returns {view: "warmed" | "cached" | "empty"}.
+    """
+    _maybe_load_segments(session, device, date)
+    token = day_freshness(session, device, date).token
+    if token.startswith("0."):
+        return {}  # no images that day
+
+    ttl = _browse_ttl(date)
+    views = (
+        ("day-nav", _DAY_NAV_CACHE, lambda: _build_day_nav(session, device, date, username)),
+        ("day", _BROWSE_DAY_CACHE, lambda: _build_day_segments(session, device, date)),
+    )
+    outcomes: dict[str, str] = {}
+    for view, cache, build in views:
+        cache_key = cache.key(device, date, token)
+        # EXISTS, not get_json: a warm-up probe must not count as a cache miss.
+        if redis_client.client.exists(cache_key):
+            outcomes[view] = "cached"
+        else:
+            payload = build()
+            if payload:
+                cache.set_json(cache_key, payload, ttl)
+                mark_prefetched(view, cache_key, ttl)
+                outcomes[view] = "warmed"
+            else:
+                outcomes[view] = "empty"
+        record_warm(view, outcomes[view])
+    return outcomes
 
 
 @router.get("/get-images-by-hour", response_model=dict)
 async def get_images_by_hour(
+    request: Request,
     device: str,
     date: str = "",
     hour: str = "",
+    format: BrowseFormat = "json",
     access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
     session: Session = Depends(get_session),
 ):
@@ -503,9 +599,30 @@ async def get_images_by_hour(
         logger.info("No hours for date %s device %s", date, device)
         return {"date": date, "hour": None, "images": []}
 
+    token = day_freshness(session, device, date).token
+
+    if format == "columnar":
+        # available_hours derive from the day's images, which the freshness
+        # token already tracks, so they can live inside the compressed body.
+        col_key = _BROWSE_HOUR_COL_CACHE.key(device, date, effective_hour, token)
+        body = _BROWSE_HOUR_COL_CACHE.get_bytes(col_key)
+        if body is None:
+            columns = ImageRecord.find_segments_columnar(
+                session, date=date, device=device, hour=effective_hour, today=is_today,
+            )
+            body = _gzip_json({
+                "format": "columnar",
+                "date": date,
+                "hour": effective_hour,
+                "available_hours": all_hours,
+                **columns,
+            })
+            _BROWSE_HOUR_COL_CACHE.set_bytes(col_key, body, _browse_ttl(date))
+        return _precompressed_response(request, body)
+
     # Return cached response if available
-    cache_key = f"browse:{device}:{date}:{effective_hour}"
-    cached = redis_client.get_json(cache_key)
+    cache_key = _BROWSE_HOUR_CACHE.key(device, date, effective_hour, token)
+    cached = _BROWSE_HOUR_CACHE.get_json(cache_key)
     if cached is not None:
         cached["available_hours"] = all_hours  # always serve fresh hour list
         return cached
@@ -531,7 +648,7 @@ async def get_images_by_hour(
     })
 
     ttl = _BROWSE_CACHE_TTL_TODAY if is_today else _BROWSE_CACHE_TTL_PAST
-    redis_client.set_json_with_ttl(cache_key, response, ttl)
+    _BROWSE_HOUR_CACHE.set_json(cache_key, response, ttl)
     return response
 
 
@@ -547,8 +664,11 @@ async def get_images_by_segment(
     _require_owner(access_level)
     _maybe_load_segments(session, device, date)
 
-    cache_key = f"browse:segment:{device}:{date}:{'unsegmented' if unsegmented else (segment_id if segment_id is not None else 'null')}"
-    cached = redis_client.get_json(cache_key)
+    cache_key = _BROWSE_SEGMENT_CACHE.key(
+        device, date, "unsegmented" if unsegmented else (segment_id if segment_id is not None else "null"),
+        day_freshness(session, device, date).token,
+    )
+    cached = _BROWSE_SEGMENT_CACHE.get_json(cache_key)
     if cached is not None:
         return cached
 
@@ -606,7 +726,7 @@ async def get_images_by_segment(
     # GPS lives on the segment; don't repeat the full list at the top level.
     response = jsonable_encoder({"segments": [segment]})
     ttl = _BROWSE_CACHE_TTL_TODAY if date == today else _BROWSE_CACHE_TTL_PAST
-    redis_client.set_json_with_ttl(cache_key, response, ttl)
+    _BROWSE_SEGMENT_CACHE.set_json(cache_key, response, ttl)
     return response
 
 
@@ -9,7 +9,7 @@ from datetime import datetime, timezone
 from typing import Annotated, List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from sqlalchemy import func, select, update
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from auth import _require_any_access, _require_owner
@@ -20,8 +20,10 @@ from database import get_session
 from database.models import Image as ImageModel
 from database.types import DaySummaryRecord, ImageRecord, PeriodSummaryRecord
 from schemas import CustomTarget, DaySummary, PeriodSummary
+from services.day_freshness import day_freshness
+from services.day_rollup import save_day_rollup
 from services.summary import summarize_lifelog_by_day, update_dirty_segments
-from tasks import describe_segment_task, day_summary_rebuild_task, text_summary_task
+from tasks import enqueue_describe_segment, day_summary_rebuild_task, text_summary_task
 from tasks.day_summary import (
     DEFAULT_TARGETS,
     _LIVE_THRESHOLD_MINUTES,
@@ -136,25 +138,11 @@ def get_day_summary(
     if not date:
         raise HTTPException(status_code=400, detail="Date is required.")
 
-    number_of_images = session.execute(
-        select(func.count(ImageModel.id)).where(
-            ImageModel.date == date,
-            ImageModel.device == device,
-            ImageModel.deleted == False,
-        )
-    ).scalar_one()
-
+    freshness = day_freshness(session, device, date)
+    number_of_images = freshness.image_count
     if number_of_images == 0:
         return None
-
-    last_image = session.execute(
-        select(ImageModel).where(
-            ImageModel.date == date,
-            ImageModel.device == device,
-            ImageModel.deleted == False,
-        ).order_by(ImageModel.image_path.desc())
-    ).scalars().first()
-    last_image_time = last_image.timestamp if last_image else None
+    last_image_time = freshness.last_image_time
 
     today = datetime.now().strftime("%Y-%m-%d")
     is_live = False
@@ -297,6 +285,7 @@ def get_day_summary(
         data={"$set": {**summary.model_dump(), "dirty_segment_ids": [], "text_summary_stale": False, "processing": False}},
         upsert=True,
     )
+    save_day_rollup(summary)
 
     return summary
 
@@ -331,14 +320,13 @@ def get_period_summary(
     if not start or not end or start > end:
         raise HTTPException(status_code=400, detail="Valid start and end (start<=end) required.")
 
-    from services.period_summary import (
-        _load_day_records, _period_summary_bg, aggregate_period, period_source_sig,
-    )
+    from services.day_rollup import load_day_rollups
+    from services.period_summary import _period_summary_bg, aggregate_period, period_source_sig
 
-    recs = _load_day_records(device, start, end)
-    if not recs:
+    days = load_day_rollups(device, start, end)
+    if not days:
         return None
-    sig = period_source_sig(recs)
+    sig = period_source_sig(days)
 
     existing = PeriodSummaryRecord.find_one(filter={
         "device": device, "kind": kind, "start_date": start, "end_date": end,
@@ -362,7 +350,7 @@ def get_period_summary(
 
     # Schedule a background build; return the aggregated shell (metrics + top
     # locations are cheap and useful immediately) with processing=True.
-    shell = aggregate_period(session, device, start, end, kind=kind)
+    shell = aggregate_period(session, device, start, end, kind=kind, days=days)
     shell.processing = True
     PeriodSummaryRecord.update_one(
         {"device": device, "kind": kind, "start_date": start, "end_date": end},
@@ -448,23 +436,9 @@ async def change_segment_activity(
         session, segment.date, device, n=10, segment_id_lt=request.segment_id
     )
 
-    thumbnails = [
-        img.thumbnail
-        for img in ImageRecord.find(
-            session,
-            segment_id=segment.segment_id,
-            date=request.date,
-            deleted=False,
-            device=device,
-            sort="image_path",
-            sort_desc=False,
-        )
-    ]
-
-    describe_segment_task.delay(
+    enqueue_describe_segment(
         device,
         request.date,
-        thumbnails,
         segment.segment_id,
         extra_info=[
             f"The previous activity descriptions were: {', '.join(all_summaries)}.",
@@ -4,13 +4,12 @@ from typing import Dict
 import json
 
 from fastapi import APIRouter, UploadFile, File, Form, BackgroundTasks, HTTPException
-from integrations.sessions.redis import RedisClient
+from integrations.sessions.redis import redis_client
 from core.config import DIR
 from routers.ingest.types import InitUploadRequest, InitUploadResponse, CompleteUploadRequest, CompleteUploadResponse, ProcessingStatusResponse
 from routers.ingest.utils import process_zip_job
 
 router = APIRouter()
-redis_client = RedisClient()
 
 UPLOAD_DIR = Path(DIR)
 UPLOAD_DIR.mkdir(exist_ok=True)
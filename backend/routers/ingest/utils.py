@@ -2,10 +2,7 @@ import zipfile
 from datetime import datetime
 from pathlib import Path
 
-from integrations.sessions.redis import RedisClient
-
-
-redis_client = RedisClient()
+from integrations.sessions.redis import redis_client
 
 
 def process_zip_job(job_id: str, UPLOAD_DIR: Path):
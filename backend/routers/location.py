@@ -8,24 +8,24 @@ from sqlalchemy.orm import Session
 
 from typing import  Annotated, List, Optional
 
-from tasks import update_location_task
+from tasks import start_gps_backfill, update_location_task
 from schemas.general import Coordinate, GPSInfo
-from auth import _require_owner, _require_any_access
+from auth import _require_admin, _require_owner, _require_any_access
 from auth.auth_models import auth_dependency, get_user
 from auth.devices import verify_device_and_user
 from auth.types import AccessLevel
 from database import get_session
 from schemas import CamelCaseModel
 
-from location.gps_pipeline import run_pipeline
+from location.backfill import BackfillRun
+from location.gps_pipeline import day_bounds, run_pipeline
 from database.models import Image, RawGPS, ImageGPS, SensorDevice, Location, LocationLabel
 from datetime import datetime, timezone as py_timezone
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from sqlalchemy import update as sa_update
-from integrations.sessions.redis import redis_client as _redis_client
-from timezonefinder import TimezoneFinder
+from integrations.sessions.redis import bust_all_day_caches, redis_client as _redis_client
 
 from location.utils import find_timezone
+from location.timezones import timezone_at, zone_info
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -48,7 +48,6 @@ class GPSUploadRequest(CamelCaseModel):
     bearing: Optional[float] = None
     provider: Optional[str] = None
 
-tf = TimezoneFinder()
 _GPS_PIPELINE_GATE_MINUTES = 15
 
 @router.put("/upload-gps", summary="Ingest a GPS reading from a device")
@@ -66,7 +65,7 @@ async def upload_gps(
         .values(last_seen=datetime.now(py_timezone.utc))
     )
 
-    timezone = find_timezone(request.longitude, request.latitude)
+    timezone = timezone_at(request.longitude, request.latitude)
     timestamp = datetime.fromisoformat(request.timestamp).astimezone(py_timezone.utc).replace(tzinfo=None)
 
     stmt = insert(RawGPS).values(
@@ -118,10 +117,7 @@ async def upload_gps(
     # that day — reprocessing already-enriched stops wastes geocoder/LLM calls and
     # can revert a corrected stop name. Past days are re-run only on explicit demand
     # (the /process-gps endpoint).
-    try:
-        tz = ZoneInfo(timezone) if timezone else py_timezone.utc
-    except (ZoneInfoNotFoundError, ValueError):
-        tz = py_timezone.utc
+    tz = (zone_info(timezone) if timezone else None) or py_timezone.utc
     fix_date = datetime.fromisoformat(request.timestamp).astimezone(tz).strftime("%Y-%m-%d")
     today = datetime.now(tz).strftime("%Y-%m-%d")
 
@@ -131,7 +127,7 @@ async def upload_gps(
     elif not _redis_client.get_value(gate_key):
         _redis_client.set_with_ttl(gate_key, "1", _GPS_PIPELINE_GATE_MINUTES * 60)
         logger.debug("Triggering GPS pipeline for device %s and date %s", user.device_id, fix_date)
-        update_location_task.delay(user.device_id, fix_date)
+        update_location_task.delay(user.device_id, fix_date, incremental=True)
     else:
         logger.debug("GPS pipeline gate active for device %s, skipping trigger", user.device_id)
         logger.debug("Gate TTL remaining: %s seconds", _redis_client.get_ttl(gate_key))
@@ -150,12 +146,25 @@ async def process_gps(
     # _require_owner(access_level)
     # Manual endpoint defaults to force=True so an explicit call always re-geocodes,
     # even when the day's GPS is unchanged (e.g. re-running after a code change).
+    # date=all fans the days out to the Celery backfill runner instead of looping
+    # inside the request; poll /location/backfill/{run_id} for progress.
     if date == "all":
         dates = session.execute(select(Image.date).where(Image.device == device, Image.timezone == None).distinct()).scalars().all()
-        for d in dates:
-            if d: run_pipeline(session, device, d, force=force)
-    else:
-        run_pipeline(session, device, date, force=force)
+        run_id = start_gps_backfill([(device, d) for d in dates if d], force=force)
+        return {"status": "queued", "run_id": run_id, "days": len(dates)}
+    run_pipeline(session, device, date, force=force)
+
+
+@router.get("/backfill/{run_id}", summary="Progress of a multi-day GPS backfill (admin)")
+async def gps_backfill_progress(
+    run_id: str,
+    access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
+):
+    _require_admin(access_level)
+    progress = BackfillRun(run_id).progress()
+    if not progress:
+        raise HTTPException(status_code=404, detail="Backfill run not found")
+    return progress
 
 
 @router.get("/latest-gps", summary="Get the most recent GPS fix for a device")
@@ -211,7 +220,6 @@ def get_gps_by_date(
         raise HTTPException(status_code=400, detail="Date parameter is required")
 
     from datetime import date as _date_cls
-    from sqlalchemy import func as _func
     is_today = (date == _date_cls.today().isoformat())
     cache_key = _GPS_CACHE_KEY.format(device=device, date=date)
 
@@ -243,13 +251,14 @@ def get_gps_by_date(
     # ── Raw GPS (dense — from standalone GPS device/phone) ───────────────────
     from database.models import Device as DeviceModel
     from datetime import timezone as _tz
+    day_start, day_end = day_bounds(date)
     raw_gps_rows = session.execute(
-        select(RawGPS)
+        select(RawGPS.latitude, RawGPS.longitude, RawGPS.elevation, RawGPS.timestamp)
         .join(DeviceModel, DeviceModel.id == RawGPS.device_id)
         .where(DeviceModel.device_id == device)
-        .where(_func.date(RawGPS.timestamp) == date)
+        .where(RawGPS.timestamp >= day_start, RawGPS.timestamp < day_end)
         .order_by(RawGPS.timestamp.asc())
-    ).scalars().all()
+    ).all()
 
     raw_gps = [
         _to_gps_info(
@@ -296,8 +305,7 @@ class LabelRequest(CamelCaseModel):
 def _bust_location_caches() -> None:
     # Location names surface in cached day-nav + day browse payloads; relabeling
     # is rare, so a broad bust is fine — the next read recomputes.
-    _redis_client.delete_pattern("day-nav:*")
-    _redis_client.delete_pattern("browse:day:*")
+    bust_all_day_caches()
 
 
 @router.get("/labeled", summary="Get the user's labeled locations", response_model=List[LabeledLocationOut])
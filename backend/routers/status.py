@@ -7,7 +7,7 @@ from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from schemas.general import LocationInfo
-from auth import _require_any_access
+from auth import _require_admin, _require_any_access
 from auth.auth_models import auth_dependency
 from auth.types import AccessLevel
 from database import get_session
@@ -51,6 +51,55 @@ def health_check():
     return {"status": "ok"}
 
 
+@router.get("/llm-metrics", summary="LLM dispatcher queue-wait / call-latency counters (admin)")
+def get_llm_metrics(
+    access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
+):
+    _require_admin(access_level)
+    from integrations.llm.dispatcher import llm_metrics
+    return llm_metrics()
+
+
+@router.get("/connection-metrics", summary="Connections opened per Celery task type (admin)")
+def get_connection_metrics(
+    access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
+):
+    _require_admin(access_level)
+    from core.connections import connections
+    return connections.stats()
+
+
+@router.get("/cache-metrics", summary="Browse/day-nav cache hit rates per family (admin)")
+def get_cache_metrics(
+    access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
+):
+    _require_admin(access_level)
+    from integrations.sessions.redis import cache_stats
+    return cache_stats()
+
+
+@router.get("/prefetch-metrics", summary="Adjacent-day browse prefetch counters (admin)")
+def get_prefetch_metrics(
+    access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
+):
+    _require_admin(access_level)
+    from services.browse_prefetch import prefetch_stats
+    return prefetch_stats()
+
+
+@router.get("/day-summary-metrics", summary="Day-summary rebuild phase timings (admin)")
+def get_day_summary_metrics(
+    device: Optional[str] = None,
+    date: Optional[str] = None,
+    access_level: Annotated[AccessLevel, Depends(auth_dependency)] = AccessLevel.NONE,
+):
+    """Per-phase run/skip counts and average ms across rebuilds, or the latest
+    rebuild's plan and phase timings when ``device`` and ``date`` are given."""
+    _require_admin(access_level)
+    from tasks.day_summary import day_summary_phase_metrics
+    return day_summary_phase_metrics(device, date)
+
+
 @router.get("/current", response_model=CurrentStatusResponse)
 def get_current_status(
     device: str,
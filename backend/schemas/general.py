@@ -384,6 +384,37 @@ class DaySummary(CamelCaseModel):
     text_summary_generated_at: Optional[datetime] = None  # last time LLM text was generated
 
 
+class RollupVisit(CamelCaseModel):
+    """One location visit as kept in a DayRollup: enough to rank places and
+    tell home from away, without the description or segment lists."""
+    name: str = ""
+    stop: Optional[bool] = None
+    latitude: Coordinate = None
+    longitude: Coordinate = None
+    duration: int = 0  # seconds
+    representative_image: Optional[LifelogImage] = None
+
+
+class DayRollup(CamelCaseModel):
+    """
+    Compact per-day projection of a DaySummary, written whenever the day is
+    saved. Period summaries, trends and trip detection read these instead of
+    the full day documents (segments, period metrics, visit descriptions).
+    """
+    device: str = ""
+    date: str
+    active: bool = False  # any captured minutes or segments
+    total_minutes: float = 0.0
+    total_images: int = 0
+    category_minutes: Dict[str, float] = Field(default_factory=dict)
+    binary_metrics: Dict[str, float] = Field(default_factory=dict)
+    burst_counts: Dict[str, int] = Field(default_factory=dict)
+    visits: List[RollupVisit] = Field(default_factory=list)
+    summary_text: str = ""
+    text_summary_generated_at: Optional[datetime] = None
+    saved_at: Optional[datetime] = None  # freshness: changes on every save
+
+
 # ---------------------------------------------------------------------------
 # Multi-day period summaries (week / month / trip / custom) — a hierarchy on
 # top of the per-day DaySummary. The day is the atomic unit; a period rolls up
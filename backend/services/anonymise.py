@@ -10,7 +10,7 @@ from ultralytics.models.sam import SAM3SemanticPredictor
 from ultralytics.models import FastSAM
 import logging
 
-from services.utils import to_base64, make_grid_thumbnail
+from services.utils import to_base64, make_grid_thumbnail, make_llm_payload
 
 logger = logging.getLogger(__name__)
 
@@ -230,6 +230,8 @@ def anonymise_image(image_path, thumbnail_path, blur_face_boxes, whitelist_boxes
     # Small derivative for the browse grid (cards are ~200px tall). Same webp,
     # separate file alongside the full thumbnail; full one is kept for zoom.
     make_grid_thumbnail(img, thumbnail_path)
+    # Pre-encoded JPEG for vision-LLM calls, so annotation never re-encodes.
+    make_llm_payload(img, thumbnail_path)
 
 # Create a FastSAM model
 model = FastSAM("FastSAM-x.pt")  # or FastSAM-x.pt
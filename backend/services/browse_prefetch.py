@@ -0,0 +1,138 @@
+"""
+Background warming of the browse caches for the days a user is likely to open next.
+
+Serving a day (``/browse/day-nav`` or ``/browse/get-segments-by-date``) calls
+``schedule_prefetch``, which enqueues one low-priority ``prefetch_browse_day_task``
+per neighbouring day (the previous and next day, plus the served day itself for
+whichever view was not requested). The worker builds any view that is not
+already cached (``routers.browse.warm_browse_day``), so stepping to the adjacent
+day is served from Redis.
+
+Jobs are deduplicated per (device, date) for ``_DEDUP_TTL_S`` and rate-limited
+per user to ``_MAX_JOBS_PER_MIN``. Every warmed entry carries a marker; the first
+cache hit on it counts as "used", so ``prefetch_stats`` shows how much of the
+warming pays off.
+
+Public API:
+    schedule_prefetch(device, date, username)   -> int   (jobs enqueued)
+    mark_prefetched(view, cache_key, ttl)
+    note_cache_hit(view, cache_key)
+    record_warm(view, outcome)
+    prefetch_stats()                             -> dict
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+import redis
+
+from integrations.sessions.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_STATS_KEY = "prefetch:stats"
+_DEDUP_TTL_S = 300  # matches the live-day browse TTL; older entries may be gone
+_MAX_JOBS_PER_MIN = 20
+_PRIORITY = 9  # lowest on the Redis broker (0 = first)
+
+
+def _mark_key(cache_key: str) -> str:
+    return f"prefetch:mark:{cache_key}"
+
+
+def _bump(field: str, n: int = 1) -> None:
+    try:
+        redis_client.client.hincrby(_STATS_KEY, field, n)
+    except redis.RedisError:
+        pass
+
+
+def _targets(date: str) -> list[str]:
+    """The served day and its neighbours, never past today."""
+    day = datetime.strptime(date, "%Y-%m-%d")
+    today = datetime.now().strftime("%Y-%m-%d")
+    out = [date, (day - timedelta(days=1)).strftime("%Y-%m-%d")]
+    nxt = (day + timedelta(days=1)).strftime("%Y-%m-%d")
+    if nxt <= today:
+        out.append(nxt)
+    return out
+
+
+def schedule_prefetch(device: str, date: str, username: str | None) -> int:
+    """Enqueue warm-up jobs for ``date`` and its neighbours. Never raises —
+    prefetching is best-effort and must not fail the request serving the day."""
+    try:
+        targets = _targets(date)
+    except ValueError:
+        return 0
+
+    client = redis_client.client
+    rate_key = f"prefetch:rate:{username or device}"
+    enqueued = 0
+    try:
+        from tasks import prefetch_browse_day_task
+
+        for target in targets:
+            if not client.set(f"prefetch:queued:{device}:{target}", 1, nx=True, ex=_DEDUP_TTL_S):
+                _bump("deduped")
+                continue
+            used = client.incr(rate_key)
+            if used == 1:
+                client.expire(rate_key, 60)
+            if used > _MAX_JOBS_PER_MIN:
+                # Release the dedup slot so a later, un-throttled request can queue it.
+                client.delete(f"prefetch:queued:{device}:{target}")
+                _bump("rate_limited")
+                continue
+            prefetch_browse_day_task.apply_async((device, target, username), priority=_PRIORITY)
+            enqueued += 1
+        if enqueued:
+            _bump("enqueued", enqueued)
+    except Exception as exc:
+        logger.debug("schedule_prefetch failed for %s/%s: %s", device, date, exc)
+    return enqueued
+
+
+def mark_prefetched(view: str, cache_key: str, ttl_seconds: int) -> None:
+    try:
+        redis_client.client.set(_mark_key(cache_key), view, ex=ttl_seconds)
+    except redis.RedisError:
+        pass
+
+
+def note_cache_hit(view: str, cache_key: str) -> None:
+    """Count the first hit on an entry the prefetcher warmed."""
+    try:
+        if redis_client.client.delete(_mark_key(cache_key)):
+            _bump(f"used:{view}")
+    except redis.RedisError:
+        pass
+
+
+def record_warm(view: str, outcome: str) -> None:
+    """``outcome`` is "warmed" (built by the prefetcher), "cached" (already
+    present) or "empty" (nothing to cache for that day)."""
+    _bump(f"{outcome}:{view}")
+
+
+def prefetch_stats() -> dict:
+    """Scheduling counters plus warmed / already-cached / used counts and the
+    used-to-warmed ratio per view."""
+    raw = {
+        k.decode(): int(v)
+        for k, v in redis_client.client.hgetall(_STATS_KEY).items()
+    }
+    out: dict = {
+        "scheduling": {
+            name: raw.get(name, 0) for name in ("enqueued", "deduped", "rate_limited")
+        },
+        "views": {},
+    }
+    for field, n in raw.items():
+        if ":" not in field:
+            continue
+        outcome, view = field.split(":", 1)
+        out["views"].setdefault(view, {"warmed": 0, "cached": 0, "empty": 0, "used": 0})[outcome] = n
+    for counts in out["views"].values():
+        counts["use_rate"] = round(counts["used"] / counts["warmed"], 3) if counts["warmed"] else 0.0
+    return out
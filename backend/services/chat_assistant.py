@@ -24,7 +24,7 @@ from database.types import ChatMemoryRecord, DaySummaryRecord, ImageRecord
 from integrations.llm.openai import openai_llm
 from integrations.sessions.redis import bust_day_caches
 from schemas import AppliedAction, ChatMemory, ChatMessage, TokenUsage
-from tasks import describe_segment_task
+from tasks import enqueue_describe_segment
 
 logger = logging.getLogger(__name__)
 
@@ -317,24 +317,14 @@ def _handle_edit_segment_activity(
     instructions = args.get("instructions", "")
     if segment_id is None:
         return "Error: segment_id required."
-    thumbnails = [
-        img.thumbnail
-        for img in ImageRecord.find(
-            session,
-            segment_id=segment_id,
-            date=date,
-            deleted=False,
-            device=device,
-            sort="image_path",
-            sort_desc=False,
-        )
-    ]
-    if not thumbnails:
+    segment = ImageRecord.find_one(
+        session, segment_id=segment_id, date=date, deleted=False, device=device
+    )
+    if not segment:
         return f"Error: segment {segment_id} not found on {date}."
-    describe_segment_task.delay(
+    enqueue_describe_segment(
         device,
         date,
-        thumbnails,
         segment_id,
         extra_info=[
             f"Camera viewer instruction: {instructions}. Incorporate this into the description.",
@@ -354,6 +344,8 @@ def _handle_edit_day_summary_text(device: str, date: str, args: Dict[str, Any])
         {"date": date, "device": device},
         data={"$set": {"summary_text": new_text, "text_summary_generated_at": datetime.utcnow()}},
     )
+    from services.day_rollup import refresh_day_rollup
+    refresh_day_rollup(device, date)
     return "Day summary updated."
 
 
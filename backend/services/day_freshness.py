@@ -0,0 +1,47 @@
+"""
+Per-(device, date) freshness fingerprint.
+
+The day summary, day-nav and browse caches all need to answer the same
+question: "has this day changed since I cached it?" ``day_freshness`` answers
+it with one aggregate over the covering ``ix_images_day_freshness`` index
+(device, date, deleted INCLUDE timestamp, segment_id), so Postgres serves it
+from an index-only scan without touching the heap or transferring any rows.
+
+Ingest moves the image count and the max timestamp, deletion moves the count,
+and segmentation moves the max segment id. Annotation, re-segmentation and the
+GPS pipeline already bump the day's cache version (``bust_day_caches``), which
+every ``DayCache`` key carries, so the fingerprint does not repeat it.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database.models import Image
+
+
+@dataclass(frozen=True)
+class DayFreshness:
+    image_count: int
+    last_image_time: datetime | None
+    max_segment_id: int | None
+
+    @property
+    def token(self) -> str:
+        """Compact cache-key part; changes whenever any field does."""
+        ts = int(self.last_image_time.timestamp()) if self.last_image_time else 0
+        return f"{self.image_count}.{ts}.{self.max_segment_id if self.max_segment_id is not None else '-'}"
+
+
+def day_freshness(session: Session, device: str, date: str) -> DayFreshness:
+    """Image count, last image time and max segment id of a day's live images."""
+    count, last_ts, max_seg = session.execute(
+        select(func.count(), func.max(Image.timestamp), func.max(Image.segment_id)).where(
+            Image.device == device,
+            Image.date == date,
+            Image.deleted == False,
+        )
+    ).one()
+    return DayFreshness(int(count or 0), last_ts, max_seg)
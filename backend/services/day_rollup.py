@@ -0,0 +1,113 @@
+"""
+Compact per-day rollups — the input to period summaries, trends and trips.
+
+A DaySummaryRecord carries every segment, period metric, visit description and
+representative image of the day. Period aggregation, period-over-period trends
+and trip detection only need a few numbers and the visited place names per day,
+yet loaded and re-validated the full documents (trip detection for the device's
+whole history). ``save_day_rollup`` is called wherever a day summary is saved
+and writes a ``DayRollupRecord`` holding just those fields. ``load_day_rollups``
+reads them back with a projection that leaves out the day text unless asked.
+
+Days summarized before rollups existed are back-filled lazily: the first load
+that finds a DaySummaryRecord without a rollup builds it once.
+
+Public API:
+    build_day_rollup(summary)                        -> DayRollup
+    save_day_rollup(summary)                         -> DayRollup
+    refresh_day_rollup(device, date)                 -> DayRollup | None
+    load_day_rollups(device, start, end, with_text)  -> list[DayRollup]
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from database.types import DayRollupRecord, DaySummaryRecord
+from schemas import DayRollup, DaySummary, RollupVisit
+
+logger = logging.getLogger(__name__)
+
+
+def build_day_rollup(summary: DaySummary) -> DayRollup:
+    visits = [
+        RollupVisit(
+            name=(v.location_name or "").strip(),
+            stop=v.location_stop,
+            latitude=v.location_latitude,
+            longitude=v.location_longitude,
+            duration=v.duration or 0,
+            # Only named stops become ranked places; transit needs no image.
+            representative_image=v.representative_image if v.location_stop is not False else None,
+        )
+        for v in summary.location_visits or []
+    ]
+    return DayRollup(
+        device=summary.device,
+        date=summary.date,
+        active=(summary.total_minutes or 0) > 0 or bool(summary.segments),
+        total_minutes=summary.total_minutes or 0.0,
+        total_images=summary.total_images or 0,
+        category_minutes=dict(summary.category_minutes or {}),
+        binary_metrics=dict(summary.binary_metrics or {}),
+        burst_counts={name: len(stamps or []) for name, stamps in (summary.burst_metrics or {}).items()},
+        visits=visits,
+        summary_text=summary.summary_text or "",
+        text_summary_generated_at=summary.text_summary_generated_at,
+        saved_at=datetime.now(timezone.utc),
+    )
+
+
+def save_day_rollup(summary: DaySummary) -> DayRollup | None:
+    """Upsert the rollup of ``summary``. Never raises: a failed write only
+    leaves the previous rollup in place until the day is saved again."""
+    try:
+        rollup = build_day_rollup(summary)
+        DayRollupRecord.update_one(
+            {"device": rollup.device, "date": rollup.date},
+            data={"$set": rollup.model_dump()},
+            upsert=True,
+        )
+        return rollup
+    except Exception as exc:
+        logger.warning("save_day_rollup failed for %s/%s: %s", summary.device, summary.date, exc)
+        return None
+
+
+def refresh_day_rollup(device: str, date: str) -> DayRollup | None:
+    """Rebuild the rollup from the stored day summary, for writers that patch
+    the record in place instead of holding a DaySummary."""
+    record = DaySummaryRecord.find_one(filter={"device": device, "date": date})
+    if record is None:
+        return None
+    return save_day_rollup(DaySummary.model_validate(record.__dict__))
+
+
+def load_day_rollups(
+    device: str,
+    start: str | None = None,
+    end: str | None = None,
+    with_text: bool = False,
+) -> list[DayRollup]:
+    """Rollups of the device's summarized days in [start, end] (inclusive; open
+    when omitted), ordered by date. ``summary_text`` is only read with
+    ``with_text``."""
+    date_filter: dict = {}
+    if start:
+        date_filter["$gte"] = start
+    if end:
+        date_filter["$lte"] = end
+    flt = {"device": device, **({"date": date_filter} if date_filter else {})}
+
+    projection = None if with_text else {"summary_text": 0}
+    docs = {d["date"]: d for d in DayRollupRecord.find_raw(filter=flt, projection=projection)}
+    rollups = {date: DayRollup.model_validate(doc) for date, doc in docs.items()}
+
+    summarized = {d["date"] for d in DaySummaryRecord.find_raw(filter=flt, projection={"date": 1, "_id": 0})}
+    missing = sorted(summarized - rollups.keys())
+    if missing:
+        logger.info("Back-filling %d day rollups for %s", len(missing), device)
+        for record in DaySummaryRecord.find(filter={"device": device, "date": {"$in": missing}}):
+            rollup = save_day_rollup(DaySummary.model_validate(record.__dict__))
+            if rollup is not None:
+                rollups[rollup.date] = rollup
+    return [rollups[d] for d in sorted(rollups)]
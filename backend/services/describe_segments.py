@@ -1,16 +1,13 @@
-import io
-import random
-import time
 import traceback
 import numpy as np
 
 from celery.utils.log import get_task_logger
 from core.config import CATEGORIES, CATEGORIES_WITH_GROUPS, THUMBNAIL_DIR
-from google.genai.errors import ClientError
-from integrations.llm import MixedContent, get_visual_content, llm
+from integrations.llm import MixedContent, get_visual_content, llm, llm_dispatcher
 from partialjson.json_parser import JSONParser
-from PIL import Image
 from integrations.visual import clip_model
+from services.frame_selection import LLM_MAX_FRAMES, sample_evenly
+from services.utils import load_llm_payload
 
 logger = get_task_logger(__name__)
 logger.setLevel("DEBUG")
@@ -90,26 +87,24 @@ def describe_segment(
     segment_id: int,
     context: str = "",
     extra_info: list[str] = [],
+    enqueued_at: float | None = None,
 ):
     logger.info(
         f"[{device}/{date}] Describing segment {segment_id} ({len(segment)} images)"
     )
 
     image_bytes = []
-    if len(segment) > 20:
-        segment = [segment[i] for i in sorted(random.sample(range(len(segment)), 20))]
-        logger.debug(f"Segment {segment_id}: downsampled to 20 images")
+    if len(segment) > LLM_MAX_FRAMES:
+        # Callers normally pre-select frames (services.frame_selection); this is
+        # the safety net when no embeddings were available to choose with.
+        segment = sample_evenly(segment, LLM_MAX_FRAMES)
+        logger.debug(f"Segment {segment_id}: downsampled to {LLM_MAX_FRAMES} images")
 
     for image_path in segment:
         if THUMBNAIL_DIR not in image_path:
             image_path = f"{THUMBNAIL_DIR}/{device}/{image_path}"
         try:
-            image = Image.open(image_path).convert("RGB")
-            # resize to 512x512 for LLM input
-            # image.thumbnail((512, 512), Image.Resampling.LANCZOS)
-            buf = io.BytesIO()
-            image.save(buf, format="JPEG")
-            image_bytes.append(buf.getvalue())
+            image_bytes.append(load_llm_payload(image_path))
         except Exception as e:
             logger.warning(
                 f"Segment {segment_id}: failed to load image {image_path}: {e}"
@@ -130,7 +125,6 @@ def describe_segment(
     description = ""
     confidence = "Low"
     tags: list[str] = []
-    tries = 0
 
     context_block = f"Context about this segment:\n{context}\n\n" if context else ""
     formatted_prompt = PROMPT.format(
@@ -139,66 +133,41 @@ def describe_segment(
         context_block=context_block,
     )
 
-    while True:
-        if tries >= 5:
-            logger.error(f"Segment {segment_id}: max retries reached, skipping.")
-            break
-        try:
-            tries += 1
-            logger.debug(f"Segment {segment_id}: LLM attempt {tries}")
-            parsed_obj = get_description_from_frames(
-                [formatted_prompt] + extra_info,
-                image_bytes,
-            )
+    # One attempt per task run. Rate limits and transient errors (safety block,
+    # connection reset, timeout, 5xx) surface as RetryLater so the task can
+    # re-queue itself with a countdown instead of sleeping on the worker.
+    with llm_dispatcher.slot(enqueued_at):
+        parsed_obj = get_description_from_frames(
+            [formatted_prompt] + extra_info,
+            image_bytes,
+        )
+
+    if parsed_obj:
+        raw_group = parsed_obj.get("group", "")
+        activity = parsed_obj.get("activity", "unclear activity").lower().strip()
+        description = parsed_obj.get("description", "")
+        confidence = parsed_obj.get("confidence", "Low")
+
+        # Snap to the nearest valid group (case-insensitive substring match)
+        matched = [g for g in _GROUP_NAMES if g.lower() == raw_group.lower()]
+        if not matched:
+            matched = [g for g in _GROUP_NAMES if g.lower() in raw_group.lower() or raw_group.lower() in g.lower()]
+        group = matched[0] if matched else "Miscellaneous"
+
+        # Validate tags against canonical list (case-insensitive)
+        _act_lower = {a.lower(): a for a in _ALL_ACTIVITIES}
+        raw_tags = parsed_obj.get("tags", [])
+        tags = [
+            _act_lower[t.lower()]
+            for t in (raw_tags if isinstance(raw_tags, list) else [])
+            if t.lower() in _act_lower
+        ]
 
-            if parsed_obj:
-                raw_group = parsed_obj.get("group", "")
-                activity = parsed_obj.get("activity", "unclear activity").lower().strip()
-                description = parsed_obj.get("description", "")
-                confidence = parsed_obj.get("confidence", "Low")
-
-                # Snap to the nearest valid group (case-insensitive substring match)
-                matched = [g for g in _GROUP_NAMES if g.lower() == raw_group.lower()]
-                if not matched:
-                    matched = [g for g in _GROUP_NAMES if g.lower() in raw_group.lower() or raw_group.lower() in g.lower()]
-                group = matched[0] if matched else "Miscellaneous"
-
-                # Validate tags against canonical list (case-insensitive)
-                _act_lower = {a.lower(): a for a in _ALL_ACTIVITIES}
-                raw_tags = parsed_obj.get("tags", [])
-                tags = [
-                    _act_lower[t.lower()]
-                    for t in (raw_tags if isinstance(raw_tags, list) else [])
-                    if t.lower() in _act_lower
-                ]
-
-                logger.info(
-                    f"Segment {segment_id}: group={group}, activity={activity}, confidence={confidence}, tags={tags}"
-                )
-            else:
-                logger.warning(f"Segment {segment_id}: LLM returned no parsed object")
-            break
-
-        except KeyboardInterrupt as e:
-            raise e
-        except ClientError as e:
-            delay = 10
-            for detail in e.details["error"]["details"]:
-                if "retryDelay" in detail:
-                    delay = int(detail["retryDelay"].replace("s", "")) + 10
-            logger.warning(
-                f"Segment {segment_id}: ClientError, retrying in {delay}s: {e}"
-            )
-            time.sleep(delay)
-        except Exception as e:
-            # ServerError plus any other error (safety block, connection reset,
-            # timeout, non-wrapped 5xx) — retry with backoff instead of letting it
-            # propagate and leave the segment permanently unannotated (grey on DayNav).
-            logger.warning(
-                f"Segment {segment_id}: transient error, retrying in 10s: {e}"
-            )
-            logger.debug(traceback.format_exc())
-            time.sleep(10)
+        logger.info(
+            f"Segment {segment_id}: group={group}, activity={activity}, confidence={confidence}, tags={tags}"
+        )
+    else:
+        logger.warning(f"Segment {segment_id}: LLM returned no parsed object")
 
     return {
         "activity": activity.title(),
@@ -4,14 +4,13 @@ Mirrors services/describe_segments.py but asks the vision LLM for a structured
 meal record (items + rough portion, rough calories, meal type, healthiness).
 Portions and calories are explicitly ballpark estimates, not medical figures.
 """
-import io
 import traceback
 
-from PIL import Image
-
 from core.config import THUMBNAIL_DIR
-from integrations.llm import MixedContent, get_visual_content, llm
+from integrations.llm import MixedContent, RetryLater, get_visual_content, llm, llm_dispatcher
 from partialjson.json_parser import JSONParser
+from services.frame_selection import sample_evenly as _sample_evenly
+from services.utils import load_llm_payload
 from celery.utils.log import get_task_logger
 
 logger = get_task_logger(__name__)
@@ -54,25 +53,13 @@ your best guess. Pick meal_type using the time of day when given.
 """
 
 
-def _sample_evenly(paths: list[str], n: int) -> list[str]:
-    """Pick up to n evenly-spaced frames (a plate barely changes within a segment,
-    so evenly-spaced beats sending them all)."""
-    if len(paths) <= n:
-        return paths
-    step = (len(paths) - 1) / (n - 1) if n > 1 else 0
-    return [paths[round(i * step)] for i in range(n)]
-
-
 def _load_bytes(device: str, paths: list[str]) -> list[bytes]:
     paths = _sample_evenly(paths, _MAX_IMAGES)
     out: list[bytes] = []
     for p in paths:
         path = p if THUMBNAIL_DIR in p else f"{THUMBNAIL_DIR}/{device}/{p}"
         try:
-            img = Image.open(path).convert("RGB")
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG")
-            out.append(buf.getvalue())
+            out.append(load_llm_payload(path))
         except Exception as e:
             logger.warning("food_pass: failed to load %s: %s", path, e)
     return out
@@ -116,8 +103,10 @@ def describe_food_segment(
     thumbnails: list[str],
     segment_id: int,
     local_time: str = "",
+    enqueued_at: float | None = None,
 ) -> dict | None:
-    """Return the normalized food record for a segment, or None on failure/no food."""
+    """Return the normalized food record for a segment, or None on failure/no food.
+    Raises RetryLater when the LLM call should be retried later (rate limit)."""
     image_bytes = _load_bytes(device, thumbnails)
     if not image_bytes:
         logger.error("food_pass: segment %s has no images", segment_id)
@@ -126,9 +115,12 @@ def describe_food_segment(
     time_hint = f" at around {local_time}" if local_time else ""
     prompt = _PROMPT.format(time_hint=time_hint)
     try:
-        raw = llm.generate_from_mixed_media(
-            get_visual_content(image_bytes) + [MixedContent(type="text", content=prompt)]
-        )
+        with llm_dispatcher.slot(enqueued_at):
+            raw = llm.generate_from_mixed_media(
+                get_visual_content(image_bytes) + [MixedContent(type="text", content=prompt)]
+            )
+    except RetryLater:
+        raise
     except Exception as e:
         logger.warning("food_pass: LLM call failed for segment %s: %s", segment_id, e)
         logger.debug(traceback.format_exc())
@@ -0,0 +1,179 @@
+"""Frame selection — pick the few frames of a segment worth sending to the vision LLM.
+
+A segment is mostly near-duplicate frames (the camera fires every 10 s while the
+wearer sits still), so sending 20 random frames pays for the same scene many
+times and can still miss the one frame where something changes. Instead we run
+a greedy farthest-point (k-center) pass over the stored SigLIP embeddings,
+weighting each candidate by its centrality (the same centroid similarity
+``pick_representative_index_for_segment`` ranks by) so outliers like a blurred
+frame or a ceiling shot don't win purely for being far from everything else.
+"""
+import logging
+from typing import Sequence, TypeVar
+
+import numpy as np
+from sqlalchemy import select
+
+from core.config import THUMBNAIL_DIR
+from database.models import Image, ImageEmbedding
+from services.segmentation import segment_centrality
+from services.utils import compress_image
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Frames sent per segment annotation. 6–8 diverse frames describe a segment as
+# well as 20 random ones at under half the vision tokens.
+LLM_MAX_FRAMES = 8
+
+# Stop adding frames once every remaining one is this close (cosine distance) to
+# a frame already picked — a static scene needs fewer than LLM_MAX_FRAMES.
+MIN_FRAME_DISTANCE = 0.02
+
+
+def sample_evenly(items: Sequence[T], n: int) -> list[T]:
+    """Pick up to n evenly-spaced items (fallback when no embeddings exist)."""
+    if len(items) <= n:
+        return list(items)
+    step = (len(items) - 1) / (n - 1) if n > 1 else 0
+    return [items[round(i * step)] for i in range(n)]
+
+
+def select_diverse_indices(
+    feats: np.ndarray,
+    k: int = LLM_MAX_FRAMES,
+    alpha_centroid: float = 0.5,
+    min_distance: float = MIN_FRAME_DISTANCE,
+) -> list[int]:
+    """Greedy centrality-weighted farthest-point selection.
+
+    Starts from the most central frame, then repeatedly adds the frame whose
+    cosine distance to the nearest already-picked frame, scaled by
+    ``alpha_centroid + (1 - alpha_centroid) * centrality``, is largest.
+
+    Returns:
+        up to ``k`` indices into ``feats``, in ascending (chronological) order.
+    """
+    n = len(feats)
+    if n == 0 or k <= 0:
+        return []
+    if n <= k:
+        return list(range(n))
+
+    feats, sim_centroid = segment_centrality(feats)
+    # Rescale centrality to [0, 1] so the weight only reorders candidates.
+    spread = float(sim_centroid.max() - sim_centroid.min())
+    centrality = (sim_centroid - sim_centroid.min()) / spread if spread > 1e-8 else np.ones(n)
+    weight = alpha_centroid + (1.0 - alpha_centroid) * centrality
+
+    first = int(np.argmax(sim_centroid))
+    chosen = [first]
+    min_dist = 1.0 - feats @ feats[first]
+    min_dist[first] = 0.0
+    while len(chosen) < k:
+        nxt = int(np.argmax(min_dist * weight))
+        if min_dist[nxt] < min_distance:
+            break
+        chosen.append(nxt)
+        min_dist = np.minimum(min_dist, 1.0 - feats @ feats[nxt])
+        min_dist[nxt] = 0.0
+    return sorted(chosen)
+
+
+def select_segment_frames(
+    session,
+    device: str,
+    date: str,
+    segment_id: int,
+    thumbnail_paths: list[str],
+    k: int = LLM_MAX_FRAMES,
+) -> list[str]:
+    """Reduce a segment's thumbnail paths to the ``k`` most diverse frames.
+
+    Thumbnails are matched to their images by path stem
+    (``{THUMBNAIL_DIR}/{device}/{stem}.webp``). Frames without an embedding yet
+    are only used when none of the segment has been encoded, in which case the
+    pick falls back to evenly-spaced frames.
+    """
+    if len(thumbnail_paths) <= k:
+        return thumbnail_paths
+
+    prefix = f"{THUMBNAIL_DIR}/{device}/"
+    stem_to_thumb = {
+        p.removeprefix(prefix).rsplit(".", 1)[0]: p for p in thumbnail_paths
+    }
+    try:
+        rows = session.execute(
+            select(Image.image_path, ImageEmbedding.embedding)
+            .join(ImageEmbedding, ImageEmbedding.image_id == Image.id)
+            .where(
+                Image.device == device,
+                Image.date == date,
+                Image.segment_id == segment_id,
+                Image.deleted == False,
+            )
+            .order_by(Image.timestamp.asc())
+        ).all()
+    except Exception as e:
+        logger.warning("select_segment_frames: embedding fetch failed for %s/%s seg %s: %s",
+                       device, date, segment_id, e)
+        rows = []
+
+    thumbs: list[str] = []
+    feats: list[np.ndarray] = []
+    for image_path, embedding in rows:
+        thumb = stem_to_thumb.get(image_path.rsplit(".", 1)[0])
+        if thumb is not None and embedding is not None:
+            thumbs.append(thumb)
+            feats.append(np.asarray(embedding, dtype=np.float32))
+
+    if not feats:
+        return sample_evenly(thumbnail_paths, k)
+
+    indices = select_diverse_indices(np.stack(feats), k)
+    logger.debug("Segment %s: selected %d/%d frames by embedding diversity",
+                 segment_id, len(indices), len(thumbnail_paths))
+    return [thumbs[i] for i in indices]
+
+
+def resolve_segment_frames(
+    session,
+    device: str,
+    date: str,
+    segment_id: int,
+    k: int = LLM_MAX_FRAMES,
+) -> list[str]:
+    """Pick a segment's frames from the database and return their thumbnails.
+
+    For tasks queued by segment id alone: the picked frames come from the same
+    embedding pass as ``select_segment_frames`` (evenly-spaced when nothing is
+    encoded), and only those ``k`` images go through ``compress_image``.
+    """
+    rows = session.execute(
+        select(Image.image_path, ImageEmbedding.embedding)
+        .outerjoin(ImageEmbedding, ImageEmbedding.image_id == Image.id)
+        .where(
+            Image.device == device,
+            Image.date == date,
+            Image.segment_id == segment_id,
+            Image.deleted == False,
+        )
+        .order_by(Image.timestamp.asc())
+    ).all()
+
+    encoded = [(path, emb) for path, emb in rows if emb is not None]
+    if encoded:
+        feats = np.stack([np.asarray(emb, dtype=np.float32) for _, emb in encoded])
+        picked = [encoded[i][0] for i in select_diverse_indices(feats, k)]
+    else:
+        picked = sample_evenly([path for path, _ in rows], k)
+
+    thumbs: list[str] = []
+    for image_path in picked:
+        try:
+            thumbs.append(compress_image(f"{device}/{image_path}"))
+        except Exception as e:
+            logger.warning("resolve_segment_frames: thumbnail failed for %s/%s: %s",
+                           device, image_path, e)
+    return thumbs
@@ -11,8 +11,14 @@ personal Home/Work label) we optionally ground the description with a
 Google-search lookup of current events near that place on that date, so a
 description can say "watched the match at Croke Park" rather than just
 "at a stadium".
+
+Built visits are materialised in ``day_location_visits`` with three
+signatures — grouping, description inputs, event-lookup arguments — so a
+rebuild reuses the description and event note of every visit whose inputs did
+not change and sends only the changed visits to the LLM / web search.
 """
 
+import hashlib
 import json
 import logging
 from concurrent.futures import ThreadPoolExecutor
@@ -20,11 +26,11 @@ from datetime import timedelta
 from typing import Optional
 
 from partialjson.json_parser import JSONParser
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 
 from core.timefmt import fmt_hm, to_local
-from database.models import Image, ImageGPS, ImagePerson, LocationLabel
+from database.models import DayLocationVisit, Image, ImageGPS, ImagePerson, LocationLabel
 from integrations.llm import llm
 
 _json_parser = JSONParser()
@@ -403,15 +409,16 @@ def _is_notable_venue(name: Optional[str], stop: Optional[bool], labeled: set[st
     return True
 
 
-def _segment_descriptions(session: Session, device: str, date: str, segment_ids: list[int]) -> list[str]:
-    """Distinct per-segment activity descriptions for a visit, in time order."""
+def _segment_notes(session: Session, device: str, date: str) -> dict[int, str]:
+    """Per-segment activity description for the whole day in one query — the
+    first meaningful one in time order — keyed by segment_id."""
     rows = session.execute(
         select(Image.segment_id, Image.activity, Image.activity_description)
         .where(
             Image.device == device,
             Image.date == date,
             Image.deleted == False,
-            Image.segment_id.in_(segment_ids),
+            Image.segment_id.isnot(None),
         )
         .order_by(Image.timestamp.asc())
     ).all()
@@ -424,25 +431,71 @@ def _segment_descriptions(session: Session, device: str, date: str, segment_ids:
         text = (desc or "").strip() or (activity or "").strip()
         if text:
             seen[sid] = text
-    return list(seen.values())
+    return seen
 
 
-def _visit_people(session: Session, device: str, date: str, segment_ids: list[int]) -> list[str]:
+def _segment_people(session: Session, device: str, date: str) -> dict[int, set[str]]:
+    """Named people per segment for the whole day in one query."""
     from tasks import _ANONYMOUS_FACE_LABELS  # reuse the ingest anonymous set
-    labels = session.execute(
-        select(ImagePerson.label)
+    rows = session.execute(
+        select(Image.segment_id, ImagePerson.label)
         .join(Image, Image.id == ImagePerson.image_id)
         .where(
             Image.device == device,
             Image.date == date,
             Image.deleted == False,
-            Image.segment_id.in_(segment_ids),
+            Image.segment_id.isnot(None),
             ImagePerson.label.isnot(None),
             ImagePerson.label != "",
             ImagePerson.label.notin_(list(_ANONYMOUS_FACE_LABELS - {None, ""})),
         )
-    ).scalars().all()
-    return sorted({l for l in labels if l})
+        .distinct()
+    ).all()
+    by_seg: dict[int, set[str]] = {}
+    for sid, label in rows:
+        if label:
+            by_seg.setdefault(sid, set()).add(label)
+    return by_seg
+
+
+def _visit_notes(notes_by_seg: dict[int, str], segment_ids: list[int]) -> list[str]:
+    """Distinct per-segment activity descriptions for a visit, in time order."""
+    return list(dict.fromkeys(notes_by_seg[sid] for sid in segment_ids if sid in notes_by_seg))
+
+
+def _sig(*parts) -> str:
+    return hashlib.sha1("\x1f".join(repr(p) for p in parts).encode()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Materialised visits (day_location_visits)
+# ---------------------------------------------------------------------------
+
+def _load_stored_visits(session: Session, device: str, date: str) -> list[DayLocationVisit]:
+    return list(session.execute(
+        select(DayLocationVisit).where(
+            DayLocationVisit.device == device,
+            DayLocationVisit.date == date,
+        )
+    ).scalars().all())
+
+
+def _save_visits(session: Session, device: str, date: str, rows: list[dict]) -> None:
+    """Replace the day's materialised visits. A failed write only costs the
+    next rebuild its reuse, so it is logged rather than raised."""
+    try:
+        session.execute(
+            delete(DayLocationVisit).where(
+                DayLocationVisit.device == device,
+                DayLocationVisit.date == date,
+            )
+        )
+        if rows:
+            session.execute(insert(DayLocationVisit), [{"device": device, "date": date, **r} for r in rows])
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.warning("saving location visits failed for %s/%s: %s", device, date, e)
 
 
 def _events_prompt(
@@ -554,15 +607,22 @@ def _parse_visit_json(resp) -> dict[int, str]:
     return {}
 
 
-def _describe_visits_global(outline: list[dict]) -> dict[int, str]:
+def _describe_visits_global(outline: list[dict], targets: Optional[set[int]] = None) -> dict[int, str]:
     """
     ONE LLM call describing every visit with the whole day in view, so
     descriptions connect and don't repeat. `outline` is one dict per visit:
-    {index, place, kind ('stop'|'transit'), time_range, people, event, notes}.
+    {index, place, kind ('stop'|'transit'), time_range, people, event, notes,
+    description}. With `targets`, only those visits are written; the others
+    are shown with their existing `description` as context.
     Returns {index: sentence}; missing entries fall back at the call site.
     """
     if not outline:
         return {}
+    if targets is None:
+        targets = {o["index"] for o in outline}
+    if not targets:
+        return {}
+    partial = len(targets) < len(outline)
 
     lines: list[str] = []
     for o in outline:
@@ -572,6 +632,9 @@ def _describe_visits_global(outline: list[dict]) -> dict[int, str]:
         if o.get("event"):
             head += f"; Event: {o['event']}"
         lines.append(head)
+        if o["index"] not in targets and o.get("description"):
+            lines.append(f"    already described: {o['description']}")
+            continue
         notes = o.get("notes") or []
         if notes:
             joined = " ".join(f"- {n}" for n in notes[:_MAX_NOTES_PER_VISIT])
@@ -598,14 +661,19 @@ def _describe_visits_global(outline: list[dict]) -> dict[int, str]:
         "describe unrelated activity (working, a meeting, eating, passing through), IGNORE "
         "the event and describe what they actually did. Do not invent facts beyond the "
         "notes. Do not restate the place name or the clock time.\n\n"
-        "Return ONLY a JSON object mapping each visit number (as a string) to its "
+        + (
+            "Visits marked 'already described' keep their sentence; write sentences ONLY "
+            "for the other visits, consistent with the existing ones.\n\n"
+            if partial else ""
+        )
+        + "Return ONLY a JSON object mapping each visit number (as a string) to its "
         'sentence, e.g. {"0": "...", "1": "..."}.\n\n'
         + "\n".join(lines)
     )
 
     try:
         resp = llm.generate_from_text(prompt)
-        return _parse_visit_json(resp)
+        return {i: d for i, d in _parse_visit_json(resp).items() if i in targets}
     except Exception as e:
         logger.error("global visit description failed: %s", e)
         return {}
@@ -618,6 +686,10 @@ def build_location_visits(
     Group the day's segments into location visits and generate one specific
     description per visit (with optional current-events grounding for notable
     venues). Returns a list of LocationVisit.
+
+    Descriptions and event lookups are reused from the day's materialised
+    visits (``DayLocationVisit``) wherever their inputs are unchanged, so a
+    rebuild after e.g. one late image only re-describes the visit it touched.
     """
     from schemas import LocationVisit  # local import to avoid cycles
     from services.summary import _fetch_segment_locations
@@ -634,10 +706,18 @@ def build_location_visits(
         return []
 
     labeled = _labeled_location_names(session, device, date)
+    notes_by_seg = _segment_notes(session, device, date)
+    people_by_seg = _segment_people(session, device, date)
+
+    stored = _load_stored_visits(session, device, date)
+    stored_sigs = {r.signature for r in stored}
+    stored_events = {r.event_sig: r.event_context for r in stored if r.event_sig}
+    stored_descs = {r.content_sig: r.description for r in stored if r.description}
 
     visits: list = []
     outline: list[dict] = []
-    event_jobs: dict[int, Optional[tuple]] = {}
+    signatures: list[str] = []
+    event_jobs: dict[int, tuple[str, tuple]] = {}
     for idx, group in enumerate(groups):
         seg_ids = [s.segment_id for s in group if s.segment_id is not None]
         start_time = group[0].start_time
@@ -655,13 +735,13 @@ def build_location_visits(
         lon = next((s.location_longitude for s in group if s.location_longitude is not None), None)
         activity_groups = list(dict.fromkeys(s.activity_group for s in group if s.activity_group))
 
-        seg_descs = _segment_descriptions(session, device, date, seg_ids) if seg_ids else []
-        people = _visit_people(session, device, date, seg_ids) if seg_ids else []
+        seg_descs = _visit_notes(notes_by_seg, seg_ids)
+        people = sorted(set().union(*(people_by_seg.get(sid, set()) for sid in seg_ids)))
+        signatures.append(_sig(seg_ids, name, stop, start_time.isoformat(), end_time.isoformat(), lat, lon, tz_name))
 
         # Defer the event web_search: each is a slow OpenAI web_search call, so
         # collect the qualifying visits and run them concurrently below instead of
         # serially in this loop (the main cost of a location-visit rebuild).
-        event_args: Optional[tuple] = None
         if (
             duration >= _EVENT_MIN_STOP_S
             and _is_notable_venue(name, stop, labeled)
@@ -670,7 +750,7 @@ def build_location_visits(
             date_human = to_local(start_time, tz_name).strftime("%A, %-d %B %Y")
             scene_hint = " ".join(seg_descs[:3])[:300]
             event_args = (name, date_human, lat, lon, scene_hint)
-        event_jobs[idx] = event_args
+            event_jobs[idx] = (_sig(*event_args), event_args)
 
         time_range = f"{fmt_hm(start_time, tz_name)}–{fmt_hm(end_time, tz_name)}"
         outline.append({
@@ -693,7 +773,7 @@ def build_location_visits(
                 start_time=start_time,
                 end_time=end_time,
                 duration=duration,
-                timezone=next((s.timezone for s in group if getattr(s, "timezone", None)), None),
+                timezone=tz_name,
                 segment_ids=seg_ids,
                 segment_indices=[s.segment_index for s in group if s.segment_index is not None],
                 activity_groups=activity_groups,
@@ -702,25 +782,58 @@ def build_location_visits(
             )
         )
 
-    # Concurrent event web_search for all qualifying visits — wall time collapses
-    # from the sum of the calls to roughly the slowest one.
-    pending = {idx: args for idx, args in event_jobs.items() if args is not None}
+    # Event lookups already made with the same arguments are reused; the rest
+    # run as concurrent web_searches — wall time collapses from the sum of the
+    # calls to roughly the slowest one.
+    events: dict[int, Optional[str]] = {}
+    pending: dict[int, tuple] = {}
+    for idx, (event_sig, args) in event_jobs.items():
+        if event_sig in stored_events:
+            events[idx] = stored_events[event_sig]
+        else:
+            pending[idx] = args
     if pending:
         with ThreadPoolExecutor(max_workers=min(8, len(pending))) as pool:
-            results = dict(zip(
+            events.update(zip(
                 pending.keys(),
                 pool.map(lambda a: _lookup_events(a[0], a[1], lat=a[2], lon=a[3], scene_hint=a[4]),
                          pending.values()),
             ))
-        by_index = {v.visit_index: v for v in visits}
-        for idx, event_context in results.items():
-            outline[idx]["event"] = event_context
-            if idx in by_index:
-                by_index[idx].event_context = event_context
-
-    # One LLM call describes every visit with the full day in view.
-    descriptions = _describe_visits_global(outline)
-    for v, o in zip(visits, outline):
-        v.description = descriptions.get(v.visit_index) or (o["notes"][0] if o["notes"] else "")
+    for idx, event_context in events.items():
+        outline[idx]["event"] = event_context
+        visits[idx].event_context = event_context
+
+    # A visit whose description inputs are unchanged keeps its description; the
+    # single whole-day LLM call only writes the others, with the kept ones as
+    # context.
+    content_sigs = [
+        _sig(o["place"], o["kind"], o["people"], o["event"], o["notes"]) for o in outline
+    ]
+    targets: set[int] = set()
+    for o, content_sig in zip(outline, content_sigs):
+        if content_sig in stored_descs:
+            o["description"] = stored_descs[content_sig]
+        else:
+            targets.add(o["index"])
+    descriptions = _describe_visits_global(outline, targets)
+
+    rows: list[dict] = []
+    for v, o, signature, content_sig in zip(visits, outline, signatures, content_sigs):
+        described = o.get("description") or descriptions.get(v.visit_index)
+        v.description = described or (o["notes"][0] if o["notes"] else "")
+        rows.append({
+            "visit_index": v.visit_index,
+            "signature": signature,
+            "content_sig": content_sig,
+            "event_sig": event_jobs[v.visit_index][0] if v.visit_index in event_jobs else None,
+            "event_context": v.event_context,
+            "description": described,
+        })
 
+    logger.info(
+        "location visits for %s/%s: %d visits, %d unchanged, %d described, %d event lookups",
+        device, date, len(visits), sum(sig in stored_sigs for sig in signatures),
+        len(targets), len(pending),
+    )
+    _save_visits(session, device, date, rows)
     return visits
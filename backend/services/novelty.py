@@ -18,26 +18,34 @@ Algorithm:
 
   final_novelty = W_CLIP·clip + W_FREQ·freq + W_LOCATION·location
 
+Historical centroids come from the ``segment_centroids`` store (written when a
+segment is annotated, back-filled here for older segments), so the history is
+one (S, D) matrix load and the CLIP term for all of today's segments is a
+single (N, D) @ (D, S) product.
+
   Top-N highest-scoring segments are sent (with images and location context)
   to the LLM to generate a human-readable day highlight.
 """
 from __future__ import annotations
 
-import io
 import logging
 import random
-from collections import defaultdict
-from datetime import datetime, timedelta
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import numpy as np
-from sqlalchemy import select
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from core.config import THUMBNAIL_DIR
-from database.models import Image, ImageEmbedding, Location
+from database.models import Image, ImageEmbedding, Location, SegmentCentroid
 from integrations.llm import llm
 from integrations.llm.gemini import MixedContent, get_visual_content
+from services.utils import load_llm_payload
 
 logger = logging.getLogger(__name__)
 
@@ -52,105 +60,177 @@ W_LOCATION = 0.20
 
 
 # ---------------------------------------------------------------------------
-# Historical stats (single query covers CLIP + frequency + location)
+# Segment centroid store
 # ---------------------------------------------------------------------------
 
-def _historical_stats(
-    session: Session,
-    device: str,
-    date: str,
-    days: int = HISTORY_DAYS,
-) -> tuple[np.ndarray, dict[str, int], dict[int, int], int]:
+def _grouped_centroids(session: Session, device: str, *where) -> list[tuple]:
     """
-    One query over the previous `days` days.
-
-    Returns:
-      centroids       — (S, D) L2-normalised per-segment mean CLIP embeddings
-      activity_counts — {activity_group: number_of_segments}
-      location_counts — {location_id: number_of_segments}
-      total_segments  — total distinct segments in history
+    One grouped query: the mean CLIP embedding of every segment matching
+    ``where``, averaged in Postgres. Returns
+    [(date, segment_id, centroid, image_count, activity_group, location_id)]
+    with L2-normalised float32 centroids; degenerate (zero) means are dropped.
     """
-    date_dt = datetime.strptime(date, "%Y-%m-%d")
-    cutoff = (date_dt - timedelta(days=days)).strftime("%Y-%m-%d")
-
     rows = session.execute(
         select(
-            Image.segment_id,
             Image.date,
-            Image.activity_group,
-            Image.location_id,
-            ImageEmbedding.embedding,
+            Image.segment_id,
+            func.avg(ImageEmbedding.embedding, type_=Vector(768)),
+            func.count(),
+            func.max(Image.activity_group),
+            func.mode().within_group(Image.location_id),
         )
         .join(ImageEmbedding, ImageEmbedding.image_id == Image.id)
         .where(
             Image.device == device,
-            Image.date >= cutoff,
-            Image.date < date,
             Image.deleted == False,
             Image.segment_id.isnot(None),
+            *where,
         )
+        .group_by(Image.date, Image.segment_id)
     ).all()
 
-    if not rows:
-        return np.empty((0, 768), dtype=np.float32), {}, {}, 0
-
-    # Group by (date, segment_id) to compute one centroid per segment
-    groups: dict[tuple, dict] = {}
-    for seg_id, seg_date, activity_group, location_id, emb in rows:
-        key = (seg_date, seg_id)
-        if key not in groups:
-            groups[key] = {
-                "embeddings": [],
-                "activity_group": activity_group or "",
-                "location_id": location_id,
-            }
-        groups[key]["embeddings"].append(np.array(emb, dtype=np.float32))
-
-    centroids: list[np.ndarray] = []
-    activity_counts: dict[str, int] = defaultdict(int)
-    location_counts: dict[int, int] = defaultdict(int)
-
-    for g in groups.values():
-        c = np.mean(g["embeddings"], axis=0)
+    out = []
+    for seg_date, seg_id, mean, count, activity_group, location_id in rows:
+        c = np.asarray(mean, dtype=np.float32)
         norm = np.linalg.norm(c)
         if norm > 1e-8:
-            centroids.append(c / norm)
+            out.append((seg_date, seg_id, c / norm, count, activity_group, location_id))
+    return out
+
+
+def _upsert_centroids(session: Session, device: str, rows: list[tuple]) -> None:
+    for seg_date, seg_id, centroid, count, activity_group, location_id in rows:
+        values = {
+            "centroid": centroid,
+            "image_count": count,
+            "activity_group": activity_group,
+            "location_id": location_id,
+            "updated": datetime.now(timezone.utc),
+        }
+        session.execute(
+            insert(SegmentCentroid)
+            .values(device=device, date=seg_date, segment_id=seg_id, **values)
+            .on_conflict_do_update(
+                index_elements=["device", "date", "segment_id"],
+                set_=values,
+            )
+        )
 
-        if g["activity_group"]:
-            activity_counts[g["activity_group"]] += 1
-        if g["location_id"] is not None:
-            location_counts[g["location_id"]] += 1
 
-    total = len(groups)
-    mat = np.array(centroids, dtype=np.float32) if centroids else np.empty((0, 768), dtype=np.float32)
-    return mat, dict(activity_counts), dict(location_counts), total
+def store_segment_centroids(
+    session: Session,
+    device: str,
+    date: str,
+    segment_ids: Optional[list[int]] = None,
+) -> int:
+    """
+    (Re)compute and upsert the stored centroids of ``segment_ids`` on ``date``
+    (every segment of the day when omitted). Called once a segment is
+    annotated; returns the number of centroids written.
+    """
+    where = [Image.date == date]
+    if segment_ids is not None:
+        where.append(Image.segment_id.in_(segment_ids))
+    rows = _grouped_centroids(session, device, *where)
+    _upsert_centroids(session, device, rows)
+    session.commit()
+    return len(rows)
+
+
+def _live_segment():
+    """Correlated EXISTS: the stored centroid's segment still has live images
+    (re-segmentation and deletion leave orphaned rows behind)."""
+    return (
+        select(Image.id)
+        .where(
+            Image.device == SegmentCentroid.device,
+            Image.date == SegmentCentroid.date,
+            Image.segment_id == SegmentCentroid.segment_id,
+            Image.deleted == False,
+        )
+        .exists()
+    )
 
 
-def _segment_centroid(
+def _backfill_centroids(session: Session, device: str, cutoff: str, date: str) -> None:
+    """Store centroids for history segments annotated before the store existed
+    (or whose annotation write failed). The anti-join reads (date, segment_id)
+    from the covering ix_images_day_freshness index, so it is cheap when
+    nothing is missing."""
+    stored = (
+        select(SegmentCentroid.segment_id)
+        .where(
+            SegmentCentroid.device == Image.device,
+            SegmentCentroid.date == Image.date,
+            SegmentCentroid.segment_id == Image.segment_id,
+        )
+        .exists()
+    )
+    missing = session.execute(
+        select(Image.date, Image.segment_id)
+        .where(
+            Image.device == device,
+            Image.date >= cutoff,
+            Image.date < date,
+            Image.deleted == False,
+            Image.segment_id.isnot(None),
+            ~stored,
+        )
+        .distinct()
+    ).all()
+    if not missing:
+        return
+
+    logger.info("Back-filling %d segment centroids for %s", len(missing), device)
+    rows = _grouped_centroids(
+        session, device,
+        tuple_(Image.date, Image.segment_id).in_([tuple(m) for m in missing]),
+    )
+    _upsert_centroids(session, device, rows)
+    session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Historical stats (one matrix load covers CLIP + frequency + location)
+# ---------------------------------------------------------------------------
+
+def _historical_stats(
     session: Session,
     device: str,
-    segment_id: int,
     date: str,
-) -> Optional[np.ndarray]:
-    """L2-normalised mean CLIP embedding for a segment, or None."""
+    days: int = HISTORY_DAYS,
+) -> tuple[np.ndarray, dict[str, int], dict[uuid.UUID, int], int]:
+    """
+    Stored segment centroids over the previous `days` days.
+
+    Returns:
+      centroids       — (S, D) L2-normalised per-segment mean CLIP embeddings
+      activity_counts — {activity_group: number_of_segments}
+      location_counts — {location_id: number_of_segments}
+      total_segments  — total distinct segments in history
+    """
+    date_dt = datetime.strptime(date, "%Y-%m-%d")
+    cutoff = (date_dt - timedelta(days=days)).strftime("%Y-%m-%d")
+
+    _backfill_centroids(session, device, cutoff, date)
+
     rows = session.execute(
-        select(ImageEmbedding.embedding)
-        .join(Image, Image.id == ImageEmbedding.image_id)
+        select(SegmentCentroid.centroid, SegmentCentroid.activity_group, SegmentCentroid.location_id)
         .where(
-            Image.device == device,
-            Image.segment_id == segment_id,
-            Image.date == date,
-            Image.deleted == False,
+            SegmentCentroid.device == device,
+            SegmentCentroid.date >= cutoff,
+            SegmentCentroid.date < date,
+            _live_segment(),
         )
-    ).scalars().all()
+    ).all()
 
     if not rows:
-        return None
+        return np.empty((0, 768), dtype=np.float32), {}, {}, 0
 
-    mat = np.array([np.array(r) for r in rows], dtype=np.float32)
-    c = mat.mean(axis=0)
-    norm = np.linalg.norm(c)
-    return c / norm if norm > 1e-8 else None
+    mat = np.stack([np.asarray(r.centroid, dtype=np.float32) for r in rows])
+    activity_counts = Counter(r.activity_group for r in rows if r.activity_group)
+    location_counts = Counter(r.location_id for r in rows if r.location_id is not None)
+    return mat, dict(activity_counts), dict(location_counts), len(rows)
 
 
 # ---------------------------------------------------------------------------
@@ -167,26 +247,48 @@ def compute_segment_novelty(
       {segment_id, novelty, clip_novelty, freq_novelty, location_novelty,
        activity, activity_group, location_name, representative_thumbnail}
     """
-    seg_rows = session.execute(
-        select(Image.segment_id, Image.activity, Image.activity_group, Image.location_id)
-        .where(
-            Image.device == device,
-            Image.date == date,
-            Image.deleted == False,
-            Image.segment_id.isnot(None),
-        )
-        .distinct(Image.segment_id)
-    ).all()
-
-    if not seg_rows:
+    # Today's segments may still be growing, so their centroids are computed
+    # fresh (one grouped query) rather than read from the store.
+    today = _grouped_centroids(session, device, Image.date == date)
+    if not today:
         return []
 
+    seg_ids = [row[1] for row in today]
+    seg_rows = {
+        r.segment_id: r
+        for r in session.execute(
+            select(Image.segment_id, Image.activity, Image.activity_group, Image.location_id)
+            .where(
+                Image.device == device,
+                Image.date == date,
+                Image.deleted == False,
+                Image.segment_id.in_(seg_ids),
+            )
+            .distinct(Image.segment_id)
+        ).all()
+    }
+
+    # First (earliest) thumbnail of every segment in one DISTINCT ON pass.
+    thumbs = dict(
+        session.execute(
+            select(Image.segment_id, Image.thumbnail)
+            .where(
+                Image.device == device,
+                Image.date == date,
+                Image.deleted == False,
+                Image.segment_id.in_(seg_ids),
+            )
+            .distinct(Image.segment_id)
+            .order_by(Image.segment_id, Image.timestamp.asc())
+        ).all()
+    )
+
     history, activity_counts, location_counts, total_hist = _historical_stats(
         session, device, date
     )
 
     # Batch-fetch location names for all location_ids seen today
-    location_ids = {r.location_id for r in seg_rows if r.location_id is not None}
+    location_ids = {r.location_id for r in seg_rows.values() if r.location_id is not None}
     loc_map: dict[int, str] = {}
     if location_ids:
         loc_rows = session.execute(
@@ -196,17 +298,20 @@ def compute_segment_novelty(
         for lr in loc_rows:
             loc_map[lr.id] = lr.name or lr.suburb or lr.city or ""
 
+    # 1. CLIP novelty for every segment at once: (N, D) @ (D, S) -> max over S.
+    if history.shape[0] > 0:
+        today_mat = np.stack([row[2] for row in today])
+        clip_scores = 1.0 - (today_mat @ history.T).max(axis=1)
+    else:
+        clip_scores = np.ones(len(today), dtype=np.float32)
+
     results = []
-    for seg_id, activity, activity_group, location_id in seg_rows:
-        centroid = _segment_centroid(session, device, seg_id, date)
-        if centroid is None:
-            continue
-
-        # 1. CLIP novelty
-        if history.shape[0] > 0:
-            clip_novelty = float(1.0 - (history @ centroid).max())
-        else:
-            clip_novelty = 1.0
+    for (_, seg_id, *_rest), clip in zip(today, clip_scores):
+        seg = seg_rows.get(seg_id)
+        activity = seg.activity if seg else None
+        activity_group = seg.activity_group if seg else None
+        location_id = seg.location_id if seg else None
+        clip_novelty = float(clip)
 
         # 2. Frequency novelty — rare activity_groups score higher
         if total_hist > 0 and activity_group:
@@ -224,18 +329,6 @@ def compute_segment_novelty(
 
         novelty = W_CLIP * clip_novelty + W_FREQ * freq_novelty + W_LOCATION * location_novelty
 
-        thumb = session.execute(
-            select(Image.thumbnail)
-            .where(
-                Image.device == device,
-                Image.segment_id == seg_id,
-                Image.date == date,
-                Image.deleted == False,
-            )
-            .order_by(Image.timestamp.asc())
-            .limit(1)
-        ).scalars().first()
-
         results.append({
             "segment_id": seg_id,
             "novelty": novelty,
@@ -245,7 +338,7 @@ def compute_segment_novelty(
             "activity": activity or "Unknown",
             "activity_group": activity_group or "",
             "location_name": loc_map.get(location_id, "") if location_id else "",
-            "representative_thumbnail": thumb,
+            "representative_thumbnail": thumbs.get(seg_id),
         })
 
     results.sort(key=lambda x: x["novelty"], reverse=True)
@@ -298,11 +391,7 @@ def generate_unique_day_highlight(
         for thumb in thumbs:
             path = f"{THUMBNAIL_DIR}/{device}/{thumb}"
             try:
-                from PIL import Image as PILImage
-                img = PILImage.open(path).convert("RGB")
-                buf = io.BytesIO()
-                img.save(buf, format="JPEG", quality=70)
-                image_bytes.append(buf.getvalue())
+                image_bytes.append(load_llm_payload(path))
             except Exception as e:
                 logger.debug("Could not open thumbnail %s: %s", path, e)
 
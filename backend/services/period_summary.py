@@ -1,16 +1,17 @@
 """
 Multi-day period summaries — a hierarchy on top of the per-day DaySummary.
 
-A *period* (week / month / trip / custom range) rolls up the DaySummary records
-in its span. The day is the atomic unit; a period aggregates the days' metrics
-and asks the LLM to summarize the days' *highlights* (not raw segments), which
-keeps prompts small and gives real hierarchical abstraction.
+A *period* (week / month / trip / custom range) rolls up the days in its span.
+The day is the atomic unit; a period aggregates the days' metrics and asks the
+LLM to summarize the days' *highlights* (not raw segments), which keeps prompts
+small and gives real hierarchical abstraction. Days are read as compact
+DayRollups (services/day_rollup.py), never as full DaySummary documents.
 
 Public API:
     aggregate_period(session, device, start, end)        -> PeriodSummary
     summarize_period_by_text(period, child_texts)        -> str
     build_period_summary(session, device, kind, s, e)    -> PeriodSummary  (persists)
-    period_source_sig(day_records)                       -> str
+    period_source_sig(rollups)                           -> str
 """
 
 import hashlib
@@ -23,9 +24,10 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from database.models import BioDayStats
-from database.types import DaySummaryRecord, PeriodSummaryRecord
+from database.types import PeriodSummaryRecord
 from integrations.llm import llm
-from schemas import BioTrend, BioTrendPoint, DaySummary, PeriodSummary, TopLocation, TrendItem
+from schemas import BioTrend, BioTrendPoint, DayRollup, PeriodSummary, TopLocation, TrendItem
+from services.day_rollup import load_day_rollups
 
 logger = logging.getLogger(__name__)
 
@@ -47,51 +49,41 @@ def _haversine_m(lat1, lon1, lat2, lon2) -> float:
     return 2 * r * math.asin(math.sqrt(a))
 
 
-def _load_day_records(device: str, start: str, end: str) -> list[DaySummaryRecord]:
-    """Day records in [start, end] (inclusive), ordered by date."""
-    recs = list(DaySummaryRecord.find(
-        filter={"device": device, "date": {"$gte": start, "$lte": end}}
-    ))
-    recs.sort(key=lambda r: r.date)
-    return recs
-
-
 # Bump when the period-summary generation logic changes (prompt, formatting,
 # ordering) — invalidates every cached period so it rebuilds once.
-_SIG_VERSION = "6"
+_SIG_VERSION = "7"
 
 
-def period_source_sig(day_records: list[DaySummaryRecord]) -> str:
+def period_source_sig(rollups: list[DayRollup]) -> str:
     """Hash of the child days' identity+freshness, so a period can be reused
-    from cache unless an underlying day actually changed."""
+    from cache unless an underlying day was saved again."""
     parts = [f"v{_SIG_VERSION}"]
-    for r in sorted(day_records, key=lambda x: x.date):
-        gen = getattr(r, "text_summary_generated_at", None)
-        parts.append(f"{r.date}|{gen.isoformat() if gen else ''}|{int(bool(getattr(r, 'updated', False)))}")
+    for r in sorted(rollups, key=lambda x: x.date):
+        parts.append(f"{r.date}|{r.saved_at.isoformat() if r.saved_at else ''}")
     return hashlib.sha1("\n".join(parts).encode()).hexdigest()
 
 
-def _aggregate_top_locations(days: list[DaySummary]) -> list[TopLocation]:
+def _aggregate_top_locations(days: list[DayRollup]) -> list[TopLocation]:
     """Dedup location visits across the period's days into ranked places."""
     buckets: list[dict] = []
     for day in days:
         seen_names_today: set[str] = set()
-        for v in day.location_visits or []:
-            name = (v.location_name or "").strip()
-            if not name or v.location_stop is False:  # skip transit/journeys
+        for v in day.visits:
+            name = v.name
+            if not name or v.stop is False:  # skip transit/journeys
                 continue
             key = name.lower()
             match = None
             for b in buckets:
                 if b["key"] == key or _haversine_m(
-                    b["lat"], b["lon"], v.location_latitude, v.location_longitude
+                    b["lat"], b["lon"], v.latitude, v.longitude
                 ) <= _LOC_MERGE_RADIUS_M:
                     match = b
                     break
             if match is None:
                 match = {
                     "key": key, "name": name,
-                    "lat": v.location_latitude, "lon": v.location_longitude,
+                    "lat": v.latitude, "lon": v.longitude,
                     "days": set(), "visits": 0, "minutes": 0.0,
                     "rep": v.representative_image,
                 }
@@ -99,8 +91,8 @@ def _aggregate_top_locations(days: list[DaySummary]) -> list[TopLocation]:
             match["visits"] += 1
             match["minutes"] += (v.duration or 0) / 60.0
             match["days"].add(day.date)
-            if match["lat"] is None and v.location_latitude is not None:
-                match["lat"], match["lon"] = v.location_latitude, v.location_longitude
+            if match["lat"] is None and v.latitude is not None:
+                match["lat"], match["lon"] = v.latitude, v.longitude
             if match["rep"] is None and v.representative_image is not None:
                 match["rep"] = v.representative_image
         seen_names_today.clear()
@@ -166,11 +158,13 @@ def _default_label(kind: str, start: str, end: str) -> str:
 
 
 def aggregate_period(session: Session, device: str, start: str, end: str,
-                     kind: str = "custom", label: str | None = None) -> PeriodSummary:
-    """Roll up the DaySummary records in [start, end] into a PeriodSummary
-    (without the LLM narrative or trends — those are added by build_period_summary)."""
-    recs = _load_day_records(device, start, end)
-    days = [DaySummary.model_validate(r.__dict__) for r in recs]
+                     kind: str = "custom", label: str | None = None,
+                     days: list[DayRollup] | None = None) -> PeriodSummary:
+    """Roll up the day rollups in [start, end] into a PeriodSummary (without
+    the LLM narrative or trends — those are added by build_period_summary).
+    Pass ``days`` when the caller has already loaded them."""
+    if days is None:
+        days = load_day_rollups(device, start, end)
 
     category_minutes: dict[str, float] = defaultdict(float)
     binary_totals: dict[str, float] = defaultdict(float)
@@ -182,16 +176,16 @@ def aggregate_period(session: Session, device: str, start: str, end: str,
 
     for day in days:
         day_dates.append(day.date)
-        if (day.total_minutes or 0) > 0 or day.segments:
+        if day.active:
             active_days += 1
-        total_minutes += day.total_minutes or 0.0
-        total_images += day.total_images or 0
-        for cat, mins in (day.category_minutes or {}).items():
+        total_minutes += day.total_minutes
+        total_images += day.total_images
+        for cat, mins in day.category_minutes.items():
             category_minutes[cat] += mins
-        for name, val in (day.binary_metrics or {}).items():
+        for name, val in day.binary_metrics.items():
             binary_totals[name] += val
-        for name, stamps in (day.burst_metrics or {}).items():
-            burst_totals[name] += len(stamps or [])
+        for name, count in day.burst_counts.items():
+            burst_totals[name] += count
 
     return PeriodSummary(
         kind=kind, device=device, start_date=start, end_date=end,
@@ -204,7 +198,7 @@ def aggregate_period(session: Session, device: str, start: str, end: str,
         burst_totals=dict(burst_totals),
         top_locations=_aggregate_top_locations(days),
         bio_trend=_aggregate_bio(session, device, day_dates),
-        source_sig=period_source_sig(recs),
+        source_sig=period_source_sig(days),
     )
 
 
@@ -348,22 +342,18 @@ def build_period_summary(session: Session, device: str, kind: str,
                          start: str, end: str, label: str | None = None) -> PeriodSummary:
     """Aggregate → summarize → persist. Reuses the cached record when the child
     days are unchanged (source_sig match)."""
-    recs = _load_day_records(device, start, end)
-    sig = period_source_sig(recs)
+    days = load_day_rollups(device, start, end, with_text=True)
+    sig = period_source_sig(days)
     existing = PeriodSummaryRecord.find_one(filter={
         "device": device, "kind": kind, "start_date": start, "end_date": end,
     })
     if existing and existing.source_sig == sig and existing.summary_text and not existing.updated:
         return PeriodSummary.model_validate(existing.__dict__)
 
-    period = aggregate_period(session, device, start, end, kind=kind, label=label)
+    period = aggregate_period(session, device, start, end, kind=kind, label=label, days=days)
     # Label each block with its date and keep chronological order, so the LLM
     # can narrate the period in order instead of jumbling days.
-    child_texts = [
-        f"## {r.date}\n{r.summary_text}"
-        for r in recs
-        if getattr(r, "summary_text", "")
-    ]
+    child_texts = [f"## {d.date}\n{d.summary_text}" for d in days if d.summary_text]
     period.summary_text = summarize_period_by_text(period, child_texts)
     period.highlights = _extract_highlights(period.summary_text)
     try:
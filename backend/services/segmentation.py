@@ -8,14 +8,12 @@ from sqlalchemy import and_, select, update
 from core.config import SEGMENT_THRESHOLD
 from database.models import Image, ImageEmbedding, ImageGPS
 from database.types import DaySummaryRecord
-from integrations.sessions.redis import RedisClient
+from integrations.sessions.redis import redis_client
 from tqdm.auto import tqdm
-from services.utils import compress_image
 from database.types import _orm_to_lifelog
 import logging
 
 logger = logging.getLogger(__name__)
-redis_client = RedisClient()
 
 def fetch_embeddings(session, device: str, paths: List[str]) -> tuple[List[str], np.ndarray]:
     records = session.execute(
@@ -376,13 +374,8 @@ def load_all_segments(
 
         if not skip_annotations:
             try:
-                from tasks import describe_segment_task  # noqa: PLC0415
-                describe_segment_task.delay(
-                    device_id,
-                    date,
-                    [compress_image(f"{device_id}/{i}") for i in segment],
-                    segment_id,
-                )
+                from tasks import enqueue_describe_segment  # noqa: PLC0415
+                enqueue_describe_segment(device_id, date, segment_id)
                 DaySummaryRecord.update_one(
                     {"date": date, "device": device_id},
                     {"$set": {"updated": True}},
@@ -406,6 +399,25 @@ def load_all_segments(
         redis_client.set_json(f"processing_job:{job_id}", job)
 
 
+def segment_centrality(seg_feats: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    L2-normalise a segment's features and score each frame by cosine similarity
+    to the segment centroid.
+
+    Returns:
+        (normalised features (N, D), centroid similarity (N,))
+    """
+    # L2-normalise (defensive; CLIP features are often already normalised)
+    seg_feats = seg_feats / np.linalg.norm(seg_feats, axis=1, keepdims=True)
+
+    # Centroid of the segment
+    centroid = seg_feats.mean(axis=0)
+    centroid /= np.linalg.norm(centroid) + 1e-8
+
+    # Cosine similarity to centroid == dot product (after normalisation)
+    return seg_feats, seg_feats @ centroid
+
+
 def pick_representative_index_for_segment(
     seg_paths: List[str],
     seg_feats: np.ndarray,
@@ -422,15 +434,7 @@ def pick_representative_index_for_segment(
     if len(seg_paths) == 0:
         raise ValueError("Segment has no images")
 
-    # L2-normalise (defensive; CLIP features are often already normalised)
-    seg_feats = seg_feats / np.linalg.norm(seg_feats, axis=1, keepdims=True)
-
-    # Centroid of the segment
-    centroid = seg_feats.mean(axis=0)
-    centroid /= np.linalg.norm(centroid) + 1e-8
-
-    # Cosine similarity to centroid == dot product (after normalisation)
-    sim_centroid = seg_feats @ centroid  # (N_seg,)
+    seg_feats, sim_centroid = segment_centrality(seg_feats)
     num_thumbnails = choose_num_thumbnails(len(seg_paths))
 
     if query_embedding is not None:
@@ -452,3 +456,41 @@ def pick_representative_index_for_segment(
 
     best_images = [seg_paths[i] for i in best_indices]
     return best_images
+
+
+def pick_representatives_batched(
+    times: np.ndarray,
+    feats: np.ndarray,
+    windows: List[tuple[int, np.datetime64, np.datetime64]],
+    queries: np.ndarray,
+    alpha_centroid: float = 0.5,
+) -> List[List[int]]:
+    """
+    ``pick_representative_index_for_segment`` for many segments of one day at
+    once. ``times`` (N,) are ascending datetime64 capture times of the day's
+    frames and ``feats`` (N, D) their features; each window is
+    (query row, start, end) over ``queries`` (T, D). All frames are scored
+    against all queries with a single (N, D) @ (D, T) product, and each
+    window's frames are found by binary search on ``times``.
+
+    Returns:
+        per window, indices into ``feats`` of its representatives, best first
+        (empty when no frame falls inside the window).
+    """
+    feats = feats / np.linalg.norm(feats, axis=1, keepdims=True)
+    q = queries.astype(np.float32)
+    q /= np.linalg.norm(q, axis=1, keepdims=True) + 1e-8
+    sim_query = feats @ q.T  # (N, T)
+
+    out: List[List[int]] = []
+    for j, start, end in windows:
+        lo = int(np.searchsorted(times, start, side="left"))
+        hi = int(np.searchsorted(times, end, side="right"))
+        if hi <= lo:
+            out.append([])
+            continue
+        _, sim_centroid = segment_centrality(feats[lo:hi])
+        combined = alpha_centroid * sim_centroid + (1.0 - alpha_centroid) * sim_query[lo:hi, j]
+        best = np.argsort(combined)[-choose_num_thumbnails(hi - lo):][::-1]
+        out.append((lo + best).tolist())
+    return out
@@ -5,23 +5,22 @@ import re
 from datetime import datetime, timedelta
 from typing import Callable, List, Optional
 
-import os
 import numpy as np
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from schemas import ActionType, CustomTarget, DayFood, DaySummary, FoodItem, MealFood, SummarySegment
 from auth.ortho import apply_transformation, get_matrix
-from core.config import DIR, GROUPED_CATEGORIES
+from core.config import GROUPED_CATEGORIES, THUMBNAIL_DIR
 from core.timefmt import fmt_hm
 from database.models import Image, ImageEmbedding, HeartRateData, Location
-from database.types import ImageRecord, _orm_to_lifelog
+from database.types import _orm_to_lifelog
 from integrations.llm import llm
 from integrations.llm.gemini import MixedContent, get_visual_content
-from services.date_utils import parse_date
 from services.bio_stats import attach_bio_to_segments, hr_zone, _date_ns_window, _polar_ts_to_unix
 from integrations.visual import clip_model
 
-from services.segmentation import fetch_embeddings, pick_representative_index_for_segment
+from services.segmentation import pick_representatives_batched
+from services.utils import load_llm_payload
 
 logger = logging.getLogger(__name__)
 
@@ -202,9 +201,12 @@ def summarize_lifelog_by_day(
     period_targets = [
         target.name for target in targets if target.action_type == ActionType.PERIOD
     ]
+    period_merged: dict[str, list[SummarySegment]] = {}
     for target_name in period_targets:
+        # Copies: merging extends end_time/duration, and summary.segments is
+        # saved and reused by the next (patch) rebuild.
         target_segments = [
-            seg for seg in summary.segments if _period_matches(seg, target_name)
+            seg.model_copy() for seg in summary.segments if _period_matches(seg, target_name)
         ]
         if not target_segments:
             continue
@@ -220,48 +222,36 @@ def summarize_lifelog_by_day(
                 merged.append(current_seg)
                 current_seg = next_seg
         merged.append(current_seg)
-
-        query_vec = encode_with_cache(session, f"a photo of {target_name}", summary.device)
-        for seg in merged:
-            seg_paths, seg_feats = get_segment_data(session, summary, seg)
-            rep_indices = pick_representative_index_for_segment(seg_paths, seg_feats, query_vec)
-            seg.representative_images = [
-                _orm_to_lifelog(img)
-                for img in session.execute(
-                    select(Image).where(
-                        Image.device == summary.device,
-                        Image.image_path.in_(rep_indices),
-                    )
-                ).scalars().all()
-            ]
-            seg.representative_image = (
-                seg.representative_images[0] if seg.representative_images else None
-            )
+        period_merged[target_name] = merged
+
+    # One embedding fetch, one scoring product and one hydration query for all
+    # targets' merged segments; results are applied per target just before its
+    # description (a segment can match more than one target).
+    picks = _pick_period_representatives(session, summary.device, period_merged)
+    for target_name, merged in period_merged.items():
+        for seg, reps in zip(merged, picks[target_name]):
+            seg.representative_images = reps
+            seg.representative_image = reps[0] if reps else None
         summary.period_metrics[target_name] = merged
         summary.custom_summaries[target_name] = generate_period_description(
             target_name, merged, summary.device
         )
 
     # ── CLIP-based metrics: incremental from analysis_checkpoint ─────────────
-    # Images sorted ascending by path (YYYYMMDD_HHMMSS.jpg = chronological).
-    all_paths = sorted(
-        record.image_path
-        for record in ImageRecord.find(
-            session,
-            filter={"device": summary.device, "date": summary.date, "deleted": False},
-        )
+    # Paths sort chronologically (YYYYMMDD_HHMMSS.jpg), so the checkpoint is the
+    # last analysed path and "new" means image_path > checkpoint.
+    day_filter = (
+        Image.device == summary.device,
+        Image.date == summary.date,
+        Image.deleted == False,
     )
-    summary.total_images = len(all_paths)
+    total_images, last_path = session.execute(
+        select(func.count(), func.max(Image.image_path)).where(*day_filter)
+    ).one()
+    summary.total_images = total_images
 
     checkpoint = summary.analysis_checkpoint
-    if checkpoint:
-        new_paths = [p for p in all_paths if p > checkpoint]
-        logger.debug(
-            "Incremental CLIP: %d new images since checkpoint %s (total %d)",
-            len(new_paths), checkpoint, len(all_paths),
-        )
-    else:
-        new_paths = all_paths
+    if not checkpoint:
         # First run: reset aggregates so we start clean
         for target in targets:
             if target.action_type == ActionType.BINARY:
@@ -269,59 +259,93 @@ def summarize_lifelog_by_day(
             elif target.action_type == ActionType.BURST:
                 summary.burst_metrics[target.name] = []
 
-    if not new_paths:
+    if last_path is None or (checkpoint and last_path <= checkpoint):
         # Nothing new — checkpoint already at the end
-        if all_paths:
-            summary.analysis_checkpoint = all_paths[-1]
+        if last_path is not None:
+            summary.analysis_checkpoint = last_path
         return summary
 
-    new_paths, new_feats = fetch_embeddings(session, summary.device, new_paths)
-    if len(new_feats) == 0:
+    new_paths, new_times, new_feats = _fetch_clip_inputs(session, day_filter, checkpoint)
+    logger.debug(
+        "Incremental CLIP: %d new images since checkpoint %s (total %d)",
+        len(new_paths), checkpoint, total_images,
+    )
+    if not new_paths:
         logger.warning("No embeddings for new images on %s/%s.", summary.device, summary.date)
         return summary
 
     norm_feats = new_feats / np.linalg.norm(new_feats, axis=1, keepdims=True)
 
     clip_targets = [
-        (
-            target.name,
-            target.action_type,
-            encode_with_cache(session, f"a photo of {target.name}", summary.device),
-            encode_with_cache(session, f"a photo without {target.name}", summary.device),
-        )
-        for target in targets
+        target for target in targets
         if target.action_type in (ActionType.BINARY, ActionType.BURST)
     ]
-
-    for name, action_type, query_vec, neg_query_vec in clip_targets:
+    for target in clip_targets:
         # Ensure keys exist when a new target is added after first checkpoint
-        if action_type == ActionType.BINARY:
-            summary.binary_metrics.setdefault(name, 0.0)
-        elif action_type == ActionType.BURST:
-            summary.burst_metrics.setdefault(name, [])
-
-        pos_sim = norm_feats @ query_vec
-        neg_sim = norm_feats @ neg_query_vec
-        present = pos_sim > neg_sim
-
-        for idx, is_present in enumerate(present):
-            if not is_present:
-                continue
-            if action_type == ActionType.BINARY:
-                summary.binary_metrics[name] += 1
-            elif action_type == ActionType.BURST:
-                basename = os.path.basename(new_paths[idx]).split(".")[0]
-                timestamp = parse_date(basename).timestamp()
-                existing = summary.burst_metrics[name]
-                if existing and timestamp - existing[-1] < 30:
-                    existing[-1] = timestamp
-                else:
-                    existing.append(timestamp)
+        if target.action_type == ActionType.BINARY:
+            summary.binary_metrics.setdefault(target.name, 0.0)
+        else:
+            summary.burst_metrics.setdefault(target.name, [])
+
+    if clip_targets:
+        # All positive prompts, then all negative ones: (2T, D), one product.
+        prompts = np.stack(
+            [encode_with_cache(session, f"a photo of {t.name}", summary.device) for t in clip_targets]
+            + [encode_with_cache(session, f"a photo without {t.name}", summary.device) for t in clip_targets]
+        ).astype(norm_feats.dtype, copy=False)
+        sims = norm_feats @ prompts.T
+        n = len(clip_targets)
+        present = sims[:, :n] > sims[:, n:]
+
+        for j, target in enumerate(clip_targets):
+            if target.action_type == ActionType.BINARY:
+                summary.binary_metrics[target.name] += int(present[:, j].sum())
+            else:
+                _extend_bursts(summary.burst_metrics[target.name], new_times[present[:, j]])
 
     summary.analysis_checkpoint = new_paths[-1]
     return summary
 
 
+# Detections closer than this (seconds) to the previous one extend its burst.
+_BURST_GAP_S = 30
+
+
+def _fetch_clip_inputs(session, day_filter, checkpoint: Optional[str]) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Paths, UTC epoch seconds and embeddings of the day's images after
+    ``checkpoint`` that have an embedding, in path order — one column query."""
+    stmt = (
+        select(Image.image_path, Image.timestamp, ImageEmbedding.embedding)
+        .join(ImageEmbedding, ImageEmbedding.image_id == Image.id)
+        .where(*day_filter)
+        .order_by(Image.image_path.asc())
+    )
+    if checkpoint:
+        stmt = stmt.where(Image.image_path > checkpoint)
+    rows = session.execute(stmt).all()
+    if not rows:
+        return [], np.empty(0), np.empty((0, 0), dtype=np.float32)
+    paths = [r.image_path for r in rows]
+    # Image.timestamp is naive UTC.
+    times = np.array([r.timestamp for r in rows], dtype="datetime64[us]").astype(np.int64) / 1e6
+    feats = np.stack([np.asarray(r.embedding, dtype=np.float32) for r in rows])
+    return paths, times, feats
+
+
+def _extend_bursts(bursts: list[float], times: np.ndarray) -> None:
+    """Fold ascending detection ``times`` into ``bursts`` (each burst stored as
+    its latest detection). A detection within _BURST_GAP_S of the previous one
+    extends that burst, including the last burst carried over from the
+    checkpoint."""
+    if not len(times):
+        return
+    ends = np.append(np.flatnonzero(np.diff(times) >= _BURST_GAP_S), len(times) - 1)
+    new = times[ends].tolist()
+    if bursts and times[0] - bursts[-1] < _BURST_GAP_S:
+        bursts[-1] = new.pop(0)
+    bursts.extend(new)
+
+
 def generate_period_description(target_name: str, segments: List[SummarySegment], device: str) -> str:
     if not segments:
         return ""
@@ -332,12 +356,11 @@ def generate_period_description(target_name: str, segments: List[SummarySegment]
     for segment in segments:
         rep_image = segment.representative_image
         if rep_image is not None:
-            image_path = f"{DIR}/{device}/{rep_image.image_path}"
+            stem = rep_image.image_path.rsplit(".", 1)[0]
             try:
-                with open(image_path, "rb") as f:
-                    bytes_list.append(f.read())
+                bytes_list.append(load_llm_payload(f"{THUMBNAIL_DIR}/{device}/{stem}.webp"))
                 times.append(f"{segment.start_time} to {segment.end_time}")
-            except FileNotFoundError:
+            except OSError:
                 continue
 
     if not bytes_list:
@@ -369,17 +392,56 @@ def generate_period_description(target_name: str, segments: List[SummarySegment]
         return f"Activity: {target_name} detected."
 
 
-def get_segment_data(session, summary, segment):
-    records = session.execute(
-        select(Image.image_path).where(
-            Image.device == summary.device,
-            Image.timestamp >= segment.start_time,
-            Image.timestamp <= segment.end_time,
+def _pick_period_representatives(
+    session, device: str, period_merged: dict[str, list[SummarySegment]]
+) -> dict[str, list[list]]:
+    """Representative LifelogImages (best first) for every merged period
+    segment, as {target: [reps per segment]}. Fetches the embeddings of the
+    span covering all segments once, scores every frame against every target
+    prompt in one product (pick_representatives_batched) and hydrates all
+    chosen images in a single query."""
+    jobs = [(name, seg) for name, merged in period_merged.items() for seg in merged]
+    out: dict[str, list[list]] = {name: [] for name in period_merged}
+    if not jobs:
+        return out
+
+    rows = session.execute(
+        select(Image.image_path, Image.timestamp, ImageEmbedding.embedding)
+        .join(ImageEmbedding, ImageEmbedding.image_id == Image.id)
+        .where(
+            Image.device == device,
+            Image.deleted == False,
+            Image.timestamp >= min(seg.start_time for _, seg in jobs),
+            Image.timestamp <= max(seg.end_time for _, seg in jobs),
         )
-    )
-    paths = [r.image_path for r in records]
-    paths, seg_feats = fetch_embeddings(session, summary.device, paths)
-    return paths, seg_feats
+        .order_by(Image.timestamp.asc())
+    ).all()
+    if not rows:
+        for name, _ in jobs:
+            out[name].append([])
+        return out
+
+    paths = [r.image_path for r in rows]
+    times = np.array([r.timestamp for r in rows], dtype="datetime64[us]")
+    feats = np.stack([np.asarray(r.embedding, dtype=np.float32) for r in rows])
+    names = list(period_merged)
+    queries = np.stack([encode_with_cache(session, f"a photo of {name}", device) for name in names])
+    windows = [
+        (names.index(name), np.datetime64(seg.start_time, "us"), np.datetime64(seg.end_time, "us"))
+        for name, seg in jobs
+    ]
+    picks = pick_representatives_batched(times, feats, windows, queries)
+
+    chosen = {paths[i] for idx in picks for i in idx}
+    by_path = {
+        img.image_path: _orm_to_lifelog(img)
+        for img in session.execute(
+            select(Image).where(Image.device == device, Image.image_path.in_(chosen))
+        ).scalars().all()
+    } if chosen else {}
+    for (name, _), idx in zip(jobs, picks):
+        out[name].append([by_path[paths[i]] for i in idx if paths[i] in by_path])
+    return out
 
 
 def time_to_ms(date_str, time_str):
@@ -448,37 +510,55 @@ def _fetch_day_hr_rows(session, device_id: str, date: str) -> list:
     ).scalars().all()
 
 
+def _segment_rows(session, device: str, date: str, segment_ids: Optional[list[int]] = None) -> list:
+    """
+    One row per segment (all segmented images of the day, or only
+    ``segment_ids``): the first image's activity fields and timezone via
+    DISTINCT ON, plus start_time / end_time. A single statement that returns
+    a handful of columns per segment instead of every Image row of the day.
+    """
+    where = [Image.device == device, Image.date == date, Image.deleted == False]
+    if segment_ids is None:
+        where.append(Image.segment_id.isnot(None))
+    else:
+        where.append(Image.segment_id.in_(segment_ids))
+    return session.execute(
+        select(
+            Image.segment_id,
+            Image.activity,
+            Image.activity_group,
+            Image.activity_tags,
+            Image.timezone,
+            Image.timestamp.label("start_time"),
+            func.max(Image.timestamp).over(partition_by=Image.segment_id).label("end_time"),
+        )
+        .where(*where)
+        .distinct(Image.segment_id)
+        .order_by(Image.segment_id, Image.timestamp.asc(), Image.id)
+    ).all()
+
+
 def _build_segment_entry(
-    segment_id: int,
-    images: list,
+    row,
     seg_to_location: dict[int, tuple[str, bool, float | None, float | None]],
-) -> Optional[SummarySegment]:
+) -> SummarySegment:
     """
-    Build one SummarySegment from pre-fetched LifelogImage list.
+    Build one SummarySegment from a ``_segment_rows`` row.
     HR is attached separately via attach_bio_to_segments so the full-day
     window can be used (call after collecting all segments).
-    Returns None when images is empty.
     """
-    if not images:
-        return None
-    images_sorted = sorted(images, key=lambda img: img.timestamp)
-    activity = images_sorted[0].activity or "Unclear"
-    activity_group = images_sorted[0].activity_group or None
-    activity_tags = images_sorted[0].activity_tags or None
-    start_time = images_sorted[0].timestamp
-    end_time = images_sorted[-1].timestamp
-    duration = max(int((end_time - start_time).total_seconds()), 10)
-    loc_name, loc_stop, loc_lat, loc_lon = seg_to_location.get(segment_id, ("", True, None, None))
+    duration = max(int((row.end_time - row.start_time).total_seconds()), 10)
+    loc_name, loc_stop, loc_lat, loc_lon = seg_to_location.get(row.segment_id, ("", True, None, None))
     return SummarySegment(
-        segment_id=segment_id,
+        segment_id=row.segment_id,
         segment_index=None,
-        activity=activity,
-        activity_group=activity_group,
-        activity_tags=activity_tags,
-        start_time=start_time,
-        end_time=end_time,
+        activity=row.activity or "Unclear",
+        activity_group=row.activity_group or None,
+        activity_tags=row.activity_tags or None,
+        start_time=row.start_time,
+        end_time=row.end_time,
         duration=duration,
-        timezone=images_sorted[0].timezone,
+        timezone=row.timezone,
         location_name=loc_name,
         location_stop=loc_stop,
         location_latitude=loc_lat,
@@ -498,34 +578,15 @@ def create_day_timeline(session, device: str, date: str) -> list[SummarySegment]
     Does NOT use 15-minute slot bucketing — segments map 1:1 to DB segment_ids,
     which enables precise incremental updates.
     """
-    rows = session.execute(
-        select(Image)
-        .where(
-            Image.device == device,
-            Image.date == date,
-            Image.deleted == False,
-            Image.segment_id.isnot(None),
-        )
-        .order_by(Image.timestamp.asc())
-    ).scalars().all()
-
+    rows = _segment_rows(session, device, date)
     if not rows:
         logger.info("No images with segment_id for %s/%s", device, date)
         return []
 
-    images_by_seg: dict[int, list] = {}
-    for img in rows:
-        images_by_seg.setdefault(img.segment_id, []).append(_orm_to_lifelog(img))
-
     seg_to_location = _fetch_segment_locations(session, device, date)
     hr_rows = _fetch_day_hr_rows(session, device, date)
 
-    segments: list[SummarySegment] = []
-    for seg_id, imgs in images_by_seg.items():
-        entry = _build_segment_entry(seg_id, imgs, seg_to_location)
-        if entry:
-            segments.append(entry)
-
+    segments = [_build_segment_entry(row, seg_to_location) for row in rows]
     segments.sort(key=lambda s: s.start_time)
 
     if hr_rows:
@@ -549,7 +610,7 @@ def update_dirty_segments(
     start_time / activity, so we always re-sort the full list after patching.
 
     Strategy:
-      1. Fetch images only for dirty_ids (cheap — small subset of the day).
+      1. Aggregate only dirty_ids (one row per segment).
       2. Build/replace SummarySegment entries in the existing list.
       3. Re-sort by start_time, re-attach HR, renumber.
 
@@ -566,21 +627,8 @@ def update_dirty_segments(
         )
         return create_day_timeline(session, device, date)
 
-    # Fetch images only for the dirty segments
-    rows = session.execute(
-        select(Image)
-        .where(
-            Image.device == device,
-            Image.date == date,
-            Image.deleted == False,
-            Image.segment_id.in_(dirty_ids),
-        )
-        .order_by(Image.timestamp.asc())
-    ).scalars().all()
-
-    images_by_seg: dict[int, list] = {}
-    for img in rows:
-        images_by_seg.setdefault(img.segment_id, []).append(_orm_to_lifelog(img))
+    # Aggregate only the dirty segments
+    row_by_seg = {row.segment_id: row for row in _segment_rows(session, device, date, dirty_ids)}
 
     # Location and HR queries cover the whole day but are each a single cheap query
     seg_to_location = _fetch_segment_locations(session, device, date)
@@ -589,8 +637,8 @@ def update_dirty_segments(
     # Build new entries for dirty segments
     new_entries: dict[int, Optional[SummarySegment]] = {}
     for seg_id in dirty_ids:
-        imgs = images_by_seg.get(seg_id, [])
-        new_entries[seg_id] = _build_segment_entry(seg_id, imgs, seg_to_location)
+        row = row_by_seg.get(seg_id)
+        new_entries[seg_id] = _build_segment_entry(row, seg_to_location) if row else None
 
     # Patch the existing list
     # Build a lookup from segment_id → list index for O(1) replacement
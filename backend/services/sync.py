@@ -1,4 +1,3 @@
-from pymongo import MongoClient
 import glob
 import os
 from auth.ortho import get_matrix
@@ -16,11 +15,6 @@ from sqlalchemy import delete, select
 from integrations.visual import clip_model
 
 
-client = MongoClient("mongodb://localhost:27017/")
-db = client["picam"]
-mongo_collection = db["images"]
-
-
 def to_id(image_path):
     return image_path.replace("/", "_")
 
@@ -141,6 +135,7 @@ def sync_images(session, device: str):
         for path in (
             f"{THUMBNAIL_DIR}/{device}/{stem}.webp",
             f"{THUMBNAIL_DIR}/{device}/{stem}_grid.webp",
+            f"{THUMBNAIL_DIR}/{device}/{stem}_llm.jpg",
         ):
             if os.path.exists(path):
                 os.remove(path)
@@ -20,8 +20,8 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from database.models import Location, LocationLabel
-from database.types import DaySummaryRecord
-from schemas import DaySummary
+from schemas import DayRollup
+from services.day_rollup import load_day_rollups
 from services.location_visits import _owner_username
 from services.period_summary import build_period_summary
 
@@ -77,29 +77,25 @@ def _home_names(session: Session, home_ids: set) -> set[str]:
 
 
 def detect_trips(session: Session, device: str, window_days: int | None = None) -> list[TripSpan]:
-    """Return away-day trips. Scans ALL of the device's day summaries by default
+    """Return away-day trips. Scans ALL of the device's day rollups by default
     (so past trips surface); pass ``window_days`` to restrict to a trailing window."""
-    date_filter: dict = {}
+    start = end = None
     if window_days is not None:
-        end = datetime.now(timezone.utc).date()
-        start = end - timedelta(days=window_days)
-        date_filter = {"date": {"$gte": start.strftime("%Y-%m-%d"),
-                                "$lte": end.strftime("%Y-%m-%d")}}
-    recs = list(DaySummaryRecord.find(filter={"device": device, **date_filter}))
-    recs = [r for r in recs if _valid_date(getattr(r, "date", ""))]
-    if not recs:
+        today = datetime.now(timezone.utc).date()
+        start = (today - timedelta(days=window_days)).strftime("%Y-%m-%d")
+        end = today.strftime("%Y-%m-%d")
+    days = [d for d in load_day_rollups(device, start, end) if _valid_date(d.date)]
+    if not days:
         return []
-    recs.sort(key=lambda r: r.date)
-    days = [DaySummary.model_validate(r.__dict__) for r in recs]
 
     home_ids = home_location_ids(session, device)
     home_names = _home_names(session, home_ids)
 
-    def is_away(day: DaySummary) -> bool | None:
-        stops = [v for v in (day.location_visits or []) if v.location_stop is not False and v.location_name]
+    def is_away(day: DayRollup) -> bool | None:
+        stops = [v for v in day.visits if v.stop is not False and v.name]
         if not stops:
             return None  # no location data — neutral (grace)
-        return not any(_norm(v.location_name) in home_names for v in stops)
+        return not any(_norm(v.name) in home_names for v in stops)
 
     # Walk calendar-adjacent days, grouping away-runs with a small grace.
     labeled = [(datetime.strptime(d.date, "%Y-%m-%d").date(), d, is_away(d)) for d in days]
@@ -144,13 +140,13 @@ def detect_trips(session: Session, device: str, window_days: int | None = None)
     return trips
 
 
-def _trip_label(days: list[DaySummary], home_names: set[str]) -> str:
+def _trip_label(days: list[DayRollup], home_names: set[str]) -> str:
     """Primary destination = the non-home place with the most time across the trip."""
     minutes: Counter = Counter()
     for day in days:
-        for v in day.location_visits or []:
-            name = (v.location_name or "").strip()
-            if not name or v.location_stop is False or _norm(name) in home_names:
+        for v in day.visits:
+            name = v.name
+            if not name or v.stop is False or _norm(name) in home_names:
                 continue
             minutes[name] += (v.duration or 0)
     if not minutes:
@@ -1,6 +1,7 @@
 import base64
 import os
 import subprocess
+from functools import lru_cache
 from typing import List
 from schemas import ObjectDetection
 from core.config import DIR, THUMBNAIL_DIR
@@ -80,6 +81,54 @@ def make_grid_thumbnail(thumbnail_img: "Image.Image", thumbnail_path: str) -> st
     return grid_path
 
 
+# Pre-encoded payload for vision-LLM calls. JPEG is what every provider takes
+# natively and 512px is plenty for activity recognition, so annotation tasks
+# send these bytes as-is instead of decoding + re-encoding the full thumbnail.
+LLM_PAYLOAD_MAX = 512
+LLM_PAYLOAD_QUALITY = 80
+LLM_PAYLOAD_CACHE_SIZE = 256
+
+
+def llm_payload_path(thumbnail_path: str) -> str:
+    """LLM-payload path for a full thumbnail: `_llm.jpg` in place of .webp."""
+    base, _ext = os.path.splitext(thumbnail_path)
+    return f"{base}_llm.jpg"
+
+
+def make_llm_payload(thumbnail_img: "Image.Image", thumbnail_path: str) -> str:
+    """Write the downscaled JPEG sent to the vision LLM next to a full thumbnail
+    and return its path. `thumbnail_img` is the already-resized full thumbnail."""
+    payload_path = llm_payload_path(thumbnail_path)
+    payload = thumbnail_img.convert("RGB")
+    payload.thumbnail((LLM_PAYLOAD_MAX, LLM_PAYLOAD_MAX))
+    payload.save(payload_path, "JPEG", quality=LLM_PAYLOAD_QUALITY, optimize=True)
+    return payload_path
+
+
+@lru_cache(maxsize=LLM_PAYLOAD_CACHE_SIZE)
+def _read_llm_payload(payload_path: str, _mtime_ns: int) -> bytes:
+    # mtime is part of the key so a re-anonymised thumbnail isn't served stale.
+    with open(payload_path, "rb") as f:
+        return f.read()
+
+
+def load_llm_payload(thumbnail_path: str) -> bytes:
+    """JPEG bytes to send to the vision LLM for a full thumbnail.
+
+    Served from a small in-process LRU. Thumbnails created before payloads
+    existed get theirs written on first use. Raises OSError when neither the
+    payload nor the thumbnail can be read.
+    """
+    payload_path = llm_payload_path(thumbnail_path)
+    try:
+        mtime_ns = os.stat(payload_path).st_mtime_ns
+    except FileNotFoundError:
+        with Image.open(thumbnail_path) as img:
+            make_llm_payload(img, thumbnail_path)
+        mtime_ns = os.stat(payload_path).st_mtime_ns
+    return _read_llm_payload(payload_path, mtime_ns)
+
+
 def compress_image(image_path, quality=85):
     output_path, exists = get_thumbnail_path(image_path)
     if exists:
@@ -91,6 +140,7 @@ def compress_image(image_path, quality=85):
     img.thumbnail((800, 800))
     img.save(output_path, "WEBP", quality=quality)
     make_grid_thumbnail(img, output_path)
+    make_llm_payload(img, output_path)
     return output_path
 
 
@@ -142,6 +192,7 @@ def blur_image(image_path: str, boxes: List[ObjectDetection], blur_strength=30):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     image.save(output_path, "WEBP")
     make_grid_thumbnail(image, output_path)
+    make_llm_payload(image, output_path)
 
 
 def make_video_thumbnail(video_path):
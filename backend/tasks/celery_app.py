@@ -22,7 +22,8 @@ celery = Celery(
     include=["tasks"],
 )
 
-from celery.signals import worker_ready, worker_process_init
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_ready, worker_process_init
+import time
 
 
 def _connect_odm():
@@ -46,6 +47,30 @@ def _init_worker_process(**kwargs):
     # Fires in each forked child (prefork pool) — connect there so the pymongo
     # client isn't inherited across fork.
     _connect_odm()
+    from core.connections import connections
+    connections.init_process()
+
+
+@task_prerun.connect
+def _track_task_connections(task=None, **kwargs):
+    from core.connections import set_current_task
+    set_current_task(task.name if task else None)
+
+
+@task_postrun.connect
+def _flush_task_connections(task=None, **kwargs):
+    from core.connections import connections, set_current_task
+    connections.flush_counts(task.name if task else None)
+    set_current_task(None)
+
+
+@before_task_publish.connect
+def _stamp_queued_at(headers=None, **kwargs):
+    """Record publish time so tasks can report queue wait separately from run
+    time (read via integrations.llm.dispatcher.queued_at). Only the first publish
+    is stamped, so a retry's countdown isn't counted as queue wait again."""
+    if headers is not None and "queued_at" not in headers:
+        headers["queued_at"] = time.time()
 
 
 @worker_ready.connect
@@ -72,6 +97,13 @@ celery.conf.update(
     task_routes={
         "tasks.describe_segment_task": {"queue": "llm"},
     },
+    # Honour per-message priority on the Redis broker (0 = first) so live-day
+    # annotation overtakes backfill in the `llm` queue; see llm_priority().
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+        "sep": ":",
+    },
     beat_schedule={
         # 02:00 UTC — bio aggregates for today + yesterday across all sensor devices
         "nightly-bio-stats": {
@@ -3,10 +3,11 @@
 import hashlib
 import logging
 import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import desc, func, select, update
+from sqlalchemy import desc, select, update
 from sqlalchemy.orm import Session
 from tqdm.auto import tqdm
 
@@ -14,6 +15,9 @@ from schemas import ActionType, CustomTarget, DaySummary
 from database import engine as _db_engine
 from database.models import Image as ImageModel
 from database.types import DaySummaryRecord, ImageRecord
+from integrations.sessions.redis import redis_client
+from services.day_freshness import day_freshness
+from services.day_rollup import save_day_rollup
 from services.segmentation import load_all_segments
 from services.summary import (
     create_day_timeline,
@@ -21,7 +25,7 @@ from services.summary import (
     summarize_lifelog_by_day,
     update_dirty_segments,
 )
-from tasks import describe_segment_task
+from tasks import enqueue_describe_segment
 
 logger = logging.getLogger(__name__)
 
@@ -110,21 +114,174 @@ def _resolve_location_visits(session, device: str, date: str, segments, existing
     return build_location_visits(session, device, date, segments), sig
 
 
-def _day_summary_bg(device: str, date: str, target_dicts: list) -> None:
-    """Background: full day-summary rebuild (segmentation → timeline → LLM → CLIP)."""
+def _periods_signature(segments) -> str:
+    """``_segments_signature`` plus the activity fields that period matching,
+    category minutes and meal planning read. Equal ⇒ the CLIP period metrics
+    and their LLM descriptions can be reused."""
+    parts = [
+        f"{s.segment_id}|{s.location_name}|{s.start_time.isoformat()}|{s.end_time.isoformat()}"
+        f"|{s.activity}|{s.activity_group}|{s.activity_tags}"
+        for s in sorted(segments, key=lambda x: (x.start_time, x.segment_id or 0))
+    ]
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+@dataclass
+class RebuildPlan:
+    """What a day-summary rebuild must recompute, decided up front from the
+    stored record's signals and the day's current freshness fingerprint.
+
+    ``timeline`` is "full" (create_day_timeline), "patch" (update_dirty_segments
+    for the annotated segments) or "reuse". ``fresh_start`` discards the stored
+    record (CLIP checkpoint, metrics, visits) entirely. Period metrics, visits
+    and text are further gated after the timeline is built, on whether the
+    segments actually changed (``_periods_signature`` / visit signature)."""
+    fresh_start: bool = False
+    timeline: str = "reuse"
+    new_images: bool = False
+    reset_clip: bool = False  # images were deleted: recount CLIP metrics from scratch
+    text: bool = False
+    reasons: list[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        return f"timeline={self.timeline} " + ",".join(self.reasons or ["unchanged"])
+
+
+def plan_rebuild(prev: DaySummary | None, fresh, force: bool = False) -> RebuildPlan:
+    """Dependency-aware rebuild plan.
+
+    - no record / ``force`` (resync) → everything from scratch
+    - new images, new segments → full timeline; CLIP runs incrementally from
+      the stored checkpoint (from scratch when images were deleted)
+    - segments cleared (GPS pipeline, process-date) or ``updated`` without
+      dirty ids (stop correction, chat location change) → full timeline;
+      visits/periods rerun only if the rebuilt segments differ
+    - dirty_segment_ids (new annotations) → patch those segments
+    - text_summary_stale → day text
+    """
+    plan = RebuildPlan()
+    if force or prev is None or not prev.analysis_checkpoint:
+        plan.fresh_start, plan.timeline, plan.new_images, plan.text = True, "full", True, True
+        plan.reasons.append("forced" if force else "no prior summary")
+        return plan
+
+    prev_max_seg = max((s.segment_id for s in prev.segments if s.segment_id is not None), default=None)
+    if prev.number_of_images != fresh.image_count or prev.last_image_time != fresh.last_image_time:
+        plan.new_images = True
+        plan.timeline = "full"
+        plan.reasons.append("images changed")
+        if fresh.image_count < prev.number_of_images:
+            plan.reset_clip = True
+    elif prev.segments and prev_max_seg != fresh.max_segment_id:
+        plan.timeline = "full"
+        plan.reasons.append("segments changed")
+    if not prev.segments:
+        plan.timeline = "full"
+        plan.reasons.append("segments cleared")
+    elif prev.dirty_segment_ids:
+        if plan.timeline == "reuse":
+            plan.timeline = "patch"
+        plan.reasons.append(f"{len(prev.dirty_segment_ids)} annotated")
+    elif prev.updated and plan.timeline == "reuse":
+        plan.timeline = "full"
+        plan.reasons.append("updated")
+    if prev.text_summary_stale or not prev.summary_text:
+        plan.text = True
+        plan.reasons.append("text stale")
+    return plan
+
+
+# Per-(device, date) timings of the latest rebuild, plus running totals per phase.
+_PHASES_KEY = "day_summary:phases:{device}:{date}"
+_PHASE_STATS_KEY = "day_summary:phase_stats"
+_PHASES_TTL = 30 * 24 * 3600
+
+
+class _PhaseTimer:
+    """Lap timer for _day_summary_bg. Logs each phase as before and keeps the
+    durations so ``record`` can export them; skipped phases are counted too."""
+
+    def __init__(self, device: str, date: str):
+        self.device, self.date = device, date
+        self.timings: dict[str, float] = {}
+        self.skipped: list[str] = []
+        self._t = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.timings[phase] = now - self._t
+        logger.info("_day_summary_bg[%s/%s] %s: %.1fs", self.device, self.date, phase, now - self._t)
+        self._t = now
+
+    def skip(self, phase: str) -> None:
+        self.skipped.append(phase)
+        self._t = time.perf_counter()
+
+    def record(self, plan: RebuildPlan) -> None:
+        key = _PHASES_KEY.format(device=self.device, date=self.date)
+        try:
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.hset(key, mapping={
+                **{f"{phase}_ms": round(1000 * secs) for phase, secs in self.timings.items()},
+                "skipped": ",".join(self.skipped),
+                "plan": plan.describe(),
+                "at": int(time.time()),
+            })
+            pipe.expire(key, _PHASES_TTL)
+            for phase, secs in self.timings.items():
+                pipe.hincrby(_PHASE_STATS_KEY, f"{phase}:runs", 1)
+                pipe.hincrby(_PHASE_STATS_KEY, f"{phase}:ms", round(1000 * secs))
+            for phase in self.skipped:
+                pipe.hincrby(_PHASE_STATS_KEY, f"{phase}:skipped", 1)
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("_day_summary_bg: recording phase timings failed: %s", exc)
+
+
+def day_summary_phase_metrics(device: str | None = None, date: str | None = None) -> dict:
+    """Latest rebuild timings for one (device, date), or per-phase run / skip
+    counts and average milliseconds across all rebuilds."""
+    if device and date:
+        raw = redis_client.client.hgetall(_PHASES_KEY.format(device=device, date=date))
+        return {k.decode(): v.decode() for k, v in raw.items()}
+    out: dict[str, dict] = {}
+    for field_, n in redis_client.client.hgetall(_PHASE_STATS_KEY).items():
+        phase, stat = field_.decode().rsplit(":", 1)
+        out.setdefault(phase, {"runs": 0, "skipped": 0, "ms": 0})[stat] = int(n)
+    for m in out.values():
+        m["avg_ms"] = round(m["ms"] / m["runs"]) if m["runs"] else 0
+    return out
+
+
+def _day_summary_bg(device: str, date: str, target_dicts: list, force: bool = False) -> None:
+    """Background: day-summary rebuild (segmentation → timeline → visits → LLM
+    text → CLIP/periods), recomputing only the phases ``plan_rebuild`` selects.
+    ``force`` rebuilds everything from scratch (after a resync)."""
     from sqlalchemy.orm import Session as _Session
     # Phase timer — logs where the wall-clock goes so a >1 min build can be traced
     # to the actual hog (web_search? novelty? CLIP?) instead of guessing.
-    _t = [time.perf_counter()]
-    def _lap(phase: str) -> None:
-        now = time.perf_counter()
-        logger.info("_day_summary_bg[%s/%s] %s: %.1fs", device, date, phase, now - _t[0])
-        _t[0] = now
+    timer = _PhaseTimer(device, date)
+    plan = RebuildPlan()
     try:
         with _Session(_db_engine) as session:
+            # Self-gating: a single query when every image is already segmented.
             load_all_segments(session, device, date, skip_annotations=False)
-            segments = create_day_timeline(session, device, date)
-            _lap("segment+timeline")
+            timer.lap("segment")
+
+            _prev = DaySummaryRecord.find_one(filter={"date": date, "device": device})
+            prev = DaySummary.model_validate(_prev.__dict__) if _prev else None
+            freshness = day_freshness(session, device, date)
+            plan = plan_rebuild(prev, freshness, force=force)
+            logger.info("_day_summary_bg[%s/%s] plan: %s", device, date, plan.describe())
+
+            if plan.timeline == "full":
+                segments = create_day_timeline(session, device, date)
+            elif plan.timeline == "patch":
+                segments = update_dirty_segments(session, device, date, prev.dirty_segment_ids, prev.segments)
+            else:
+                segments = list(prev.segments)
+            timer.lap("timeline")
             if not segments:
                 logger.warning("_day_summary_bg: no segments found for %s/%s", device, date)
                 DaySummaryRecord.update_one(
@@ -135,10 +292,16 @@ def _day_summary_bg(device: str, date: str, target_dicts: list) -> None:
                 return
 
             targets = [CustomTarget(name=t["name"], action_type=ActionType(t["action_type"]), query_prompt=t["query_prompt"]) for t in target_dicts]
-            summary = DaySummary(
-                device=device, date=date, segments=segments,
-                summary_text="", updated=False, dirty_segment_ids=[], text_summary_stale=False,
-            )
+            if plan.fresh_start:
+                summary = DaySummary(
+                    device=device, date=date, segments=segments,
+                    summary_text="", updated=False, dirty_segment_ids=[], text_summary_stale=False,
+                )
+            else:
+                summary = prev.model_copy(update={"segments": segments})
+                if plan.reset_clip:
+                    summary.analysis_checkpoint = None
+            segments_changed = plan.fresh_start or _periods_signature(segments) != _periods_signature(prev.segments)
 
             last_img_ts = segments[-1].end_time if segments else None
             _today = datetime.now().strftime("%Y-%m-%d")
@@ -147,47 +310,56 @@ def _day_summary_bg(device: str, date: str, target_dicts: list) -> None:
                 _ts = last_img_ts.replace(tzinfo=timezone.utc) if last_img_ts.tzinfo is None else last_img_ts
                 _is_live = (datetime.now(timezone.utc) - _ts).total_seconds() / 60 < _LIVE_THRESHOLD_MINUTES
 
-            # Prior record (if any) — used to reuse location visits when the
-            # segments are unchanged, so we don't re-run the LLM/web-search.
-            _prev = DaySummaryRecord.find_one(filter={"date": date, "device": device})
-            _existing = DaySummary.model_validate(_prev.__dict__) if _prev else None
-
             # Location-visit descriptions: one specific summary per place visited.
             # Built for every day incl. the live one (no live gate); the signature
-            # reuse below keeps repeated builds cheap when nothing changed.
-            try:
-                summary.location_visits, summary.location_visits_sig = _resolve_location_visits(
-                    session, device, date, segments, _existing
-                )
-            except Exception as _lve:
-                logger.warning("_day_summary_bg: location visits failed for %s/%s: %s", device, date, _lve)
-            _lap("location_visits (web_search)")
-
-            summary = summarize_day_by_text(session, summary)
-            summary.text_summary_stale = False
-            summary.text_summary_generated_at = datetime.now(timezone.utc)
-            _lap("day_text")
-
-            if not _is_live:
-                # Novelty highlight removed — it cost a full ~25s LLM call and was
-                # never surfaced in the UI. Keep the cheap day-ready notification.
+            # reuse inside keeps repeated builds cheap when nothing changed.
+            prev_visits_sig = None if plan.fresh_start else prev.location_visits_sig
+            if segments_changed or not prev_visits_sig or not summary.location_visits:
                 try:
-                    from services.notify import notify_day_complete
-                    notify_day_complete(session, device, date, summary.summary_text)
-                    session.commit()
-                except Exception as _nve:
-                    logger.warning("_day_summary_bg: notify failed for %s/%s: %s", device, date, _nve)
-                _lap("notify")
-
-            summary = summarize_lifelog_by_day(session, summary, targets)
-            _lap("clip+periods (summarize_lifelog_by_day)")
-
-            # Eating focus: dispatch one food pass per meal that lacks a record.
-            try:
-                from tasks import enqueue_meal_food
-                enqueue_meal_food(session, device, date, list(summary.segments))
-            except Exception as _fe:
-                logger.warning("_day_summary_bg: meal food dispatch failed for %s/%s: %s", device, date, _fe)
+                    summary.location_visits, summary.location_visits_sig = _resolve_location_visits(
+                        session, device, date, segments, prev
+                    )
+                except Exception as _lve:
+                    logger.warning("_day_summary_bg: location visits failed for %s/%s: %s", device, date, _lve)
+                timer.lap("location_visits")
+            else:
+                timer.skip("location_visits")
+
+            if plan.text or segments_changed or summary.location_visits_sig != prev_visits_sig:
+                summary = summarize_day_by_text(session, summary)
+                summary.text_summary_stale = False
+                summary.text_summary_generated_at = datetime.now(timezone.utc)
+                timer.lap("day_text")
+
+                if not _is_live:
+                    # Novelty highlight removed — it cost a full ~25s LLM call and was
+                    # never surfaced in the UI. Keep the cheap day-ready notification.
+                    try:
+                        from services.notify import notify_day_complete
+                        notify_day_complete(session, device, date, summary.summary_text)
+                        session.commit()
+                    except Exception as _nve:
+                        logger.warning("_day_summary_bg: notify failed for %s/%s: %s", device, date, _nve)
+                    timer.lap("notify")
+            else:
+                timer.skip("day_text")
+
+            if plan.new_images or segments_changed:
+                # CLIP metrics resume from analysis_checkpoint; periods follow segments.
+                summary = summarize_lifelog_by_day(session, summary, targets)
+                timer.lap("clip+periods")
+
+                # Eating focus: dispatch one food pass per meal that lacks a record.
+                try:
+                    from tasks import enqueue_meal_food
+                    enqueue_meal_food(session, device, date, list(summary.segments))
+                except Exception as _fe:
+                    logger.warning("_day_summary_bg: meal food dispatch failed for %s/%s: %s", device, date, _fe)
+            else:
+                # Metrics unchanged; still pick up food records that landed since.
+                from services.summary import attach_food_to_summary
+                attach_food_to_summary(session, summary)
+                timer.skip("clip+periods")
 
             from database.models import BioDayStats as _BioDayStats
             bio = session.execute(
@@ -203,19 +375,8 @@ def _day_summary_bg(device: str, date: str, target_dicts: list) -> None:
                 summary.sleep_end = bio.sleep_end  # type: ignore
                 summary.sleep_minutes = bio.sleep_minutes
 
-            n = session.execute(
-                select(func.count(ImageModel.id)).where(
-                    ImageModel.date == date, ImageModel.device == device, ImageModel.deleted == False,
-                )
-            ).scalar_one()
-            last_img = session.execute(
-                select(ImageModel).where(
-                    ImageModel.date == date, ImageModel.device == device, ImageModel.deleted == False,
-                ).order_by(ImageModel.image_path.desc())
-            ).scalars().first()
-
-            summary.number_of_images = n
-            summary.last_image_time = last_img.timestamp if last_img else None  # type: ignore
+            summary.number_of_images = freshness.image_count
+            summary.last_image_time = freshness.last_image_time  # type: ignore
             summary.dirty_segment_ids = []
             summary.updated = False
             summary.processing = False
@@ -225,7 +386,10 @@ def _day_summary_bg(device: str, date: str, target_dicts: list) -> None:
                 data={"$set": {**summary.model_dump(), "dirty_segment_ids": [], "text_summary_stale": False, "processing": False}},
                 upsert=True,
             )
-            logger.info("_day_summary_bg complete for %s/%s", device, date)
+            save_day_rollup(summary)
+            timer.lap("save")
+            timer.record(plan)
+            logger.info("_day_summary_bg complete for %s/%s (%s)", device, date, plan.describe())
     except Exception as exc:
         logger.error("_day_summary_bg failed for %s/%s: %s", device, date, exc)
         DaySummaryRecord.update_one(
@@ -298,6 +462,7 @@ def _text_summary_bg(device: str, date: str, is_live: bool = False) -> None:
                 }},
                 upsert=True,
             )
+            save_day_rollup(summary)
             logger.info("_text_summary_bg complete for %s/%s", device, date)
     except Exception as exc:
         logger.error("_text_summary_bg failed for %s/%s: %s", device, date, exc)
@@ -352,21 +517,7 @@ def process_segments(session: Session, date: str, device: str):
         if segment_id is None:
             continue
 
-        thumbnails = [
-            img.thumbnail
-            for img in ImageRecord.find(
-                session,
-                segment_id=segment_id,
-                deleted=False,
-                device=device,
-                sort="image_path",
-                sort_desc=False,
-            )
-        ]
-
-        new_description = describe_segment_task.delay(
-            device, date, thumbnails, segment_id
-        )
+        new_description = enqueue_describe_segment(device, date, segment_id)
         all_summaries = [*all_summaries, new_description][-10:]
 
         DaySummaryRecord.update_one(